@@ -0,0 +1,450 @@
+"""
+Módulo de Almacenes (almacen.py)
+
+Define 'Almacen', una lista de registros que mantiene un índice
+(diccionario) por clave primaria. Se comporta como una lista normal
+(se puede recorrer, guardar en CSV/JSON, pasar a la UI), pero cada
+'append', 'remove', 'pop', etc. actualiza el índice, por lo que las
+búsquedas por ID cuestan O(1) en lugar de recorrer toda la lista.
+
+Además lleva la marca de agua (high-water mark) de los IDs numéricos
+(ej. E017 -> 17), de modo que generar el siguiente ID es O(1) y un ID
+eliminado no se reutiliza mientras la marca se conserve.
+
+Opcionalmente indexa un campo de nombre normalizado (sin mayúsculas,
+tildes ni espacios sobrantes) para detectar duplicados en O(1), y lleva
+conteos de referencias por campo (ej. estudiantes por 'id_carrera').
+
+Las funciones 'buscar_*_por_id' y '_generar_nuevo_id_*' de cada módulo
+usan el Almacen si lo reciben y recorren la lista si reciben una lista normal.
+
+Los registros ya agregados se modifican dentro de 'editando(...)' para que
+los índices secundarios (nombres, índices de las subclases) sigan al día.
+
+Cada almacén cuenta sus cambios desde el último guardado ('cambios'), así
+el repositorio sabe qué archivos tiene que reescribir.
+"""
+import unicodedata
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def normalizar_nombre(nombre: str) -> str:
+    """
+    Normaliza un nombre para compararlo: sin tildes, en minúsculas y
+    con un solo espacio entre palabras (ej. " José  PÉREZ" -> "jose perez").
+
+    Args:
+        nombre (str): El nombre original.
+
+    Returns:
+        str: El nombre normalizado.
+    """
+    descompuesto = unicodedata.normalize("NFKD", nombre or "")
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_tildes.casefold().split())
+
+
+class GeneradorIds:
+    """
+    Mezcla (mixin) con la marca de agua de IDs de un almacén.
+    La clase que la use define 'prefijo', 'ancho' y 'ultimo_id'.
+    """
+    prefijo: str = ""
+    ancho: int = 3
+    ultimo_id: int = 0
+
+    def _observar_id(self, id_registro: Any) -> None:
+        """Sube la marca de agua si el ID tiene el formato del prefijo y es mayor."""
+        if not isinstance(id_registro, str) or not id_registro.startswith(self.prefijo):
+            return
+        numero = id_registro[len(self.prefijo):]
+        if numero.isdigit() and int(numero) > self.ultimo_id:
+            self.ultimo_id = int(numero)
+
+    def _formatear_id(self, numero: int) -> str:
+        return f"{self.prefijo}{str(numero).zfill(self.ancho)}"
+
+    def proximo_id(self) -> str:
+        """
+        Devuelve el siguiente ID libre en O(1), sin reservarlo.
+        Queda ocupado cuando el registro se agrega con 'append'.
+
+        Returns:
+            str: El nuevo ID (ej. "E018").
+        """
+        return self._formatear_id(self.ultimo_id + 1)
+
+    def reservar_ids(self, cantidad: int) -> List[str]:
+        """
+        Reserva un bloque de IDs consecutivos para una inserción en lote.
+        La marca de agua avanza de inmediato, aunque los registros se
+        agreguen después.
+
+        Args:
+            cantidad (int): Número de IDs a reservar.
+
+        Returns:
+            List[str]: Los IDs reservados, en orden.
+        """
+        inicio = self.ultimo_id + 1
+        self.ultimo_id += max(cantidad, 0)
+        return [self._formatear_id(numero) for numero in range(inicio, self.ultimo_id + 1)]
+
+    def asegurar_ultimo_id(self, ultimo_id: int) -> None:
+        """
+        Aplica una marca de agua persistida (ej. tras eliminar el último registro).
+
+        Args:
+            ultimo_id (int): La marca guardada junto con los datos.
+        """
+        self.ultimo_id = max(self.ultimo_id, ultimo_id)
+
+
+class SeguimientoCambios:
+    """
+    Mezcla (mixin) que cuenta las modificaciones hechas desde el último
+    guardado, para agrupar varias en una sola escritura.
+    """
+    cambios: int = 0
+
+    def _registrar_cambio(self) -> None:
+        self.cambios += 1
+
+    @property
+    def hay_cambios(self) -> bool:
+        """True si hay modificaciones sin guardar."""
+        return self.cambios > 0
+
+    def marcar_guardado(self) -> None:
+        """Indica que el contenido actual ya está escrito en disco."""
+        self.cambios = 0
+
+    def descontar_cambio(self, cantidad: int = 1) -> None:
+        """Indica que 'cantidad' modificaciones ya se escribieron por su cuenta (ej. en una bitácora)."""
+        self.cambios = max(self.cambios - cantidad, 0)
+
+    @contextmanager
+    def sin_registrar_cambios(self) -> Iterator[None]:
+        """
+        Las modificaciones hechas dentro del bloque no cuentan como pendientes
+        (ej. al incorporar cambios que otro proceso ya escribió en disco).
+        """
+        cambios = self.cambios
+        try:
+            yield
+        finally:
+            self.cambios = cambios
+
+
+class Internador:
+    """
+    Asigna a cada cadena distinta un entero consecutivo (0, 1, 2...)
+    y permite volver del entero a la cadena. Sirve para guardar columnas
+    de IDs repetidos como arreglos de enteros.
+
+    Args:
+        valores (Iterable[str]): Cadenas iniciales (en orden de código).
+    """
+
+    def __init__(self, valores: Iterable[str] = ()) -> None:
+        self.valores: List[str] = []
+        self._codigos: Dict[str, int] = {}
+        for valor in valores:
+            self.codigo(valor)
+
+    def codigo(self, valor: str) -> int:
+        """Devuelve el código de 'valor', asignándole uno nuevo si no lo tenía."""
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            self._codigos[valor] = codigo
+            self.valores.append(valor)
+        return codigo
+
+    def buscar_codigo(self, valor: str) -> Optional[int]:
+        """Devuelve el código de 'valor' o None si nunca se registró."""
+        return self._codigos.get(valor)
+
+    def valor(self, codigo: int) -> str:
+        """Devuelve la cadena asociada a un código."""
+        return self.valores[codigo]
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def __reduce__(self):
+        return self.__class__, (self.valores,)
+
+
+class Almacen(GeneradorIds, SeguimientoCambios, list):
+    """
+    Lista de registros (diccionarios) indexada por clave primaria.
+
+    Args:
+        registros (Iterable[Dict[str, Any]]): Registros iniciales.
+        clave (str): Nombre del campo que actúa como clave primaria.
+        prefijo (str): Prefijo de los IDs generados (ej. "E").
+        ancho (int): Cantidad de dígitos de los IDs generados (ej. 3 -> E001).
+        campo_nombre (Optional[str]): Campo cuyo valor normalizado se indexa.
+        campos_conteo (Tuple[str, ...]): Campos (claves foráneas) cuyos valores se cuentan.
+
+    El atributo 'version' aumenta con cada modificación (incluidas las que
+    no cuentan como pendientes de guardar): los índices derivados que se
+    guardan aparte (ej. el cierre de prerrequisitos de los cursos) la
+    comparan para saber si deben recalcularse.
+    """
+
+    def __init__(
+            self,
+            registros: Iterable[Dict[str, Any]] = (),
+            clave: str = "id",
+            prefijo: str = "",
+            ancho: int = 3,
+            campo_nombre: Optional[str] = None,
+            campos_conteo: Tuple[str, ...] = ()
+    ) -> None:
+        super().__init__(registros)
+        self.clave = clave
+        self.prefijo = prefijo
+        self.ancho = ancho
+        self.campo_nombre = campo_nombre
+        self.campos_conteo = tuple(campos_conteo)
+        self.ultimo_id = 0
+        self.cambios = 0
+        self.version = 0
+        self._indice: Dict[Any, Dict[str, Any]] = {}
+        # Clave -> registros extra con esa misma clave (fuera del índice)
+        self._repetidos: Dict[Any, int] = {}
+        self._reindexar()
+
+    def __reduce__(self):
+        # Se guardan también los índices: al restaurar (pickle) no hay que
+        # recorrer ni normalizar los registros, y pickle conserva que el
+        # índice apunte a los mismos objetos que la lista.
+        return _restaurar_almacen, (self.__class__, list(self), self.__dict__)
+
+    # --- Mantenimiento del índice ---
+
+    def _indexar(self, registro: Dict[str, Any]) -> None:
+        # Ante claves repetidas gana el primer registro, igual que en una búsqueda lineal
+        id_registro = registro.get(self.clave)
+        if self._indice.setdefault(id_registro, registro) is not registro:
+            self._repetidos[id_registro] = self._repetidos.get(id_registro, 0) + 1
+        self._observar_id(id_registro)
+        self._indexar_campos(registro)
+
+    def _indexar_campos(self, registro: Dict[str, Any]) -> None:
+        """Agrega el registro a los índices secundarios (campos modificables)."""
+        self.version += 1
+        if self.campo_nombre:
+            nombre = normalizar_nombre(registro.get(self.campo_nombre, ""))
+            self._nombres[nombre] = self._nombres.get(nombre, 0) + 1
+        for campo in self.campos_conteo:
+            conteo = self._conteos[campo]
+            valor = registro.get(campo)
+            conteo[valor] = conteo.get(valor, 0) + 1
+
+    def _desindexar_campos(self, registro: Dict[str, Any]) -> None:
+        """Quita el registro de los índices secundarios."""
+        self.version += 1
+        if self.campo_nombre:
+            nombre = normalizar_nombre(registro.get(self.campo_nombre, ""))
+            if self._nombres.get(nombre, 0) > 1:
+                self._nombres[nombre] -= 1
+            else:
+                self._nombres.pop(nombre, None)
+        for campo in self.campos_conteo:
+            conteo = self._conteos[campo]
+            valor = registro.get(campo)
+            if conteo.get(valor, 0) > 1:
+                conteo[valor] -= 1
+            else:
+                conteo.pop(valor, None)
+
+    def _reiniciar_campos(self) -> None:
+        """Vacía los índices secundarios antes de reconstruirlos."""
+        self.version += 1
+        self._nombres: Dict[str, int] = {}
+        self._conteos: Dict[str, Dict[Any, int]] = {campo: {} for campo in self.campos_conteo}
+
+    def _desindexar(self, registro: Dict[str, Any]) -> None:
+        self._desindexar_campos(registro)
+        id_registro = registro.get(self.clave)
+        repetidos = self._repetidos.get(id_registro, 0)
+        if self._indice.get(id_registro) is not registro:
+            # Era una copia repetida: el índice no cambia
+            if repetidos > 1:
+                self._repetidos[id_registro] = repetidos - 1
+            else:
+                self._repetidos.pop(id_registro, None)
+            return
+        if not repetidos:
+            del self._indice[id_registro]
+            return
+        # Solo con claves repetidas hace falta buscar el siguiente registro
+        self._indice[id_registro] = next(r for r in self if r.get(self.clave) == id_registro)
+        if repetidos > 1:
+            self._repetidos[id_registro] = repetidos - 1
+        else:
+            del self._repetidos[id_registro]
+
+    def _reindexar(self) -> None:
+        self._indice = {}
+        self._repetidos = {}
+        self._reiniciar_campos()
+        for registro in self:
+            self._indexar(registro)
+
+    # --- Consultas ---
+
+    def buscar(self, id_registro: Any) -> Optional[Dict[str, Any]]:
+        """
+        Busca un registro por su clave primaria en O(1).
+
+        Args:
+            id_registro (Any): El valor de la clave a buscar.
+
+        Returns:
+            Optional[Dict[str, Any]]: El registro o None si no existe.
+        """
+        return self._indice.get(id_registro)
+
+    def existe_nombre(self, nombre: str) -> bool:
+        """
+        Indica en O(1) si algún registro tiene el mismo nombre normalizado.
+
+        Args:
+            nombre (str): El nombre a comprobar.
+
+        Returns:
+            bool: True si el nombre ya está en uso.
+        """
+        return normalizar_nombre(nombre) in self._nombres
+
+    def contar(self, campo: str, valor: Any) -> int:
+        """
+        Devuelve en O(1) cuántos registros tienen 'campo' igual a 'valor'.
+        El campo debe estar en 'campos_conteo'.
+
+        Args:
+            campo (str): El campo contado (ej. "id_carrera").
+            valor (Any): El valor buscado (ej. "CAR001").
+
+        Returns:
+            int: Número de registros que lo referencian.
+        """
+        return self._conteos[campo].get(valor, 0)
+
+    @contextmanager
+    def editando(self, registro: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Permite modificar un registro ya agregado manteniendo los índices
+        secundarios al día. La clave primaria no debe cambiar.
+
+        Uso:
+            with lista.editando(registro):
+                registro["nombre"] = "Nuevo nombre"
+        """
+        self._desindexar_campos(registro)
+        try:
+            yield registro
+        finally:
+            self._indexar_campos(registro)
+            self._registrar_cambio()
+
+    # --- Operaciones de lista que modifican el contenido ---
+
+    def append(self, registro: Dict[str, Any]) -> None:
+        super().append(registro)
+        self._indexar(registro)
+        self._registrar_cambio()
+
+    def extend(self, registros: Iterable[Dict[str, Any]]) -> None:
+        for registro in registros:
+            self.append(registro)
+
+    def __iadd__(self, registros: Iterable[Dict[str, Any]]) -> "Almacen":
+        self.extend(registros)
+        return self
+
+    def insert(self, posicion: int, registro: Dict[str, Any]) -> None:
+        super().insert(posicion, registro)
+        self._reindexar()
+        self._registrar_cambio()
+
+    def remove(self, registro: Dict[str, Any]) -> None:
+        self.pop(posicion_de(self, registro))
+
+    def pop(self, posicion: int = -1) -> Dict[str, Any]:
+        registro = super().pop(posicion)
+        self._desindexar(registro)
+        self._registrar_cambio()
+        return registro
+
+    def clear(self) -> None:
+        super().clear()
+        self._indice = {}
+        self._repetidos = {}
+        self._reiniciar_campos()
+        self._registrar_cambio()
+
+    def __setitem__(self, posicion, valor) -> None:
+        super().__setitem__(posicion, valor)
+        self._reindexar()
+        self._registrar_cambio()
+
+    def __delitem__(self, posicion) -> None:
+        super().__delitem__(posicion)
+        self._reindexar()
+        self._registrar_cambio()
+
+
+def _restaurar_almacen(cls: type, registros: List[Dict[str, Any]], estado: Dict[str, Any]) -> Almacen:
+    """Reconstruye un Almacen (ver Almacen.__reduce__) sin volver a indexarlo."""
+    almacen = cls.__new__(cls)
+    list.extend(almacen, registros)
+    almacen.__dict__.update(estado)
+    # Los diccionarios se copian para que una copia (copy.copy) no comparta índices
+    almacen._indice = dict(almacen._indice)
+    almacen._repetidos = dict(almacen._repetidos)
+    almacen._nombres = dict(almacen._nombres)
+    almacen._conteos = {campo: dict(conteo) for campo, conteo in almacen._conteos.items()}
+    return almacen
+
+
+def editando(registros: List[Dict[str, Any]], registro: Dict[str, Any]):
+    """
+    Devuelve el contexto de edición del Almacen, o uno vacío si
+    'registros' es una lista normal (no hay índices que mantener).
+
+    Args:
+        registros (List[Dict[str, Any]]): La lista que contiene el registro.
+        registro (Dict[str, Any]): El registro a modificar.
+    """
+    if isinstance(registros, Almacen):
+        return registros.editando(registro)
+    return nullcontext(registro)
+
+
+def posicion_de(registros: List[Dict[str, Any]], registro: Dict[str, Any]) -> int:
+    """
+    Devuelve la posición de 'registro' en la lista buscándolo por identidad
+    (sin comparar con '==' cada registro anterior). Si no está, busca uno
+    igual, como list.index.
+
+    Raises:
+        ValueError: Si no hay ninguno.
+    """
+    for posicion, actual in enumerate(registros):
+        if actual is registro:
+            return posicion
+    return registros.index(registro)
+
+
+def quitar(registros: List[Dict[str, Any]], registro: Dict[str, Any]) -> None:
+    """
+    Quita un registro de la lista (un Almacen mantiene sus índices).
+    Igual que list.remove, pero buscándolo por identidad (ver 'posicion_de').
+    """
+    registros.pop(posicion_de(registros, registro))
@@ -0,0 +1,261 @@
+"""
+Módulo de Analítica (analitica.py)
+
+Reportes sobre todas las matrículas a la vez, calculados con NumPy en
+lugar de una consulta por estudiante o por curso.
+
+Se trabaja con las matrículas vigentes: la última de cada estudiante en
+cada periodo (la misma que usa 'calcular_total_creditos'). A partir de
+ellas se arman:
+- La matriz de incidencia estudiante × curso (ver 'matriz_incidencia').
+- El vector de créditos de cada curso.
+La carga de créditos de cada estudiante es 'matriz @ creditos' y los
+inscritos de cada curso son la suma de su columna. Los reportes hacen
+esas mismas cuentas sobre los pares (matrícula, curso) que forman las
+celdas no nulas de la matriz, con 'np.bincount', sin reservar memoria
+para las celdas vacías.
+
+NumPy es una dependencia opcional: si no está instalado,
+'numpy_disponible()' devuelve False y las funciones lanzan ImportError.
+"""
+from typing import List, Dict, Any, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Dependencia opcional (pip install numpy)
+    np = None
+
+import gestion_matriculas.matriculas as mat
+from gestion_matriculas.almacen import Internador
+
+# Créditos a partir de los cuales (sin incluirlos) una carga se considera excesiva
+CREDITOS_SOBRECARGA = 20
+# Etiqueta de los estudiantes cuya carrera ya no existe
+SIN_CARRERA = "(sin carrera)"
+
+
+def numpy_disponible() -> bool:
+    """Indica si NumPy está instalado (sin él no hay reportes)."""
+    return np is not None
+
+
+def _requerir_numpy() -> None:
+    if np is None:
+        raise ImportError("Los reportes de analítica necesitan NumPy (pip install numpy).")
+
+
+class TablasAnaliticas:
+    """
+    Arreglos de NumPy con las matrículas vigentes. Se arman con
+    'construir_tablas' y sirven para varios reportes seguidos.
+
+    Atributos:
+        ids_estudiantes, ids_cursos, periodos (List[str]): El valor de cada código.
+        creditos (np.ndarray): Créditos de cada curso, por código (0 si ya no existe).
+        estudiante, periodo (np.ndarray): Estudiante y periodo de cada matrícula vigente.
+        par_matricula, par_curso (np.ndarray): Los pares (matrícula vigente, curso).
+    """
+
+    def __init__(self, ids_estudiantes: List[str], ids_cursos: List[str], periodos: List[str],
+                 creditos: "np.ndarray", estudiante: "np.ndarray", periodo: "np.ndarray",
+                 par_matricula: "np.ndarray", par_curso: "np.ndarray") -> None:
+        self.ids_estudiantes = ids_estudiantes
+        self.ids_cursos = ids_cursos
+        self.periodos = periodos
+        self.creditos = creditos
+        self.estudiante = estudiante
+        self.periodo = periodo
+        self.par_matricula = par_matricula
+        self.par_curso = par_curso
+
+    def filtro_periodo(self, periodo: Optional[str]) -> "np.ndarray":
+        """Máscara de las matrículas vigentes del periodo (todas si es None)."""
+        if periodo is None:
+            return np.ones(len(self.estudiante), dtype=bool)
+        if periodo not in self.periodos:
+            return np.zeros(len(self.estudiante), dtype=bool)
+        return self.periodo == self.periodos.index(periodo)
+
+    def carga_de_creditos(self) -> "np.ndarray":
+        """Créditos de cada matrícula vigente (el producto matriz @ créditos)."""
+        return np.bincount(self.par_matricula, weights=self.creditos[self.par_curso],
+                           minlength=len(self.estudiante)).astype(np.int64)
+
+
+def construir_tablas(matriculas_db: List[Dict[str, Any]], cursos_db: List[Dict[str, Any]]) -> TablasAnaliticas:
+    """
+    Arma los arreglos de las matrículas vigentes en una pasada.
+    Con un AlmacenMatriculas se copian directamente sus columnas de enteros.
+
+    Args:
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+        cursos_db (List[Dict[str, Any]]): La BD de cursos.
+
+    Returns:
+        TablasAnaliticas: Los arreglos de los reportes.
+
+    Raises:
+        ImportError: Si NumPy no está instalado.
+    """
+    _requerir_numpy()
+    if isinstance(matriculas_db, mat.AlmacenMatriculas):
+        estudiantes, cursos, periodos = matriculas_db.estudiantes, matriculas_db.cursos, matriculas_db.periodos
+        col_estudiante = np.array(matriculas_db.col_estudiante, dtype=np.int64)
+        col_periodo = np.array(matriculas_db.col_periodo, dtype=np.int64)
+        offsets = np.array(matriculas_db.offsets, dtype=np.int64)
+        col_cursos = np.array(matriculas_db.col_cursos, dtype=np.int64)
+    else:
+        estudiantes, cursos, periodos = Internador(), Internador(), Internador()
+        filas_est, filas_per, lista_offsets, lista_cursos = [], [], [0], []
+        for matricula in matriculas_db:
+            filas_est.append(estudiantes.codigo(matricula["id_estudiante"]))
+            filas_per.append(periodos.codigo(matricula["periodo_academico"]))
+            lista_cursos.extend(cursos.codigo(id_curso) for id_curso in matricula["id_cursos"])
+            lista_offsets.append(len(lista_cursos))
+        col_estudiante = np.array(filas_est, dtype=np.int64)
+        col_periodo = np.array(filas_per, dtype=np.int64)
+        offsets = np.array(lista_offsets, dtype=np.int64)
+        col_cursos = np.array(lista_cursos, dtype=np.int64)
+
+    creditos_por_id = {curso["id_curso"]: curso.get("creditos", 0) for curso in cursos_db}
+    creditos = np.array([creditos_por_id.get(id_curso, 0) for id_curso in cursos.valores], dtype=np.int64)
+
+    # Vigente = última aparición de cada (estudiante, periodo): la primera en el orden inverso
+    total = len(col_estudiante)
+    clave = col_estudiante * max(len(periodos), 1) + col_periodo
+    _, primeras = np.unique(clave[::-1], return_index=True)
+    vigentes = np.sort(total - 1 - primeras)
+
+    posicion = np.full(total, -1, dtype=np.int64)
+    posicion[vigentes] = np.arange(len(vigentes))
+    fila_de_curso = np.repeat(np.arange(total), np.diff(offsets))
+    en_vigente = posicion[fila_de_curso] >= 0
+
+    return TablasAnaliticas(
+        ids_estudiantes=list(estudiantes.valores),
+        ids_cursos=list(cursos.valores),
+        periodos=list(periodos.valores),
+        creditos=creditos,
+        estudiante=col_estudiante[vigentes],
+        periodo=col_periodo[vigentes],
+        par_matricula=posicion[fila_de_curso[en_vigente]],
+        par_curso=col_cursos[en_vigente],
+    )
+
+
+def matriz_incidencia(tablas: TablasAnaliticas, periodo: Optional[str] = None) -> "np.ndarray":
+    """
+    Matriz densa estudiante × curso (1 si el estudiante está inscrito en el
+    curso en el periodo; sin periodo, en cualquiera). Las filas y columnas
+    siguen el orden de 'ids_estudiantes' e 'ids_cursos'. Ocupa un byte por
+    celda: para reportes sobre muchos datos conviene usar los pares.
+    """
+    matriz = np.zeros((len(tablas.ids_estudiantes), len(tablas.ids_cursos)), dtype=np.uint8)
+    en_periodo = tablas.filtro_periodo(periodo)[tablas.par_matricula]
+    matriz[tablas.estudiante[tablas.par_matricula[en_periodo]], tablas.par_curso[en_periodo]] = 1
+    return matriz
+
+
+def inscritos_por_curso(tablas: TablasAnaliticas, periodo: Optional[str] = None) -> Dict[str, int]:
+    """
+    Cuenta los estudiantes distintos de cada curso (la suma de cada columna
+    de la matriz de incidencia).
+
+    Returns:
+        Dict[str, int]: {id_curso: inscritos}, de mayor a menor; solo cursos con inscritos.
+    """
+    en_periodo = tablas.filtro_periodo(periodo)[tablas.par_matricula]
+    cantidad_cursos = len(tablas.ids_cursos)
+    celdas = np.unique(tablas.estudiante[tablas.par_matricula[en_periodo]] * cantidad_cursos
+                       + tablas.par_curso[en_periodo])
+    conteos = np.bincount(celdas % max(cantidad_cursos, 1), minlength=cantidad_cursos)
+    orden = np.argsort(-conteos, kind="stable")
+    return {tablas.ids_cursos[c]: int(conteos[c]) for c in orden if conteos[c] > 0}
+
+
+def carga_por_carrera(tablas: TablasAnaliticas, estudiantes_db: List[Dict[str, Any]],
+                      periodo: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Distribución de la carga de créditos de los estudiantes de cada carrera.
+    Todas las carreras se resuelven con un solo ordenamiento.
+
+    Returns:
+        Dict[str, Dict[str, float]]: {id_carrera: {"estudiantes", "promedio",
+        "minimo", "mediana", "maximo"}}, ordenado por ID de carrera.
+    """
+    carrera_por_id = {estudiante["id_estudiante"]: estudiante.get("id_carrera") for estudiante in estudiantes_db}
+    carreras = Internador()
+    carrera_de_estudiante = np.array(
+        [carreras.codigo(carrera_por_id.get(id_est) or SIN_CARRERA) for id_est in tablas.ids_estudiantes],
+        dtype=np.int64
+    )
+    filtro = tablas.filtro_periodo(periodo)
+    cargas = tablas.carga_de_creditos()[filtro]
+    grupos = carrera_de_estudiante[tablas.estudiante[filtro]]
+
+    orden = np.lexsort((cargas, grupos))
+    ordenadas = cargas[orden]
+    conteos = np.bincount(grupos, minlength=len(carreras))
+    sumas = np.bincount(grupos, weights=cargas, minlength=len(carreras))
+    inicios = np.cumsum(conteos) - conteos
+
+    reporte = {}
+    for codigo in sorted(range(len(carreras)), key=carreras.valor):
+        cantidad = int(conteos[codigo])
+        if cantidad == 0:
+            continue
+        inicio = inicios[codigo]
+        mediana = (ordenadas[inicio + (cantidad - 1) // 2] + ordenadas[inicio + cantidad // 2]) / 2
+        reporte[carreras.valor(codigo)] = {
+            "estudiantes": cantidad,
+            "promedio": float(sumas[codigo] / cantidad),
+            "minimo": int(ordenadas[inicio]),
+            "mediana": float(mediana),
+            "maximo": int(ordenadas[inicio + cantidad - 1]),
+        }
+    return reporte
+
+
+def estudiantes_sobrecargados(tablas: TablasAnaliticas, periodo: Optional[str] = None,
+                              maximo: int = CREDITOS_SOBRECARGA) -> List[Dict[str, Any]]:
+    """
+    Lista las matrículas vigentes con más de 'maximo' créditos, de mayor a menor.
+
+    Returns:
+        List[Dict[str, Any]]: Filas {"id_estudiante", "periodo", "creditos"}.
+    """
+    cargas = tablas.carga_de_creditos()
+    filas = np.flatnonzero(tablas.filtro_periodo(periodo) & (cargas > maximo))
+    filas = filas[np.argsort(-cargas[filas], kind="stable")]
+    return [
+        {
+            "id_estudiante": tablas.ids_estudiantes[tablas.estudiante[fila]],
+            "periodo": tablas.periodos[tablas.periodo[fila]],
+            "creditos": int(cargas[fila]),
+        }
+        for fila in filas
+    ]
+
+
+def tendencia_por_periodo(tablas: TablasAnaliticas) -> List[Dict[str, Any]]:
+    """
+    Totales de cada periodo: estudiantes matriculados, cupos ocupados
+    (inscripciones a cursos) y créditos totales y promedio.
+
+    Returns:
+        List[Dict[str, Any]]: Una fila por periodo, en orden de periodo.
+    """
+    cantidad = len(tablas.periodos)
+    estudiantes = np.bincount(tablas.periodo, minlength=cantidad)
+    inscripciones = np.bincount(tablas.periodo[tablas.par_matricula], minlength=cantidad)
+    creditos = np.bincount(tablas.periodo, weights=tablas.carga_de_creditos(), minlength=cantidad)
+    return [
+        {
+            "periodo": tablas.periodos[codigo],
+            "estudiantes": int(estudiantes[codigo]),
+            "inscripciones": int(inscripciones[codigo]),
+            "creditos": int(creditos[codigo]),
+            "creditos_promedio": float(creditos[codigo] / estudiantes[codigo]) if estudiantes[codigo] else 0.0,
+        }
+        for codigo in sorted(range(cantidad), key=lambda c: tablas.periodos[c])
+    ]
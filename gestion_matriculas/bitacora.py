@@ -0,0 +1,220 @@
+"""
+Módulo de Bitácora de Cambios (bitacora.py)
+
+Permite modificar los CSV de estudiantes, cursos y carreras sin
+reescribirlos completos:
+- Un registro nuevo se añade como una fila al final del CSV.
+- Las actualizaciones y eliminaciones se anotan en una bitácora junto
+  al CSV (ej. estudiantes_cambios.jsonl, un cambio JSON por línea).
+
+Al cargar, las funciones 'cargar_*' leen el CSV y luego reproducen la
+bitácora. Reproducirla dos veces da el mismo resultado (una actualización
+deja los mismos valores y eliminar un ID que ya no está no hace nada), así
+que si el programa se corta entre reescribir el CSV y vaciar la bitácora
+no se pierde ni se duplica nada.
+"""
+import csv
+import io
+import json
+import os
+from typing import List, Dict, Any, Set
+
+from gestion_matriculas.almacen import Almacen, SeguimientoCambios, quitar
+from gestion_matriculas.utils import escritura_atomica, lista_a_texto
+
+# Tamaño de la bitácora (en bytes) a partir del cual conviene reescribir el CSV
+BITACORA_MAX_BYTES = 256 * 1024
+
+
+def ruta_bitacora(ruta_csv: str) -> str:
+    """Devuelve la ruta de la bitácora de un CSV (data/cursos.csv -> data/cursos_cambios.jsonl)."""
+    base, _ = os.path.splitext(ruta_csv)
+    return f"{base}_cambios.jsonl"
+
+
+def anexar_fila(ruta_csv: str, campos: List[str], registro: Dict[str, Any]) -> None:
+    """
+    Añade un registro como última fila del CSV (con el encabezado si el
+    archivo no existe). El costo no depende del tamaño del archivo.
+    Los errores de E/S se propagan.
+
+    Args:
+        ruta_csv (str): El archivo CSV.
+        campos (List[str]): Las columnas, en orden.
+        registro (Dict[str, Any]): El registro a añadir.
+    """
+    anexar_filas(ruta_csv, campos, [registro])
+
+
+def anexar_filas(ruta_csv: str, campos: List[str], registros: List[Dict[str, Any]]) -> None:
+    """
+    Añade varios registros al final del CSV abriendo el archivo una sola
+    vez (ej. una importación en lote). Las listas se guardan separadas por
+    ';' (ver utils.lista_a_texto). Los errores de E/S se propagan.
+    """
+    _actualizar_encabezado(ruta_csv, campos)
+    nuevo = not os.path.exists(ruta_csv) or os.path.getsize(ruta_csv) == 0
+    with open(ruta_csv, mode='a', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=campos, extrasaction='ignore')
+        if nuevo:
+            writer.writeheader()
+        writer.writerows({campo: lista_a_texto(registro.get(campo)) for campo in campos} for registro in registros)
+
+
+def _actualizar_encabezado(ruta_csv: str, campos: List[str]) -> None:
+    """
+    Si el CSV tiene otras columnas (ej. se escribió antes de agregar una),
+    lo reescribe una sola vez con las actuales, para que las filas que se
+    añadan queden alineadas con el encabezado. Si coincide solo se lee la
+    primera línea.
+    """
+    try:
+        with open(ruta_csv, mode='r', newline='', encoding='utf-8') as file:
+            encabezado = next(csv.reader(file), None)
+    except FileNotFoundError:
+        return
+    if encabezado is None or encabezado == list(campos):
+        return
+    filas = leer_filas(ruta_csv, campos)
+    with escritura_atomica(ruta_csv, newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=campos, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows({campo: fila.get(campo) for campo in campos} for fila in filas)
+
+
+def linea_de_cambio(operacion: str, clave: str, registro: Dict[str, Any]) -> str:
+    """
+    Arma la línea de bitácora de un cambio.
+
+    Args:
+        operacion (str): "actualizar" o "eliminar".
+        clave (str): Campo que identifica al registro (ej. "id_curso").
+        registro (Dict[str, Any]): El registro completo al actualizar,
+            o solo {clave: id} al eliminar.
+
+    Returns:
+        str: La línea JSON, terminada en salto de línea.
+    """
+    if operacion == "eliminar":
+        cambio = {"operacion": operacion, "id": registro[clave]}
+    else:
+        cambio = {"operacion": operacion, "registro": dict(registro)}
+    return json.dumps(cambio, ensure_ascii=False) + "\n"
+
+
+def anexar_linea(ruta_csv: str, linea: str) -> None:
+    """Añade una línea (ver 'linea_de_cambio') a la bitácora del CSV. Los errores se propagan."""
+    with open(ruta_bitacora(ruta_csv), mode='a', encoding='utf-8') as file:
+        file.write(linea)
+
+
+def leer_filas(ruta_csv: str, campos: List[str], desde: int = 0) -> List[Dict[str, Any]]:
+    """
+    Lee las filas del CSV a partir de una posición en bytes (ej. las que
+    otro proceso añadió con 'anexar_fila' después de una lectura anterior).
+
+    Args:
+        ruta_csv (str): El archivo CSV.
+        campos (List[str]): Las columnas, en orden.
+        desde (int): Posición desde la que leer; 0 lee el archivo completo.
+
+    Returns:
+        List[Dict[str, Any]]: Las filas, como diccionarios.
+    """
+    try:
+        with open(ruta_csv, mode='rb') as file:
+            file.seek(desde)
+            texto = file.read().decode('utf-8')
+    except FileNotFoundError:
+        return []
+    lector = csv.DictReader(io.StringIO(texto, newline=''), fieldnames=None if desde == 0 else campos)
+    return list(lector)
+
+
+def leer_cambios(ruta_csv: str, desde: int = 0) -> List[Dict[str, Any]]:
+    """
+    Lee los cambios anotados desde la última reescritura del CSV (o, con
+    'desde', los que se anotaron a partir de esa posición en bytes).
+    Una línea incompleta (ej. por un corte durante la escritura) se ignora.
+    """
+    cambios = []
+    try:
+        with open(ruta_bitacora(ruta_csv), mode='rb') as file:
+            file.seek(desde)
+            for num_linea, linea in enumerate(file, 1):
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    cambios.append(json.loads(linea))
+                except json.JSONDecodeError:
+                    print(f"Advertencia: Línea {num_linea} de {ruta_bitacora(ruta_csv)} corrupta. Se ignora.")
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"Error inesperado al leer la bitácora de {ruta_csv}: {e}")
+    return cambios
+
+
+def aplicar_cambios(registros: List[Dict[str, Any]], ruta_csv: str, clave: str) -> None:
+    """
+    Reproduce la bitácora del CSV sobre los registros recién cargados.
+    Al terminar, los registros quedan marcados como guardados.
+
+    Args:
+        registros (List[Dict[str, Any]]): Los registros leídos del CSV.
+        ruta_csv (str): El archivo CSV del que se leyeron.
+        clave (str): Campo que identifica a cada registro.
+    """
+    aplicar(registros, leer_cambios(ruta_csv), clave)
+    if isinstance(registros, SeguimientoCambios):
+        registros.marcar_guardado()
+
+
+def aplicar(registros: List[Dict[str, Any]], cambios: List[Dict[str, Any]], clave: str) -> Set[Any]:
+    """
+    Aplica una lista de cambios de bitácora sobre los registros.
+
+    Returns:
+        Set[Any]: Los IDs a los que se refieren los cambios.
+    """
+    tocados = set()
+    for cambio in cambios:
+        if cambio.get("operacion") == "eliminar":
+            id_registro = cambio.get("id")
+        else:
+            id_registro = cambio.get("registro", {}).get(clave)
+        tocados.add(id_registro)
+
+        if isinstance(registros, Almacen):
+            actual = registros.buscar(id_registro)
+        else:
+            actual = next((r for r in registros if r[clave] == id_registro), None)
+        if actual is None:
+            continue
+
+        if cambio.get("operacion") == "eliminar":
+            quitar(registros, actual)
+        elif cambio.get("operacion") == "actualizar":
+            valores = {campo: valor for campo, valor in cambio["registro"].items() if campo in actual}
+            if isinstance(registros, Almacen):
+                with registros.editando(actual):
+                    actual.update(valores)
+            else:
+                actual.update(valores)
+    return tocados
+
+
+def vaciar_bitacora(ruta_csv: str) -> None:
+    """Vacía la bitácora del CSV (tras reescribirlo completo). Los errores se propagan."""
+    ruta = ruta_bitacora(ruta_csv)
+    if os.path.exists(ruta):
+        open(ruta, mode='w', encoding='utf-8').close()
+
+
+def tamano_bitacora(ruta_csv: str) -> int:
+    """Devuelve el tamaño en bytes de la bitácora del CSV (0 si no existe)."""
+    try:
+        return os.path.getsize(ruta_bitacora(ruta_csv))
+    except OSError:
+        return 0
@@ -6,11 +6,32 @@ todas las funciones CRUD (Crear, Leer, Actualizar, Eliminar)
 para interactuar con la fuente de datos (carreras.csv).
 """
 import csv
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable
+
+from gestion_matriculas import bitacora
+from gestion_matriculas.almacen import Almacen, normalizar_nombre, quitar
+from gestion_matriculas.registros import Carrera
+from gestion_matriculas.utils import escritura_atomica
 
 # Constante para el nombre del archivo
 FILE_PATH = "data/carreras.csv"
 FILE_HEADERS = ["id_carrera", "nombre_carrera"]
+# Formato binario de ancho fijo opcional (ver tabla_fija.py): nombre, tipo y ancho mínimo
+TABLA_PATH = "data/carreras.dat"
+CAMPOS_FIJOS = (("id_carrera", "s", 8), ("nombre_carrera", "s", 64))
+
+
+def crear_almacen_carreras(registros: Iterable[Dict[str, Any]] = ()) -> Almacen:
+    """
+    Crea un Almacen de carreras indexado por 'id_carrera' y por nombre normalizado.
+
+    Args:
+        registros (Iterable[Dict[str, Any]]): Carreras iniciales.
+
+    Returns:
+        Almacen: Lista de carreras con búsqueda O(1) por ID.
+    """
+    return Almacen(registros, "id_carrera", prefijo="CAR", ancho=3, campo_nombre="nombre_carrera")
 
 
 def cargar_carreras() -> List[Dict[str, Any]]:
@@ -19,17 +40,34 @@ def cargar_carreras() -> List[Dict[str, Any]]:
     Maneja FileNotFoundError si el archivo no existe.
 
     Returns:
-        List[Dict[str, Any]]: Lista de diccionarios de carreras.
+        List[Dict[str, Any]]: Lista de carreras (registros 'Carrera',
+        que se usan igual que un diccionario).
     """
     try:
         with open(FILE_PATH, mode='r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
-            return list(reader)
+            carreras = crear_almacen_carreras(Carrera.desde_dict(fila) for fila in reader)
+        bitacora.aplicar_cambios(carreras, FILE_PATH, "id_carrera")
+        return carreras
     except FileNotFoundError:
-        return []
+        return crear_almacen_carreras()
     except Exception as e:
         print(f"Error inesperado al cargar carreras: {e}")
-        return []
+        return crear_almacen_carreras()
+
+
+def escribir_carreras(carreras: List[Dict[str, Any]]) -> None:
+    """
+    Escribe las carreras en el CSV. Las excepciones de E/S se propagan.
+
+    Args:
+        carreras (List[Dict[str, Any]]): La lista de carreras a guardar.
+    """
+    with escritura_atomica(FILE_PATH, newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=FILE_HEADERS)
+        writer.writeheader()
+        if carreras:
+            writer.writerows(carreras)
 
 
 def guardar_carreras(carreras: List[Dict[str, Any]]) -> None:
@@ -41,11 +79,7 @@ def guardar_carreras(carreras: List[Dict[str, Any]]) -> None:
         carreras (List[Dict[str, Any]]): La lista de carreras a guardar.
     """
     try:
-        with open(FILE_PATH, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=FILE_HEADERS)
-            writer.writeheader()
-            if carreras:
-                writer.writerows(carreras)
+        escribir_carreras(carreras)
     except IOError as e:
         print(f"Error al guardar carreras en el archivo: {e}")
     except Exception as e:
@@ -63,17 +97,43 @@ def buscar_carrera_por_id(carreras: List[Dict[str, Any]], id_carrera: str) -> Op
     Returns:
         Optional[Dict[str, Any]]: El diccionario de la carrera o None si no se encuentra.
     """
+    if isinstance(carreras, Almacen):
+        return carreras.buscar(id_carrera)
+
     for carrera in carreras:
         if carrera["id_carrera"] == id_carrera:
             return carrera
     return None
 
 
+def existe_nombre_carrera(carreras: List[Dict[str, Any]], nombre: str) -> bool:
+    """
+    Indica si ya existe una carrera con el mismo nombre.
+    La comparación ignora mayúsculas, tildes y espacios sobrantes.
+
+    Args:
+        carreras (List[Dict[str, Any]]): La lista de carreras.
+        nombre (str): El nombre a comprobar.
+
+    Returns:
+        bool: True si el nombre ya está registrado.
+    """
+    if isinstance(carreras, Almacen):
+        return carreras.existe_nombre(nombre)
+
+    nombre_normalizado = normalizar_nombre(nombre)
+    return any(normalizar_nombre(carrera["nombre_carrera"]) == nombre_normalizado for carrera in carreras)
+
+
 def _generar_nuevo_id_carrera(carreras: List[Dict[str, Any]]) -> str:
     """
     Genera un ID de carrera único y robusto (ej. CAR001, CAR002).
     Se basa en el ID máximo existente para evitar colisiones.
+    Con un Almacen usa su marca de agua (O(1)) en lugar de recorrer la lista.
     """
+    if isinstance(carreras, Almacen):
+        return carreras.proximo_id()
+
     if not carreras:
         return "CAR001"
 
@@ -103,13 +163,33 @@ def crear_carrera(carreras: List[Dict[str, Any]], nombre_carrera: str) -> Dict[s
         Dict[str, Any]: La nueva carrera.
     """
     nuevo_id = _generar_nuevo_id_carrera(carreras)
-    nueva_carrera = {
-        "id_carrera": nuevo_id,
-        "nombre_carrera": nombre_carrera
-    }
+    nueva_carrera = Carrera(
+        id_carrera=nuevo_id,
+        nombre_carrera=nombre_carrera
+    )
     return nueva_carrera
 
 
+def crear_carreras(carreras: List[Dict[str, Any]], nombres: List[str]) -> List[Dict[str, Any]]:
+    """
+    Crea varias carreras con un bloque de IDs consecutivos (ej. al importar).
+    No las agrega a la lista.
+
+    Args:
+        carreras (List[Dict[str, Any]]): La lista actual (para generar los IDs).
+        nombres (List[str]): Los nombres de las carreras, en orden.
+
+    Returns:
+        List[Dict[str, Any]]: Las nuevas carreras.
+    """
+    if isinstance(carreras, Almacen):
+        ids = carreras.reservar_ids(len(nombres))
+    else:
+        inicio = int(_generar_nuevo_id_carrera(carreras)[3:])
+        ids = [f"CAR{str(numero).zfill(3)}" for numero in range(inicio, inicio + len(nombres))]
+    return [Carrera(id_carrera=nuevo_id, nombre_carrera=nombre) for nuevo_id, nombre in zip(ids, nombres)]
+
+
 def actualizar_carrera(carrera: Dict[str, Any], nombre_carrera: Optional[str]) -> None:
     """
     Actualiza el nombre de una carrera.
@@ -136,7 +216,7 @@ def eliminar_carrera(carreras: List[Dict[str, Any]], id_carrera: str) -> bool:
     carrera_a_eliminar = buscar_carrera_por_id(carreras, id_carrera)
 
     if carrera_a_eliminar:
-        carreras.remove(carrera_a_eliminar)
+        quitar(carreras, carrera_a_eliminar)
         return True
 
     return False
\ No newline at end of file
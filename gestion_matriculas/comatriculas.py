@@ -0,0 +1,125 @@
+"""
+Módulo de Co-matrículas (comatriculas.py)
+
+Cuenta, para cada par de cursos, cuántos estudiantes los tomaron juntos
+en un mismo periodo (ej. para no programarlos a la misma hora).
+
+La matriz curso × curso es dispersa: solo se guardan los pares que
+aparecen en alguna matrícula, como un diccionario de vecinos por curso
+(en los dos sentidos, así consultar un curso cuesta en proporción a sus
+vecinos). Igual que en los totales de créditos, cuenta solo la última
+matrícula de cada estudiante en cada periodo: si se matricula de nuevo,
+se restan los pares de la matrícula anterior y se suman los de la nueva.
+"""
+import heapq
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+
+class CoMatriculas:
+    """
+    Conteos dispersos de co-matrícula por periodo, que se actualizan con
+    cada matrícula nueva (ver 'registrar').
+    """
+
+    def __init__(self) -> None:
+        # periodo -> curso -> {otro curso: estudiantes que tomaron ambos}
+        self._pares: Dict[str, Dict[str, Counter]] = {}
+        # (estudiante, periodo) -> cursos de su matrícula vigente
+        self._vigentes: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+
+    def _sumar(self, periodo: str, cursos: Tuple[str, ...], cantidad: int) -> None:
+        # 'cantidad' es 1 (sumar la matrícula) o -1 (restarla)
+        vecinos_del_periodo = self._pares.setdefault(periodo, {})
+        for curso in cursos:
+            otros = [otro for otro in cursos if otro != curso]
+            if not otros:
+                continue
+            vecinos = vecinos_del_periodo.get(curso)
+            if cantidad > 0:
+                if vecinos is None:
+                    vecinos = vecinos_del_periodo[curso] = Counter()
+                vecinos.update(otros)
+                continue
+            vecinos.subtract(otros)
+            for otro in otros:
+                if vecinos[otro] <= 0:
+                    del vecinos[otro]
+            if not vecinos:
+                del vecinos_del_periodo[curso]
+
+    def registrar(self, id_estudiante: str, periodo: str, ids_cursos: Iterable[str]) -> None:
+        """
+        Incorpora una matrícula nueva (O(cursos²) de la matrícula).
+        Reemplaza a la matrícula anterior del estudiante en el mismo periodo.
+        """
+        cursos = tuple(dict.fromkeys(ids_cursos))
+        anteriores = self._vigentes.get((id_estudiante, periodo))
+        if anteriores is not None:
+            self._sumar(periodo, anteriores, -1)
+        self._vigentes[(id_estudiante, periodo)] = cursos
+        self._sumar(periodo, cursos, 1)
+
+    def periodos(self) -> List[str]:
+        """Devuelve los periodos con pares de cursos, ordenados."""
+        return sorted(periodo for periodo, vecinos in self._pares.items() if vecinos)
+
+    def grafo(self, periodo: str) -> Dict[str, Counter]:
+        """
+        Devuelve el grafo de conflictos del periodo: {curso: {otro curso:
+        estudiantes en común}}, solo con los cursos que comparten estudiantes.
+        Es la estructura interna: no debe modificarse.
+        """
+        return self._pares.get(periodo, {})
+
+    def vigentes(self, periodo: str) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        """Recorre las matrículas vigentes del periodo como pares (id_estudiante, cursos)."""
+        for (id_estudiante, periodo_matricula), cursos in self._vigentes.items():
+            if periodo_matricula == periodo:
+                yield id_estudiante, cursos
+
+    def vecinos(self, id_curso: str, periodo: Optional[str] = None) -> Counter:
+        """Devuelve {otro curso: estudiantes en común} del curso, en un periodo o sumando todos."""
+        if periodo is not None:
+            return Counter(self._pares.get(periodo, {}).get(id_curso, {}))
+        total: Counter = Counter()
+        for vecinos_del_periodo in self._pares.values():
+            total.update(vecinos_del_periodo.get(id_curso, {}))
+        return total
+
+    def conteo(self, curso_a: str, curso_b: str, periodo: Optional[str] = None) -> int:
+        """Estudiantes que tomaron ambos cursos en el periodo (en cualquiera si es None)."""
+        periodos = [periodo] if periodo is not None else list(self._pares)
+        return sum(self._pares.get(p, {}).get(curso_a, {}).get(curso_b, 0) for p in periodos)
+
+    def mas_frecuentes(self, id_curso: str, periodo: Optional[str] = None, k: int = 5) -> List[Tuple[str, int]]:
+        """
+        Devuelve los k cursos que más se toman junto con 'id_curso'.
+
+        Args:
+            id_curso (str): El curso consultado.
+            periodo (Optional[str]): Un periodo, o None para sumar todos.
+            k (int): Cuántos cursos devolver.
+
+        Returns:
+            List[Tuple[str, int]]: Pares (id_curso, estudiantes en común), de mayor
+            a menor (a igual conteo, por ID).
+        """
+        vecinos = self.vecinos(id_curso, periodo)
+        return heapq.nsmallest(k, vecinos.items(), key=lambda par: (-par[1], par[0]))
+
+
+def construir_comatriculas(matriculas_db: Iterable[Dict[str, Any]]) -> CoMatriculas:
+    """
+    Arma los conteos recorriendo una vez las matrículas (en orden de registro).
+
+    Args:
+        matriculas_db (Iterable[Dict[str, Any]]): La BD de matrículas.
+
+    Returns:
+        CoMatriculas: Los conteos de todos los periodos.
+    """
+    comatriculas = CoMatriculas()
+    for matricula in matriculas_db:
+        comatriculas.registrar(matricula["id_estudiante"], matricula["periodo_academico"], matricula["id_cursos"])
+    return comatriculas
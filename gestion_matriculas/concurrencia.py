@@ -0,0 +1,92 @@
+"""
+Módulo de Concurrencia (concurrencia.py)
+
+Herramientas para que varias terminales usen el mismo directorio 'data/':
+- BloqueoArchivo: bloqueo exclusivo entre procesos sobre un archivo
+  (consultivo: solo lo respetan los procesos que también lo piden).
+  Usa 'fcntl.flock' en Linux/Mac y 'msvcrt.locking' en Windows.
+- sello_version: el "sello" de un archivo (inodo, tamaño y fecha de
+  modificación) para saber si otro proceso lo cambió desde que se leyó.
+"""
+import os
+import threading
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# (inodo, tamaño en bytes, fecha de modificación en ns)
+Sello = Tuple[int, int, int]
+
+
+def sello_version(ruta: str) -> Optional[Sello]:
+    """Devuelve el sello de versión del archivo, o None si no existe."""
+    try:
+        estado = os.stat(ruta)
+    except OSError:
+        return None
+    return (estado.st_ino, estado.st_size, estado.st_mtime_ns)
+
+
+def solo_crecio(anterior: Optional[Sello], actual: Optional[Sello]) -> bool:
+    """
+    Indica si, entre dos sellos, el archivo solo pudo recibir líneas al
+    final (mismo inodo y tamaño igual o mayor, o recién creado). Si se
+    reemplazó o se truncó, devuelve False.
+    """
+    if anterior is None or actual is None:
+        return actual is None or anterior is None
+    return anterior[0] == actual[0] and actual[1] >= anterior[1]
+
+
+class BloqueoArchivo:
+    """
+    Bloqueo exclusivo entre procesos, usado como 'with bloqueo: ...'.
+    Es reentrante dentro del mismo proceso: un bloque anidado no vuelve
+    a pedir el bloqueo al sistema operativo.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        self.ruta = ruta
+        self._archivo = None
+        self._nivel = 0
+        self._candado = threading.RLock()
+
+    def __enter__(self) -> "BloqueoArchivo":
+        self._candado.acquire()
+        if self._nivel == 0:
+            try:
+                directorio = os.path.dirname(self.ruta)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                archivo = open(self.ruta, mode='a+b')
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+                    else:
+                        archivo.seek(0)
+                        msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+                except BaseException:
+                    archivo.close()
+                    raise
+            except BaseException:
+                self._candado.release()
+                raise
+            self._archivo = archivo
+        self._nivel += 1
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self._nivel -= 1
+        if self._nivel == 0:
+            if fcntl is not None:
+                fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+            else:
+                self._archivo.seek(0)
+                msvcrt.locking(self._archivo.fileno(), msvcrt.LK_UNLCK, 1)
+            self._archivo.close()
+            self._archivo = None
+        self._candado.release()
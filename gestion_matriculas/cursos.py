@@ -6,11 +6,53 @@ todas las funciones CRUD (Crear, Leer, Actualizar, Eliminar)
 para interactuar con la fuente de datos (cursos.csv).
 """
 import csv
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+
+from gestion_matriculas import bitacora
+from gestion_matriculas.almacen import Almacen, quitar
+from gestion_matriculas.registros import Curso
+from gestion_matriculas.utils import escritura_atomica, lista_a_texto
 
 # Constante para el nombre del archivo
 FILE_PATH = "data/cursos.csv"
-FILE_HEADERS = ["id_curso", "nombre_curso", "creditos"]
+FILE_HEADERS = ["id_curso", "nombre_curso", "creditos", "prerrequisitos"]
+# Formato binario de ancho fijo opcional (ver tabla_fija.py): nombre, tipo y ancho mínimo
+TABLA_PATH = "data/cursos.dat"
+CAMPOS_FIJOS = (("id_curso", "s", 8), ("nombre_curso", "s", 64), ("creditos", "i", 4), ("prerrequisitos", "s", 32))
+# Créditos máximos que se aceptan al importar cursos desde un archivo
+CREDITOS_MAX = 30
+
+
+def crear_almacen_cursos(registros: Iterable[Dict[str, Any]] = ()) -> Almacen:
+    """
+    Crea un Almacen de cursos indexado por 'id_curso'.
+
+    Args:
+        registros (Iterable[Dict[str, Any]]): Cursos iniciales.
+
+    Returns:
+        Almacen: Lista de cursos con búsqueda O(1) por ID.
+    """
+    return Almacen(registros, "id_curso", prefijo="C", ancho=3)
+
+
+def curso_desde_fila(fila: Dict[str, Any]) -> Curso:
+    """
+    Crea un 'Curso' a partir de una fila del CSV, convirtiendo 'creditos' a entero.
+
+    Args:
+        fila (Dict[str, Any]): La fila leída (ej. con csv.DictReader).
+
+    Returns:
+        Curso: El curso (con 0 créditos si el valor no es válido).
+    """
+    curso = Curso.desde_dict(fila)
+    try:
+        curso.creditos = int(curso.creditos)
+    except (ValueError, TypeError):
+        print(f"Advertencia: 'creditos' no válido para {curso.id_curso}. Se usará 0.")
+        curso.creditos = 0
+    return curso
 
 
 def cargar_cursos() -> List[Dict[str, Any]]:
@@ -20,25 +62,45 @@ def cargar_cursos() -> List[Dict[str, Any]]:
     Convierte 'creditos' a entero.
 
     Returns:
-        List[Dict[str, Any]]: Lista de diccionarios de cursos.
+        List[Dict[str, Any]]: Lista de cursos (registros 'Curso',
+        que se usan igual que un diccionario).
     """
-    cursos = []
+    cursos = crear_almacen_cursos()
     try:
         with open(FILE_PATH, mode='r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
             for row in reader:
-                try:
-                    row['creditos'] = int(row['creditos'])
-                except (ValueError, TypeError):
-                    print(f"Advertencia: 'creditos' no válido para {row.get('id_curso')}. Se usará 0.")
-                    row['creditos'] = 0
-                cursos.append(row)
-            return cursos
+                cursos.append(curso_desde_fila(row))
+        bitacora.aplicar_cambios(cursos, FILE_PATH, "id_curso")
+        return cursos
     except FileNotFoundError:
-        return []
+        return crear_almacen_cursos()
     except Exception as e:
         print(f"Error inesperado al cargar cursos: {e}")
-        return []
+        return crear_almacen_cursos()
+
+
+def escribir_cursos(cursos: List[Dict[str, Any]]) -> None:
+    """
+    Igual que 'guardar_cursos', pero sin capturar los errores de escritura.
+
+    Args:
+        cursos (List[Dict[str, Any]]): La lista de cursos a guardar.
+    """
+    with escritura_atomica(FILE_PATH, newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=FILE_HEADERS)
+        writer.writeheader()
+        if cursos:
+            cursos_a_guardar = []
+            for curso in cursos:
+                curso_filtrado = {
+                    "id_curso": curso.get("id_curso"),
+                    "nombre_curso": curso.get("nombre_curso"),
+                    "creditos": curso.get("creditos", 0),
+                    "prerrequisitos": lista_a_texto(curso.get("prerrequisitos") or [])
+                }
+                cursos_a_guardar.append(curso_filtrado)
+            writer.writerows(cursos_a_guardar)
 
 
 def guardar_cursos(cursos: List[Dict[str, Any]]) -> None:
@@ -50,19 +112,7 @@ def guardar_cursos(cursos: List[Dict[str, Any]]) -> None:
         cursos (List[Dict[str, Any]]): La lista de cursos a guardar.
     """
     try:
-        with open(FILE_PATH, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=FILE_HEADERS)
-            writer.writeheader()
-            if cursos:
-                cursos_a_guardar = []
-                for curso in cursos:
-                    curso_filtrado = {
-                        "id_curso": curso.get("id_curso"),
-                        "nombre_curso": curso.get("nombre_curso"),
-                        "creditos": curso.get("creditos", 0)
-                    }
-                    cursos_a_guardar.append(curso_filtrado)
-                writer.writerows(cursos_a_guardar)
+        escribir_cursos(cursos)
     except IOError as e:
         print(f"Error al guardar cursos en el archivo: {e}")
     except Exception as e:
@@ -80,6 +130,9 @@ def buscar_curso_por_id(cursos: List[Dict[str, Any]], id_curso: str) -> Optional
     Returns:
         Optional[Dict[str, Any]]: El diccionario del curso o None si no se encuentra.
     """
+    if isinstance(cursos, Almacen):
+        return cursos.buscar(id_curso)
+
     for curso in cursos:
         if curso["id_curso"] == id_curso:
             return curso
@@ -90,7 +143,11 @@ def _generar_nuevo_id_curso(cursos: List[Dict[str, Any]]) -> str:
     """
     Genera un ID de curso único y robusto (ej. C001, C002).
     Se basa en el ID máximo existente para evitar colisiones.
+    Con un Almacen usa su marca de agua (O(1)) en lugar de recorrer la lista.
     """
+    if isinstance(cursos, Almacen):
+        return cursos.proximo_id()
+
     if not cursos:
         return "C001"
 
@@ -108,7 +165,12 @@ def _generar_nuevo_id_curso(cursos: List[Dict[str, Any]]) -> str:
         return f"C{str(nuevo_id_num).zfill(3)}"
 
 
-def crear_curso(cursos: List[Dict[str, Any]], nombre_curso: str, creditos: int) -> Dict[str, Any]:
+def crear_curso(
+        cursos: List[Dict[str, Any]],
+        nombre_curso: str,
+        creditos: int,
+        prerrequisitos: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Crea un nuevo diccionario de curso.
     Utiliza una función interna para generar un ID robusto.
@@ -117,21 +179,51 @@ def crear_curso(cursos: List[Dict[str, Any]], nombre_curso: str, creditos: int)
         cursos (List[Dict[str, Any]]): La lista actual (para generar ID).
         nombre_curso (str): Nombre del curso.
         creditos (int): Número de créditos.
+        prerrequisitos (Optional[List[str]]): IDs de los cursos que hay que tomar antes.
 
     Returns:
         Dict[str, Any]: El nuevo curso.
     """
     nuevo_id = _generar_nuevo_id_curso(cursos)
 
-    nuevo_curso = {
-        "id_curso": nuevo_id,
-        "nombre_curso": nombre_curso,
-        "creditos": creditos
-    }
+    nuevo_curso = Curso(
+        id_curso=nuevo_id,
+        nombre_curso=nombre_curso,
+        creditos=creditos,
+        prerrequisitos=prerrequisitos or []
+    )
     return nuevo_curso
 
 
-def actualizar_curso(curso: Dict[str, Any], nombre_curso: Optional[str], creditos: Optional[int]) -> None:
+def crear_cursos(cursos: List[Dict[str, Any]], datos: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    """
+    Crea varios cursos con un bloque de IDs consecutivos (ej. al importar).
+    No los agrega a la lista.
+
+    Args:
+        cursos (List[Dict[str, Any]]): La lista actual (para generar los IDs).
+        datos (List[Tuple[str, int]]): Pares (nombre_curso, creditos), en orden.
+
+    Returns:
+        List[Dict[str, Any]]: Los nuevos cursos.
+    """
+    if isinstance(cursos, Almacen):
+        ids = cursos.reservar_ids(len(datos))
+    else:
+        inicio = int(_generar_nuevo_id_curso(cursos)[1:])
+        ids = [f"C{str(numero).zfill(3)}" for numero in range(inicio, inicio + len(datos))]
+    return [
+        Curso(id_curso=nuevo_id, nombre_curso=nombre_curso, creditos=creditos)
+        for nuevo_id, (nombre_curso, creditos) in zip(ids, datos)
+    ]
+
+
+def actualizar_curso(
+        curso: Dict[str, Any],
+        nombre_curso: Optional[str],
+        creditos: Optional[int],
+        prerrequisitos: Optional[List[str]] = None
+) -> None:
     """
     Actualiza los datos de un diccionario de curso (pasado por referencia).
     Solo actualiza los campos que no son None.
@@ -140,6 +232,8 @@ def actualizar_curso(curso: Dict[str, Any], nombre_curso: Optional[str], credito
         curso (Dict[str, Any]): El diccionario del curso a modificar.
         nombre_curso (Optional[str]): El nuevo nombre (o None para no cambiar).
         creditos (Optional[int]): El nuevo N° de créditos (o None para no cambiar).
+        prerrequisitos (Optional[List[str]]): Los nuevos prerrequisitos ([] los
+            quita todos; None para no cambiar).
     """
     if nombre_curso is not None and nombre_curso != "":
         curso["nombre_curso"] = nombre_curso
@@ -147,6 +241,9 @@ def actualizar_curso(curso: Dict[str, Any], nombre_curso: Optional[str], credito
     if creditos is not None and creditos >= 0:
         curso["creditos"] = creditos
 
+    if prerrequisitos is not None:
+        curso["prerrequisitos"] = list(prerrequisitos)
+
 
 def eliminar_curso(cursos: List[Dict[str, Any]], id_curso: str) -> bool:
     """
@@ -162,7 +259,7 @@ def eliminar_curso(cursos: List[Dict[str, Any]], id_curso: str) -> bool:
     curso_a_eliminar = buscar_curso_por_id(cursos, id_curso)
 
     if curso_a_eliminar:
-        cursos.remove(curso_a_eliminar)
+        quitar(cursos, curso_a_eliminar)
         return True
 
     return False
\ No newline at end of file
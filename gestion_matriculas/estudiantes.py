@@ -7,30 +7,77 @@ para interactuar con la fuente de datos (estudiantes.csv).
 Utiliza 'id_carrera' como clave foránea a 'carreras.csv'.
 """
 import csv
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+
+from gestion_matriculas import bitacora
+from gestion_matriculas.almacen import Almacen, normalizar_nombre, quitar
+from gestion_matriculas.registros import Estudiante
+from gestion_matriculas.utils import escritura_atomica
 
 # Constante para el nombre del archivo
 FILE_PATH = "data/estudiantes.csv"
 FILE_HEADERS = ["id_estudiante", "nombre", "id_carrera"]
 
 
+def crear_almacen_estudiantes(registros: Iterable[Dict[str, Any]] = ()) -> Almacen:
+    """
+    Crea un Almacen de estudiantes indexado por 'id_estudiante' y por nombre
+    normalizado, que además cuenta los estudiantes de cada carrera.
+
+    Args:
+        registros (Iterable[Dict[str, Any]]): Estudiantes iniciales.
+
+    Returns:
+        Almacen: Lista de estudiantes con búsqueda O(1) por ID.
+    """
+    return Almacen(registros, "id_estudiante", prefijo="E", ancho=3, campo_nombre="nombre",
+                   campos_conteo=("id_carrera",))
+
+
 def cargar_estudiantes() -> List[Dict[str, Any]]:
     """
     Carga los estudiantes desde el archivo CSV.
     Maneja FileNotFoundError si el archivo no existe.
 
     Returns:
-        List[Dict[str, Any]]: Lista de diccionarios de estudiantes.
+        List[Dict[str, Any]]: Lista de estudiantes (registros 'Estudiante',
+        que se usan igual que un diccionario).
     """
     try:
         with open(FILE_PATH, mode='r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
-            return list(reader)
+            estudiantes = crear_almacen_estudiantes(Estudiante.desde_dict(fila) for fila in reader)
+        bitacora.aplicar_cambios(estudiantes, FILE_PATH, "id_estudiante")
+        return estudiantes
     except FileNotFoundError:
-        return []
+        return crear_almacen_estudiantes()
     except Exception as e:
         print(f"Error inesperado al cargar estudiantes: {e}")
-        return []
+        return crear_almacen_estudiantes()
+
+
+def escribir_estudiantes(estudiantes: List[Dict[str, Any]]) -> None:
+    """
+    Escribe la lista completa de estudiantes en el archivo CSV (de forma atómica).
+    A diferencia de 'guardar_estudiantes', deja pasar los errores de E/S para
+    que quien llama decida cómo mostrarlos (ej. el escritor en segundo plano).
+
+    Args:
+        estudiantes (List[Dict[str, Any]]): La lista de estudiantes a guardar.
+    """
+    with escritura_atomica(FILE_PATH, newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=FILE_HEADERS)
+        writer.writeheader()
+        if estudiantes:
+            estudiantes_a_guardar = []
+            for est in estudiantes:
+                est_filtrado = {
+                    "id_estudiante": est.get("id_estudiante"),
+                    "nombre": est.get("nombre"),
+                    "id_carrera": est.get("id_carrera")
+                }
+                estudiantes_a_guardar.append(est_filtrado)
+            writer.writerows(estudiantes_a_guardar)
 
 
 def guardar_estudiantes(estudiantes: List[Dict[str, Any]]) -> None:
@@ -42,19 +89,7 @@ def guardar_estudiantes(estudiantes: List[Dict[str, Any]]) -> None:
         estudiantes (List[Dict[str, Any]]): La lista de estudiantes a guardar.
     """
     try:
-        with open(FILE_PATH, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=FILE_HEADERS)
-            writer.writeheader()
-            if estudiantes:
-                estudiantes_a_guardar = []
-                for est in estudiantes:
-                    est_filtrado = {
-                        "id_estudiante": est.get("id_estudiante"),
-                        "nombre": est.get("nombre"),
-                        "id_carrera": est.get("id_carrera")
-                    }
-                    estudiantes_a_guardar.append(est_filtrado)
-                writer.writerows(estudiantes_a_guardar)
+        escribir_estudiantes(estudiantes)
     except IOError as e:
         print(f"Error al guardar estudiantes en el archivo: {e}")
     except Exception as e:
@@ -72,17 +107,60 @@ def buscar_estudiante_por_id(estudiantes: List[Dict[str, Any]], id_estudiante: s
     Returns:
         Optional[Dict[str, Any]]: El diccionario del estudiante o None si no se encuentra.
     """
+    if isinstance(estudiantes, Almacen):
+        return estudiantes.buscar(id_estudiante)
+
     for estudiante in estudiantes:
         if estudiante["id_estudiante"] == id_estudiante:
             return estudiante
     return None
 
 
+def existe_nombre_estudiante(estudiantes: List[Dict[str, Any]], nombre: str) -> bool:
+    """
+    Indica si ya existe un estudiante con el mismo nombre.
+    La comparación ignora mayúsculas, tildes y espacios sobrantes.
+
+    Args:
+        estudiantes (List[Dict[str, Any]]): La lista de estudiantes.
+        nombre (str): El nombre a comprobar.
+
+    Returns:
+        bool: True si el nombre ya está registrado.
+    """
+    if isinstance(estudiantes, Almacen):
+        return estudiantes.existe_nombre(nombre)
+
+    nombre_normalizado = normalizar_nombre(nombre)
+    return any(normalizar_nombre(estudiante["nombre"]) == nombre_normalizado for estudiante in estudiantes)
+
+
+def contar_estudiantes_por_carrera(estudiantes: List[Dict[str, Any]], id_carrera: str) -> int:
+    """
+    Cuenta los estudiantes asignados a una carrera.
+
+    Args:
+        estudiantes (List[Dict[str, Any]]): La lista de estudiantes.
+        id_carrera (str): El ID de la carrera.
+
+    Returns:
+        int: Número de estudiantes de la carrera.
+    """
+    if isinstance(estudiantes, Almacen):
+        return estudiantes.contar("id_carrera", id_carrera)
+
+    return sum(1 for estudiante in estudiantes if estudiante.get("id_carrera") == id_carrera)
+
+
 def _generar_nuevo_id_estudiante(estudiantes: List[Dict[str, Any]]) -> str:
     """
     Genera un ID de estudiante único y robusto (ej. E001, E002).
     Se basa en el ID máximo existente para evitar colisiones.
+    Con un Almacen usa su marca de agua (O(1)) en lugar de recorrer la lista.
     """
+    if isinstance(estudiantes, Almacen):
+        return estudiantes.proximo_id()
+
     if not estudiantes:
         return "E001"
 
@@ -115,14 +193,37 @@ def crear_estudiante(estudiantes: List[Dict[str, Any]], nombre: str, id_carrera:
     """
     nuevo_id = _generar_nuevo_id_estudiante(estudiantes)
 
-    nuevo_est = {
-        "id_estudiante": nuevo_id,
-        "nombre": nombre,
-        "id_carrera": id_carrera
-    }
+    nuevo_est = Estudiante(
+        id_estudiante=nuevo_id,
+        nombre=nombre,
+        id_carrera=id_carrera
+    )
     return nuevo_est
 
 
+def crear_estudiantes(estudiantes: List[Dict[str, Any]], datos: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Crea varios estudiantes con un bloque de IDs consecutivos (ej. al importar).
+    No los agrega a la lista.
+
+    Args:
+        estudiantes (List[Dict[str, Any]]): La lista actual (para generar los IDs).
+        datos (List[Tuple[str, str]]): Pares (nombre, id_carrera), en orden.
+
+    Returns:
+        List[Dict[str, Any]]: Los nuevos estudiantes.
+    """
+    if isinstance(estudiantes, Almacen):
+        ids = estudiantes.reservar_ids(len(datos))
+    else:
+        inicio = int(_generar_nuevo_id_estudiante(estudiantes)[1:])
+        ids = [f"E{str(numero).zfill(3)}" for numero in range(inicio, inicio + len(datos))]
+    return [
+        Estudiante(id_estudiante=nuevo_id, nombre=nombre, id_carrera=id_carrera)
+        for nuevo_id, (nombre, id_carrera) in zip(ids, datos)
+    ]
+
+
 def actualizar_estudiante(estudiante: Dict[str, Any], nombre: Optional[str], id_carrera: Optional[str]) -> None:
     """
     Actualiza los datos de un diccionario de estudiante (pasado por referencia).
@@ -153,7 +254,7 @@ def eliminar_estudiante(estudiantes: List[Dict[str, Any]], id_estudiante: str) -
     estudiante_a_eliminar = buscar_estudiante_por_id(estudiantes, id_estudiante)
 
     if estudiante_a_eliminar:
-        estudiantes.remove(estudiante_a_eliminar)
+        quitar(estudiantes, estudiante_a_eliminar)
         return True
 
     return False
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Módulo de Horario de Exámenes (examenes.py)
+
+Asigna a cada curso de un periodo una franja de examen de modo que
+ningún estudiante tenga dos exámenes a la misma hora.
+
+Dos cursos están en conflicto si comparten al menos un estudiante: es el
+grafo de co-matrícula del periodo (ver comatriculas.py), que ya se
+mantiene al día y no hay que volver a armar recorriendo cada curso.
+Las franjas son los colores de una coloración del grafo con DSATUR: se
+colorea primero el curso con más franjas distintas entre sus vecinos (a
+igualdad, el de más vecinos) y se le da la primera franja libre. Con un
+montículo el costo es O((cursos + conflictos) · log cursos).
+
+Las franjas se reparten en días de 'franjas_por_dia' franjas cada uno
+(la franja f cae el día f // franjas_por_dia); el reporte lista a los
+estudiantes con más de 'max_por_dia' exámenes en un mismo día.
+"""
+import heapq
+from collections import Counter
+from typing import Dict, Any, Iterable, Mapping
+
+from gestion_matriculas.comatriculas import CoMatriculas
+
+# Franjas de examen de cada día (ej. mañana, mediodía y tarde)
+FRANJAS_POR_DIA = 3
+# Exámenes por día a partir de los cuales (sin incluirlos) se avisa al estudiante
+EXAMENES_MAX_POR_DIA = 2
+
+
+def colorear_dsatur(grafo: Mapping[str, Iterable[str]], nodos: Iterable[str] = ()) -> Dict[str, int]:
+    """
+    Colorea un grafo con DSATUR (dos vecinos nunca comparten color).
+
+    Args:
+        grafo (Mapping[str, Iterable[str]]): {nodo: vecinos}, en los dos sentidos.
+        nodos (Iterable[str]): Nodos sin vecinos que también deben recibir color.
+
+    Returns:
+        Dict[str, int]: {nodo: color}, con colores desde 0.
+    """
+    colores: Dict[str, int] = {}
+    colores_vecinos: Dict[str, set] = {nodo: set() for nodo in grafo}
+    grado = {nodo: len(vecinos) for nodo, vecinos in grafo.items()}
+
+    # Entradas (-saturación, -grado, nodo); las desactualizadas se descartan al salir
+    monticulo = [(0, -grado[nodo], nodo) for nodo in grafo]
+    heapq.heapify(monticulo)
+    while monticulo:
+        saturacion, _, nodo = heapq.heappop(monticulo)
+        if nodo in colores or -saturacion != len(colores_vecinos[nodo]):
+            continue
+        usados = colores_vecinos[nodo]
+        color = 0
+        while color in usados:
+            color += 1
+        colores[nodo] = color
+        for vecino in grafo[nodo]:
+            if vecino not in colores and color not in colores_vecinos[vecino]:
+                colores_vecinos[vecino].add(color)
+                heapq.heappush(monticulo, (-len(colores_vecinos[vecino]), -grado[vecino], vecino))
+
+    # Los nodos aislados no chocan con nada: todos van al primer color
+    for nodo in nodos:
+        colores.setdefault(nodo, 0)
+    return colores
+
+
+def generar_horario(comatriculas: CoMatriculas, periodo: str,
+                    franjas_por_dia: int = FRANJAS_POR_DIA,
+                    max_por_dia: int = EXAMENES_MAX_POR_DIA) -> Dict[str, Any]:
+    """
+    Arma el horario de exámenes de un periodo.
+
+    Args:
+        comatriculas (CoMatriculas): Los conteos de co-matrícula (ver 'obtener_comatriculas').
+        periodo (str): El periodo académico.
+        franjas_por_dia (int): Cuántas franjas de examen tiene un día.
+        max_por_dia (int): Exámenes por día que se toleran sin avisar.
+
+    Returns:
+        Dict[str, Any]: "franja_de_curso" ({id_curso: franja}), "franjas"
+        (cantidad de franjas usadas) y "sobrecargados" (filas {"id_estudiante",
+        "dia", "examenes"}, de más a menos exámenes).
+    """
+    vigentes = list(comatriculas.vigentes(periodo))
+    cursos_del_periodo = {id_curso for _, cursos in vigentes for id_curso in cursos}
+    franja_de_curso = colorear_dsatur(comatriculas.grafo(periodo), sorted(cursos_del_periodo))
+
+    sobrecargados = []
+    for id_estudiante, cursos in vigentes:
+        if len(cursos) <= max_por_dia:
+            continue  # No le alcanzan los cursos para pasarse del máximo
+        dias = [franja_de_curso[id_curso] // franjas_por_dia for id_curso in cursos]
+        # Un día con m exámenes repite m - 1 días: con menos repeticiones nadie se pasa
+        if len(dias) - len(set(dias)) < max_por_dia:
+            continue
+        for dia, examenes in sorted(Counter(dias).items()):
+            if examenes > max_por_dia:
+                sobrecargados.append({"id_estudiante": id_estudiante, "dia": dia, "examenes": examenes})
+    sobrecargados.sort(key=lambda fila: (-fila["examenes"], fila["id_estudiante"], fila["dia"]))
+
+    return {
+        "franja_de_curso": franja_de_curso,
+        "franjas": max(franja_de_curso.values(), default=-1) + 1,
+        "sobrecargados": sobrecargados,
+    }
@@ -5,25 +5,518 @@ Define la estructura de datos para 'Matricula' y contiene
 todas las funciones CRUD (Crear, Leer) para interactuar
 con la fuente de datos (matriculas.json).
 
+Las matrículas nuevas no reescriben el archivo completo: se añaden
+a un journal (matriculas.jsonl, una matrícula JSON por línea).
+'cargar_matriculas' lee el snapshot y luego reproduce el journal,
+y 'compactar_matriculas' vuelca todo de nuevo en el snapshot.
+
+El snapshot está particionado por periodo académico: un archivo JSON
+por periodo en PERIODOS_DIR y un catálogo (catalogo.json) con los
+periodos, sus totales y el periodo de la última matrícula de cada
+estudiante. Así se puede cargar solo el periodo que interesa y la
+compactación reescribe únicamente los periodos que cambiaron.
+Si no hay catálogo se lee el snapshot anterior (matriculas.json).
+
 También contiene la lógica de negocio para las relaciones:
 - Buscar cursos por estudiante.
 - Buscar estudiantes por curso.
 - Calcular créditos de un estudiante.
+
+'AlmacenMatriculas' guarda las matrículas en columnas de enteros y
+mantiene índices invertidos (estudiante -> matrículas y curso ->
+estudiantes) para que estas consultas cuesten en proporción al tamaño
+de la respuesta y no al de la base de datos.
 """
 import json
-from typing import List, Dict, Any, Optional
+import os
+import weakref
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableSequence, Sequence
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
 
-# Constante para el nombre del archivo
+from gestion_matriculas.almacen import Almacen, GeneradorIds, Internador, SeguimientoCambios
+from gestion_matriculas.comatriculas import CoMatriculas, construir_comatriculas
+from gestion_matriculas.prerrequisitos import CierrePrerrequisitos, construir_cierre
+from gestion_matriculas.registros import Matricula
+from gestion_matriculas.utils import escritura_atomica
+import gestion_matriculas.cursos as cur
+import gestion_matriculas.estudiantes as est
+
+# Constantes para los nombres de los archivos
 FILE_PATH = "data/matriculas.json"
+JOURNAL_PATH = "data/matriculas.jsonl"
+PERIODOS_DIR = "data/matriculas_periodos"
+CATALOGO_ARCHIVO = "catalogo.json"
+
+# Tamaño del journal (en bytes) a partir del cual conviene compactar
+JOURNAL_MAX_BYTES = 1024 * 1024
 
 
-def cargar_matriculas() -> List[Dict[str, Any]]:
+class AlmacenMatriculas(GeneradorIds, SeguimientoCambios, MutableSequence):
     """
-    Carga las matrículas desde el archivo JSON.
-    Maneja FileNotFoundError y JSONDecodeError.
+    Almacén columnar de matrículas.
+
+    En lugar de un diccionario por matrícula guarda columnas de enteros
+    ('array'): los IDs de estudiante, curso y periodo se internan (cada
+    cadena distinta recibe un código entero) y las listas de cursos se
+    aplanan en un solo arreglo con sus desplazamientos, de modo que los
+    cursos de la fila i son col_cursos[offsets[i]:offsets[i + 1]].
+    Los IDs de matrícula con el formato estándar (M0001) se guardan como
+    su número.
+
+    Se usa como una lista de registros 'Matricula' (que se crean al
+    leerlos) y mantiene índices invertidos con las filas de cada
+    estudiante y de cada curso, así las consultas cuestan en proporción
+    al tamaño de la respuesta.
+
+    Las matrículas no se modifican en sitio: agregar al final es O(1);
+    eliminar o reemplazar una fila reconstruye las columnas (O(n)).
+
+    Las matrículas agregadas al final se persisten en el journal, por eso
+    'cambios' solo cuenta las modificaciones que obligan a reescribir el
+    snapshot (eliminar, reemplazar o insertar en medio).
+    """
+    clave = "id_matricula"
+
+    def __init__(self, registros: Iterable[Dict[str, Any]] = (), prefijo: str = "M", ancho: int = 4) -> None:
+        self.prefijo = prefijo
+        self.ancho = ancho
+        self.ultimo_id = 0
+        self.cambios = 0
+        self._vaciar()
+        for registro in registros:
+            self.append(registro)
+
+    def _vaciar(self) -> None:
+        """Deja las columnas e índices vacíos (conserva la marca de agua)."""
+        self.estudiantes = Internador()
+        self.cursos = Internador()
+        self.periodos = Internador()
+        self.col_id = array("q")
+        self.col_estudiante = array("i")
+        self.col_periodo = array("i")
+        self.offsets = array("i", [0])
+        self.col_cursos = array("i")
+        self._ids_extra: List[str] = []
+        self._ids_ordenados = True
+        self._filas_por_estudiante: Dict[int, array] = {}
+        self._filas_por_curso: Dict[int, array] = {}
+        self._filas_por_periodo: Dict[int, array] = {}
+        # (estudiante, periodo) -> créditos de su última matrícula en ese periodo,
+        # y la lista de cursos (y su versión) con la que se calcularon
+        self._creditos: Dict[Tuple[int, int], int] = {}
+        self._cursos_de_creditos: Optional[Tuple[weakref.ref, int]] = None
+        # Conteos de co-matrícula: se arman en la primera consulta y desde ahí
+        # se actualizan con cada 'append' (ver 'comatriculas')
+        self._comatriculas: Optional[CoMatriculas] = None
+        # Historial para los prerrequisitos (igual que los co-matrículas, se arma
+        # en la primera consulta): estudiante -> periodo -> bitset de los cursos
+        # de su última matrícula en ese periodo, con los códigos de 'cursos'
+        self._historial: Optional[Dict[int, Dict[int, int]]] = None
+        # Cierre de prerrequisitos con los mismos códigos, y la lista de cursos
+        # (y su versión) con la que se armó (ver 'cierre_prerrequisitos')
+        self._cierre: Optional[CierrePrerrequisitos] = None
+        self._cursos_del_cierre: Optional[Tuple[weakref.ref, int]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # El cierre depende de la lista de cursos: no se guarda en la imagen binaria
+        estado = dict(self.__dict__)
+        estado["_cierre"] = None
+        estado["_cursos_del_cierre"] = None
+        # Tampoco los totales de créditos: sin la lista con que se calcularon no se pueden validar
+        estado["_creditos"] = {}
+        estado["_cursos_de_creditos"] = None
+        return estado
+
+    def _reconstruir(self, registros: List[Dict[str, Any]]) -> None:
+        self._vaciar()
+        for registro in registros:
+            self.append(registro)
+
+    # --- Codificación de IDs de matrícula ---
+
+    def _numero_de_id(self, id_matricula: Any) -> Optional[int]:
+        """Devuelve el número de un ID con formato estándar, o None."""
+        if not isinstance(id_matricula, str) or not id_matricula.startswith(self.prefijo):
+            return None
+        numero = id_matricula[len(self.prefijo):]
+        if numero.isdigit() and self._formatear_id(int(numero)) == id_matricula:
+            return int(numero)
+        return None
+
+    def _decodificar_id(self, codigo: int) -> str:
+        if codigo >= 0:
+            return self._formatear_id(codigo)
+        return self._ids_extra[-codigo - 1]
+
+    # --- Lectura de filas ---
+
+    def _fila_a_registro(self, fila: int) -> Matricula:
+        valores_cursos = self.cursos.valores
+        return Matricula(
+            self._decodificar_id(self.col_id[fila]),
+            self.estudiantes.valores[self.col_estudiante[fila]],
+            [valores_cursos[c] for c in self.col_cursos[self.offsets[fila]:self.offsets[fila + 1]]],
+            self.periodos.valores[self.col_periodo[fila]]
+        )
+
+    def ids_cursos_de_fila(self, fila: int) -> List[str]:
+        """Devuelve los IDs de curso de una fila sin crear el registro completo."""
+        valores_cursos = self.cursos.valores
+        return [valores_cursos[c] for c in self.col_cursos[self.offsets[fila]:self.offsets[fila + 1]]]
+
+    def __len__(self) -> int:
+        return len(self.col_id)
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self._fila_a_registro(fila) for fila in range(*posicion.indices(len(self)))]
+        if posicion < 0:
+            posicion += len(self)
+        if not 0 <= posicion < len(self):
+            raise IndexError("índice de matrícula fuera de rango")
+        return self._fila_a_registro(posicion)
+
+    def __iter__(self) -> Iterator[Matricula]:
+        for fila in range(len(self)):
+            yield self._fila_a_registro(fila)
+
+    def __eq__(self, otro: object) -> bool:
+        if not isinstance(otro, Sequence) or isinstance(otro, str):
+            return NotImplemented
+        return len(self) == len(otro) and all(a == b for a, b in zip(self, otro))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"AlmacenMatriculas({list(self)!r})"
+
+    # --- Modificaciones ---
+
+    def append(self, registro: Dict[str, Any]) -> None:
+        fila = len(self.col_id)
+        id_matricula = registro["id_matricula"]
+        codigo_id = self._numero_de_id(id_matricula)
+        if codigo_id is None:
+            self._ids_extra.append(id_matricula)
+            codigo_id = -len(self._ids_extra)
+            self._ids_ordenados = False
+        elif fila and codigo_id <= self.col_id[-1]:
+            self._ids_ordenados = False
+        self._observar_id(id_matricula)
+
+        codigo_est = self.estudiantes.codigo(registro["id_estudiante"])
+        self.col_id.append(codigo_id)
+        self.col_estudiante.append(codigo_est)
+        codigo_per = self.periodos.codigo(registro["periodo_academico"])
+        self.col_periodo.append(codigo_per)
+        bits_cursos = 0
+        for id_curso in registro["id_cursos"]:
+            codigo_cur = self.cursos.codigo(id_curso)
+            self.col_cursos.append(codigo_cur)
+            self._filas_por_curso.setdefault(codigo_cur, array("i")).append(fila)
+            bits_cursos |= 1 << codigo_cur
+        self.offsets.append(len(self.col_cursos))
+        self._filas_por_estudiante.setdefault(codigo_est, array("i")).append(fila)
+        self._filas_por_periodo.setdefault(codigo_per, array("i")).append(fila)
+        # La nueva matrícula pasa a ser la última del estudiante en el periodo
+        self._creditos.pop((codigo_est, codigo_per), None)
+        if self._comatriculas is not None:
+            self._comatriculas.registrar(registro["id_estudiante"], registro["periodo_academico"], registro["id_cursos"])
+        if self._historial is not None:
+            self._historial.setdefault(codigo_est, {})[codigo_per] = bits_cursos
+
+    def insert(self, posicion: int, registro: Dict[str, Any]) -> None:
+        if posicion >= len(self):
+            self.append(registro)
+            return
+        registros = list(self)
+        registros.insert(posicion, registro)
+        self._reconstruir(registros)
+        self._registrar_cambio()
+
+    def __setitem__(self, posicion, valor) -> None:
+        registros = list(self)
+        registros[posicion] = valor
+        self._reconstruir(registros)
+        self._registrar_cambio()
+
+    def __delitem__(self, posicion) -> None:
+        if isinstance(posicion, int) and posicion in (-1, len(self) - 1) and len(self):
+            self._quitar_ultima_fila()
+        else:
+            registros = list(self)
+            del registros[posicion]
+            self._reconstruir(registros)
+        self._registrar_cambio()
+
+    def _quitar_ultima_fila(self) -> None:
+        """Deshace el último 'append' sin reconstruir las columnas (O(cursos de la fila))."""
+        fila = len(self.col_id) - 1
+        if self.col_id.pop() < 0:
+            self._ids_extra.pop()
+        codigo_est = self.col_estudiante.pop()
+        codigo_per = self.col_periodo.pop()
+        self.offsets.pop()
+        inicio = self.offsets[-1]
+        filas_de = [(self._filas_por_curso, codigo_cur) for codigo_cur in self.col_cursos[inicio:]]
+        filas_de += [(self._filas_por_estudiante, codigo_est), (self._filas_por_periodo, codigo_per)]
+        del self.col_cursos[inicio:]
+        for indice, codigo in filas_de:
+            filas = indice[codigo]
+            if filas and filas[-1] == fila:
+                filas.pop()
+            if not filas:
+                del indice[codigo]
+        self._creditos.pop((codigo_est, codigo_per), None)
+        # La matrícula anterior del estudiante vuelve a ser la vigente: se recuentan al consultar
+        self._comatriculas = None
+        self._historial = None
+
+    def reverse(self) -> None:
+        self._reconstruir(list(self)[::-1])
+        self._registrar_cambio()
+
+    def clear(self) -> None:
+        self._vaciar()
+        self._registrar_cambio()
+
+    # --- Consultas ---
+
+    def buscar(self, id_matricula: str) -> Optional[Matricula]:
+        """
+        Busca una matrícula por su ID. Si los IDs se agregaron en orden
+        creciente usa búsqueda binaria (O(log n)); si no, recorre la columna.
+        """
+        codigo = self._numero_de_id(id_matricula)
+        if codigo is None:
+            if id_matricula not in self._ids_extra:
+                return None
+            codigo = -self._ids_extra.index(id_matricula) - 1
+        elif self._ids_ordenados:
+            fila = bisect_left(self.col_id, codigo)
+            if fila < len(self.col_id) and self.col_id[fila] == codigo:
+                return self._fila_a_registro(fila)
+            return None
+        try:
+            return self._fila_a_registro(self.col_id.index(codigo))
+        except ValueError:
+            return None
+
+    def _filas_de_estudiante(self, id_estudiante: str) -> array:
+        codigo = self.estudiantes.buscar_codigo(id_estudiante)
+        return self._filas_por_estudiante.get(codigo, array("i"))
+
+    def matriculas_de_estudiante(self, id_estudiante: str) -> List[Matricula]:
+        """Devuelve las matrículas de un estudiante, de la más antigua a la más reciente."""
+        return [self._fila_a_registro(fila) for fila in self._filas_de_estudiante(id_estudiante)]
+
+    def ids_cursos_de_estudiante(self, id_estudiante: str) -> List[str]:
+        """Devuelve los IDs (sin repetir, en orden de matrícula) de los cursos de un estudiante."""
+        codigos = dict.fromkeys(
+            c
+            for fila in self._filas_de_estudiante(id_estudiante)
+            for c in self.col_cursos[self.offsets[fila]:self.offsets[fila + 1]]
+        )
+        return [self.cursos.valores[c] for c in codigos]
+
+    def ids_cursos_ultima_matricula(self, id_estudiante: str) -> Optional[List[str]]:
+        """Devuelve los cursos de la matrícula más reciente del estudiante, o None si no tiene."""
+        filas = self._filas_de_estudiante(id_estudiante)
+        if not filas:
+            return None
+        return self.ids_cursos_de_fila(filas[-1])
+
+    def ids_estudiantes_de_curso(self, id_curso: str) -> List[str]:
+        """Devuelve los IDs (sin repetir) de los estudiantes inscritos en un curso."""
+        filas = self._filas_por_curso.get(self.cursos.buscar_codigo(id_curso), ())
+        codigos = dict.fromkeys(self.col_estudiante[fila] for fila in filas)
+        return [self.estudiantes.valores[e] for e in codigos]
+
+    def matriculas_de_curso(self, id_curso: str) -> List[Matricula]:
+        """Devuelve las matrículas que incluyen un curso, en orden de registro."""
+        filas = self._filas_por_curso.get(self.cursos.buscar_codigo(id_curso), ())
+        # Una matrícula con el curso repetido aparece varias veces en el índice
+        return [self._fila_a_registro(fila) for fila in dict.fromkeys(filas)]
+
+    def matriculas_de_periodo(self, periodo: str) -> List[Matricula]:
+        """Devuelve las matrículas de un periodo académico, en orden de registro."""
+        filas = self._filas_por_periodo.get(self.periodos.buscar_codigo(periodo), ())
+        return [self._fila_a_registro(fila) for fila in filas]
+
+    def ids_periodos(self) -> List[str]:
+        """Devuelve los periodos que tienen matrículas, ordenados."""
+        return sorted(self.periodos.valores[p] for p in self._filas_por_periodo)
+
+    def periodo_ultima_matricula(self, id_estudiante: str) -> Optional[str]:
+        """Devuelve el periodo de la matrícula más reciente del estudiante, o None."""
+        filas = self._filas_de_estudiante(id_estudiante)
+        if not filas:
+            return None
+        return self.periodos.valores[self.col_periodo[filas[-1]]]
+
+    # --- Totales de créditos materializados ---
+
+    def total_creditos(self, id_estudiante: str, periodo: str, cursos_db: List[Dict[str, Any]]) -> int:
+        """
+        Créditos de la última matrícula del estudiante en un periodo.
+        El total se calcula una vez y queda guardado hasta que el estudiante
+        se matricula de nuevo en ese periodo. Si 'cursos_db' es un Almacen,
+        cualquier cambio en él (ver Almacen.version) descarta los totales
+        guardados, salvo los avisados con 'invalidar_creditos_de_curso'; con
+        una lista normal hay que avisar cada cambio de créditos.
+
+        Args:
+            id_estudiante (str): El ID del estudiante.
+            periodo (str): El periodo académico.
+            cursos_db (List[Dict[str, Any]]): La BD de cursos (siempre la misma lista).
+
+        Returns:
+            int: El total de créditos (0 si no tiene matrícula en el periodo).
+        """
+        self.comprobar_creditos(cursos_db)
+        clave = (self.estudiantes.buscar_codigo(id_estudiante), self.periodos.buscar_codigo(periodo))
+        total = self._creditos.get(clave)
+        if total is not None:
+            return total
+
+        fila = next(
+            (f for f in reversed(self._filas_por_estudiante.get(clave[0], ())) if self.col_periodo[f] == clave[1]),
+            None
+        )
+        if fila is None:
+            return 0
+        total = 0
+        for id_curso in self.ids_cursos_de_fila(fila):
+            curso_obj = cur.buscar_curso_por_id(cursos_db, id_curso)
+            if curso_obj:
+                total += curso_obj.get("creditos", 0)
+        self._creditos[clave] = total
+        return total
+
+    def comatriculas(self) -> CoMatriculas:
+        """
+        Devuelve los conteos de co-matrícula por periodo (ver comatriculas.py).
+        La primera vez se arman recorriendo las columnas; después se
+        mantienen al agregar matrículas.
+        """
+        if self._comatriculas is None:
+            comatriculas = CoMatriculas()
+            valores_est, valores_per = self.estudiantes.valores, self.periodos.valores
+            for fila in range(len(self.col_id)):
+                comatriculas.registrar(valores_est[self.col_estudiante[fila]], valores_per[self.col_periodo[fila]],
+                                       self.ids_cursos_de_fila(fila))
+            self._comatriculas = comatriculas
+        return self._comatriculas
+
+    def cursos_tomados_antes(self, id_estudiante: str, periodo: str) -> int:
+        """
+        Bitset (con los códigos de 'cursos') de los cursos que el estudiante
+        tomó en periodos anteriores a 'periodo' (su última matrícula de cada
+        uno). Cuesta en proporción a los periodos del estudiante.
+        """
+        if self._historial is None:
+            historial: Dict[int, Dict[int, int]] = {}
+            for fila in range(len(self.col_id)):
+                bits_cursos = 0
+                for codigo_cur in self.col_cursos[self.offsets[fila]:self.offsets[fila + 1]]:
+                    bits_cursos |= 1 << codigo_cur
+                historial.setdefault(self.col_estudiante[fila], {})[self.col_periodo[fila]] = bits_cursos
+            self._historial = historial
+
+        tomados = 0
+        valores_per = self.periodos.valores
+        for codigo_per, bits_cursos in self._historial.get(self.estudiantes.buscar_codigo(id_estudiante), {}).items():
+            if valores_per[codigo_per] < periodo:
+                tomados |= bits_cursos
+        return tomados
+
+    def cierre_prerrequisitos(self, cursos_db: List[Dict[str, Any]]) -> CierrePrerrequisitos:
+        """
+        Devuelve el cierre de prerrequisitos de los cursos, con los mismos
+        códigos de bit que 'cursos_tomados_antes'. Se arma una vez y se
+        reutiliza mientras 'cursos_db' sea un Almacen sin modificaciones
+        (ver Almacen.version) o con modificaciones ya aplicadas al cierre
+        (ver 'confirmar_cierre_prerrequisitos'); con una lista normal se
+        arma siempre.
+        """
+        if isinstance(cursos_db, Almacen):
+            vigente = self._cursos_del_cierre
+            if (self._cierre is not None and vigente is not None
+                    and vigente[0]() is cursos_db and vigente[1] == cursos_db.version):
+                return self._cierre
+            self._cierre = construir_cierre(cursos_db, self.cursos)
+            self._cursos_del_cierre = (weakref.ref(cursos_db), cursos_db.version)
+            return self._cierre
+        return construir_cierre(cursos_db, self.cursos)
+
+    def confirmar_cierre_prerrequisitos(self, cursos_db: List[Dict[str, Any]], cierre: CierrePrerrequisitos) -> None:
+        """Marca el cierre guardado como al día con la versión actual de 'cursos_db'."""
+        if cierre is self._cierre and isinstance(cursos_db, Almacen):
+            self._cursos_del_cierre = (weakref.ref(cursos_db), cursos_db.version)
+
+    def comprobar_creditos(self, cursos_db: List[Dict[str, Any]]) -> None:
+        """
+        Descarta los totales de créditos guardados si 'cursos_db' (un Almacen)
+        no es la lista o la versión con la que se calcularon.
+        """
+        if not isinstance(cursos_db, Almacen):
+            return
+        vigente = self._cursos_de_creditos
+        if vigente is None or vigente[0]() is not cursos_db or vigente[1] != cursos_db.version:
+            self._creditos.clear()
+            self._cursos_de_creditos = (weakref.ref(cursos_db), cursos_db.version)
+
+    def invalidar_creditos_de_curso(self, id_curso: str, cursos_db: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Descarta los totales guardados de las matrículas que incluyen un curso.
+        Con 'cursos_db' (comprobado con 'comprobar_creditos' antes de modificar
+        el curso) los demás totales siguen vigentes con la versión nueva.
+        """
+        for fila in self._filas_por_curso.get(self.cursos.buscar_codigo(id_curso), ()):
+            self._creditos.pop((self.col_estudiante[fila], self.col_periodo[fila]), None)
+        vigente = self._cursos_de_creditos
+        if isinstance(cursos_db, Almacen) and vigente is not None and vigente[0]() is cursos_db:
+            self._cursos_de_creditos = (vigente[0], cursos_db.version)
+
+    def descartar_creditos(self) -> None:
+        """Descarta todos los totales de créditos guardados."""
+        self._creditos.clear()
+        self._cursos_de_creditos = None
+
+    def ids_estudiantes_de_periodo(self, periodo: str) -> List[str]:
+        """Devuelve los IDs (sin repetir) de los estudiantes matriculados en un periodo."""
+        filas = self._filas_por_periodo.get(self.periodos.buscar_codigo(periodo), ())
+        codigos = dict.fromkeys(self.col_estudiante[fila] for fila in filas)
+        return [self.estudiantes.valores[e] for e in codigos]
+
+    def total_matriculas_de_estudiante(self, id_estudiante: str) -> int:
+        """Número de matrículas de un estudiante, en O(1)."""
+        return len(self._filas_de_estudiante(id_estudiante))
+
+    def total_matriculas_de_curso(self, id_curso: str) -> int:
+        """Número de matrículas que incluyen un curso, en O(1)."""
+        return len(self._filas_por_curso.get(self.cursos.buscar_codigo(id_curso), ()))
+
+
+def crear_almacen_matriculas(registros: Iterable[Dict[str, Any]] = ()) -> AlmacenMatriculas:
+    """
+    Crea un AlmacenMatriculas (columnar) con sus índices ya construidos.
+
+    Args:
+        registros (Iterable[Dict[str, Any]]): Matrículas iniciales.
 
     Returns:
-        List[Dict[str, Any]]: Lista de diccionarios de matrículas.
+        AlmacenMatriculas: Lista de matrículas indexada.
+    """
+    return AlmacenMatriculas(registros)
+
+
+def _cargar_snapshot() -> List[Dict[str, Any]]:
+    """
+    Carga el snapshot de matrículas anterior a la partición (un solo archivo JSON).
+    Maneja FileNotFoundError y JSONDecodeError.
     """
     try:
         with open(FILE_PATH, mode='r', encoding='utf-8') as file:
@@ -38,27 +531,330 @@ def cargar_matriculas() -> List[Dict[str, Any]]:
         return []
 
 
+def leer_journal(desde: int = 0) -> List[Dict[str, Any]]:
+    """
+    Lee las matrículas añadidas al journal desde el último snapshot.
+    Una línea incompleta (ej. por un corte durante la escritura) se ignora.
+
+    Args:
+        desde (int): Posición (en bytes) desde la que leer; sirve para leer
+            solo lo que otro proceso añadió después de una lectura anterior.
+    """
+    registros = []
+    try:
+        with open(JOURNAL_PATH, mode='rb') as file:
+            file.seek(desde)
+            for num_linea, linea in enumerate(file, 1):
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    registros.append(json.loads(linea))
+                except json.JSONDecodeError:
+                    print(f"Advertencia: Línea {num_linea} del journal de matrículas corrupta. Se ignora.")
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"Error inesperado al leer el journal de matrículas: {e}")
+    return registros
+
+
+# --- Particiones por periodo ---
+
+def _archivo_de_periodo(periodo: str) -> str:
+    """Nombre del archivo de un periodo (ej. "2025-01" -> "2025-01.json")."""
+    seguro = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(periodo))
+    return f"{seguro}.json"
+
+
+def _catalogo_vacio() -> Dict[str, Any]:
+    return {"periodos": {}, "ultima_por_estudiante": {}}
+
+
+def cargar_catalogo() -> Optional[Dict[str, Any]]:
+    """
+    Lee el catálogo de periodos.
+
+    Returns:
+        Optional[Dict[str, Any]]: {"periodos": {periodo: {"archivo", "matriculas"}},
+        "ultima_por_estudiante": {id_estudiante: periodo}}, o None si
+        las matrículas aún no están particionadas.
+    """
+    try:
+        with open(os.path.join(PERIODOS_DIR, CATALOGO_ARCHIVO), mode='r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError:
+        print("Error: El catálogo de periodos está corrupto.")
+        return None
+
+
+def _guardar_catalogo(catalogo: Dict[str, Any]) -> None:
+    with escritura_atomica(os.path.join(PERIODOS_DIR, CATALOGO_ARCHIVO), encoding='utf-8') as file:
+        json.dump(catalogo, file, indent=4, sort_keys=True)
+
+
+def _leer_periodo(archivo: str) -> List[Dict[str, Any]]:
+    try:
+        with open(os.path.join(PERIODOS_DIR, archivo), mode='r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return []
+    except json.JSONDecodeError:
+        print(f"Error: El archivo de periodo '{archivo}' está corrupto. Se omite.")
+        return []
+
+
+def _escribir_periodo(catalogo: Dict[str, Any], periodo: str, registros: List[Dict[str, Any]]) -> None:
+    """Reescribe el archivo de un periodo y actualiza su entrada en el catálogo."""
+    archivo = _archivo_de_periodo(periodo)
+    with escritura_atomica(os.path.join(PERIODOS_DIR, archivo), encoding='utf-8') as file:
+        json.dump([dict(m) for m in registros], file, indent=4)
+    catalogo["periodos"][periodo] = {"archivo": archivo, "matriculas": len(registros)}
+    # La última matrícula de un estudiante es la de su periodo más reciente
+    ultimas = catalogo["ultima_por_estudiante"]
+    for registro in registros:
+        if ultimas.get(registro["id_estudiante"], "") <= periodo:
+            ultimas[registro["id_estudiante"]] = periodo
+
+
+def _particionar(matriculas: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Agrupa las matrículas por periodo, conservando su orden dentro de cada uno."""
+    particiones: Dict[str, List[Dict[str, Any]]] = {}
+    for matricula in matriculas:
+        particiones.setdefault(matricula["periodo_academico"], []).append(matricula)
+    return particiones
+
+
+def _vaciar_journal() -> None:
+    if os.path.exists(JOURNAL_PATH):
+        open(JOURNAL_PATH, mode='w', encoding='utf-8').close()
+
+
+def periodos_registrados() -> List[str]:
+    """
+    Devuelve los periodos guardados (catálogo y journal), ordenados.
+
+    Returns:
+        List[str]: Periodos académicos (ej. ["2024-02", "2025-01"]).
+    """
+    catalogo = cargar_catalogo()
+    if catalogo is None:
+        periodos = {m.get("periodo_academico") for m in _cargar_snapshot()}
+    else:
+        periodos = set(catalogo["periodos"])
+    periodos.update(m.get("periodo_academico") for m in leer_journal())
+    return sorted(p for p in periodos if p is not None)
+
+
+def periodo_actual() -> Optional[str]:
+    """
+    Devuelve el periodo más reciente con matrículas, o None si no hay ninguna.
+    Los periodos "AAAA-NN" se ordenan bien como texto.
+    """
+    periodos = periodos_registrados()
+    return periodos[-1] if periodos else None
+
+
+def periodo_ultima_matricula(id_estudiante: str) -> Optional[str]:
+    """
+    Devuelve el periodo más reciente en que se matriculó un estudiante
+    sin cargar las particiones (usa el catálogo y el journal).
+
+    Args:
+        id_estudiante (str): El ID del estudiante.
+
+    Returns:
+        Optional[str]: El periodo, o None si el estudiante no tiene matrículas.
+    """
+    catalogo = cargar_catalogo()
+    if catalogo is not None:
+        periodo = catalogo["ultima_por_estudiante"].get(id_estudiante)
+        pendientes = leer_journal()
+    else:
+        periodo = None
+        pendientes = _cargar_snapshot() + leer_journal()
+
+    for matricula in pendientes:
+        if matricula.get("id_estudiante") != id_estudiante:
+            continue
+        if (periodo or "") <= matricula.get("periodo_academico", ""):
+            periodo = matricula.get("periodo_academico")
+    return periodo
+
+
+def cargar_matriculas(periodos: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Carga las matrículas: primero el snapshot (las particiones por periodo,
+    en orden de periodo) y luego el journal. Las matrículas del journal
+    que ya estén en el snapshot (compactación interrumpida) no se duplican.
+
+    Args:
+        periodos (Optional[Iterable[str]]): Si se indica, solo se leen
+            las particiones de esos periodos (el resto queda en disco).
+
+    Returns:
+        List[Dict[str, Any]]: Lista de matrículas (registros 'Matricula',
+        que se usan igual que un diccionario).
+    """
+    filtro = set(periodos) if periodos is not None else None
+    catalogo = cargar_catalogo()
+
+    if catalogo is None:
+        matriculas = _cargar_snapshot()
+    else:
+        matriculas = []
+        for periodo in sorted(catalogo["periodos"]):
+            if filtro is None or periodo in filtro:
+                matriculas.extend(_leer_periodo(catalogo["periodos"][periodo]["archivo"]))
+    if filtro is not None:
+        matriculas = [m for m in matriculas if m.get("periodo_academico") in filtro]
+    ids_existentes = {m.get("id_matricula") for m in matriculas}
+
+    for registro in leer_journal():
+        if filtro is not None and registro.get("periodo_academico") not in filtro:
+            continue
+        if registro.get("id_matricula") not in ids_existentes:
+            matriculas.append(registro)
+            ids_existentes.add(registro.get("id_matricula"))
+
+    return crear_almacen_matriculas(matriculas)
+
+
 def guardar_matriculas(matriculas: List[Dict[str, Any]]) -> None:
     """
-    Guarda la lista completa de matrículas en el archivo JSON.
+    Guarda la lista completa de matrículas: un archivo por periodo más
+    el catálogo. Los periodos que ya no tienen matrículas se borran.
+    Como el snapshot ya contiene todo, el journal se vacía.
 
     Args:
         matriculas (List[Dict[str, Any]]): La lista de matrículas a guardar.
     """
     try:
-        with open(FILE_PATH, mode='w', encoding='utf-8') as file:
-            json.dump(matriculas, file, indent=4)
+        os.makedirs(PERIODOS_DIR, exist_ok=True)
+        anterior = cargar_catalogo() or _catalogo_vacio()
+        catalogo = _catalogo_vacio()
+        for periodo, registros in _particionar(matriculas).items():
+            _escribir_periodo(catalogo, periodo, registros)
+        # El catálogo va primero: así nunca apunta a un archivo ya borrado
+        _guardar_catalogo(catalogo)
+        for periodo, datos in anterior["periodos"].items():
+            if periodo not in catalogo["periodos"]:
+                try:
+                    os.remove(os.path.join(PERIODOS_DIR, datos["archivo"]))
+                except FileNotFoundError:
+                    pass  # Ya lo había borrado otra terminal o un guardado interrumpido
+
+        # El snapshot anterior a la partición ya no se usa
+        if os.path.exists(FILE_PATH):
+            os.remove(FILE_PATH)
+        _vaciar_journal()
     except IOError as e:
         print(f"Error al guardar matrículas en el archivo: {e}")
     except Exception as e:
         print(f"Error inesperado al guardar matrículas: {e}")
 
 
+def registrar_matricula(matricula: Dict[str, Any]) -> None:
+    """
+    Añade una sola matrícula al final del journal.
+    El costo no depende de cuántas matrículas haya guardadas.
+
+    Args:
+        matricula (Dict[str, Any]): La matrícula recién creada.
+    """
+    registrar_matriculas([matricula])
+
+
+def registrar_matriculas(matriculas: List[Dict[str, Any]]) -> None:
+    """
+    Añade varias matrículas al final del journal con una sola escritura
+    (ej. al matricular una cohorte completa).
+
+    Si el journal quedó con una línea incompleta (ej. por un corte), se
+    termina esa línea antes de escribir, para no pegarle la matrícula nueva.
+
+    Args:
+        matriculas (List[Dict[str, Any]]): Las matrículas recién creadas, en orden.
+    """
+    lineas = "".join(json.dumps(dict(matricula), ensure_ascii=False) + "\n" for matricula in matriculas)
+    try:
+        with open(JOURNAL_PATH, mode='a+b') as file:
+            if file.seek(0, os.SEEK_END) > 0:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    lineas = "\n" + lineas
+            file.write(lineas.encode('utf-8'))
+    except IOError as e:
+        print(f"Error al registrar la matrícula en el journal: {e}")
+    except Exception as e:
+        print(f"Error inesperado al registrar la matrícula: {e}")
+
+
+def necesita_compactacion() -> bool:
+    """
+    Indica si el journal superó JOURNAL_MAX_BYTES.
+
+    Returns:
+        bool: True si conviene llamar a 'compactar_matriculas'.
+    """
+    try:
+        return os.path.getsize(JOURNAL_PATH) > JOURNAL_MAX_BYTES
+    except OSError:
+        return False
+
+
+def compactar_matriculas(matriculas: List[Dict[str, Any]]) -> bool:
+    """
+    Vuelca las matrículas del journal a sus particiones y vacía el journal.
+    Solo se reescriben los periodos que aparecen en el journal (normalmente
+    el actual); los periodos cerrados no se tocan. No hace nada si el
+    journal está vacío.
+
+    Args:
+        matriculas (List[Dict[str, Any]]): Las matrículas en memoria; deben
+            incluir completos los periodos que aparecen en el journal.
+
+    Returns:
+        bool: True si se compactó, False si no había nada que compactar.
+    """
+    try:
+        if os.path.getsize(JOURNAL_PATH) == 0:
+            return False
+    except OSError:
+        return False
+
+    catalogo = cargar_catalogo()
+    if catalogo is None:
+        guardar_matriculas(matriculas)
+        return True
+
+    periodos = {m.get("periodo_academico") for m in leer_journal()}
+    try:
+        for periodo in sorted(p for p in periodos if p is not None):
+            if isinstance(matriculas, AlmacenMatriculas):
+                registros = matriculas.matriculas_de_periodo(periodo)
+            else:
+                registros = [m for m in matriculas if m.get("periodo_academico") == periodo]
+            _escribir_periodo(catalogo, periodo, registros)
+        _guardar_catalogo(catalogo)
+        _vaciar_journal()
+    except IOError as e:
+        print(f"Error al compactar matrículas: {e}")
+        return False
+    return True
+
+
 def _generar_nuevo_id_matricula(matriculas: List[Dict[str, Any]]) -> str:
     """
     Genera un ID de matrícula único y robusto (ej. M0001, M0002).
     Se basa en el ID máximo existente para evitar colisiones.
+    Con un AlmacenMatriculas usa su marca de agua (O(1)) en lugar de recorrer la lista.
     """
+    if isinstance(matriculas, AlmacenMatriculas):
+        return matriculas.proximo_id()
+
     if not matriculas:
         return "M0001"
 
@@ -98,15 +894,75 @@ def matricular_estudiante(
     """
     nuevo_id = _generar_nuevo_id_matricula(matriculas)
 
-    nueva_matricula = {
-        "id_matricula": nuevo_id,
-        "id_estudiante": id_estudiante,
-        "id_cursos": lista_ids_cursos,
-        "periodo_academico": periodo
-    }
+    nueva_matricula = Matricula(
+        id_matricula=nuevo_id,
+        id_estudiante=id_estudiante,
+        id_cursos=lista_ids_cursos,
+        periodo_academico=periodo
+    )
     return nueva_matricula
 
 
+def matricular_estudiantes(
+        matriculas: List[Dict[str, Any]],
+        solicitudes: List[Tuple[str, List[str], str]]
+) -> List[Dict[str, Any]]:
+    """
+    Crea varias matrículas con un bloque de IDs consecutivos. No las agrega a la lista.
+
+    Args:
+        matriculas (List[Dict[str, Any]]): La lista actual (para generar los IDs).
+        solicitudes (List[Tuple[str, List[str], str]]): Tuplas (id_estudiante,
+            ids de cursos, periodo), en orden.
+
+    Returns:
+        List[Dict[str, Any]]: Las nuevas matrículas.
+    """
+    if isinstance(matriculas, AlmacenMatriculas):
+        ids = matriculas.reservar_ids(len(solicitudes))
+    else:
+        inicio = int(_generar_nuevo_id_matricula(matriculas)[1:])
+        ids = [f"M{str(numero).zfill(4)}" for numero in range(inicio, inicio + len(solicitudes))]
+    return [
+        Matricula(id_matricula=nuevo_id, id_estudiante=id_estudiante, id_cursos=ids_cursos, periodo_academico=periodo)
+        for nuevo_id, (id_estudiante, ids_cursos, periodo) in zip(ids, solicitudes)
+    ]
+
+
+def contar_matriculas_de_estudiante(matriculas_db: List[Dict[str, Any]], id_estudiante: str) -> int:
+    """
+    Cuenta las matrículas registradas de un estudiante.
+
+    Args:
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+        id_estudiante (str): El ID del estudiante.
+
+    Returns:
+        int: Número de matrículas del estudiante.
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        return matriculas_db.total_matriculas_de_estudiante(id_estudiante)
+
+    return sum(1 for m in matriculas_db if m.get("id_estudiante") == id_estudiante)
+
+
+def contar_matriculas_de_curso(matriculas_db: List[Dict[str, Any]], id_curso: str) -> int:
+    """
+    Cuenta las matrículas que incluyen un curso.
+
+    Args:
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+        id_curso (str): El ID del curso.
+
+    Returns:
+        int: Número de matrículas con el curso.
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        return matriculas_db.total_matriculas_de_curso(id_curso)
+
+    return sum(m.get("id_cursos", []).count(id_curso) for m in matriculas_db)
+
+
 def obtener_cursos_por_estudiante(
         id_estudiante: str,
         matriculas_db: List[Dict[str, Any]],
@@ -124,15 +980,19 @@ def obtener_cursos_por_estudiante(
     Returns:
         List[Dict[str, Any]]: Una lista de diccionarios de los cursos encontrados.
     """
-    ids_cursos_estudiante = set()
-
-    for matricula in matriculas_db:
-        if matricula["id_estudiante"] == id_estudiante:
-            ids_cursos_estudiante.update(matricula["id_cursos"])
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        ids_cursos_estudiante = matriculas_db.ids_cursos_de_estudiante(id_estudiante)
+    else:
+        # dict.fromkeys elimina repetidos conservando el orden de matrícula
+        ids_cursos_estudiante = dict.fromkeys(
+            id_curso
+            for matricula in matriculas_db if matricula["id_estudiante"] == id_estudiante
+            for id_curso in matricula["id_cursos"]
+        )
 
     cursos_encontrados = []
     for id_curso in ids_cursos_estudiante:
-        curso_obj = next((curso for curso in cursos_db if curso["id_curso"] == id_curso), None)
+        curso_obj = cur.buscar_curso_por_id(cursos_db, id_curso)
         if curso_obj:
             cursos_encontrados.append(curso_obj)
 
@@ -156,15 +1016,16 @@ def obtener_estudiantes_por_curso(
     Returns:
         List[Dict[str, Any]]: Una lista de diccionarios de los estudiantes encontrados.
     """
-    ids_estudiantes_curso = set()
-
-    for matricula in matriculas_db:
-        if id_curso in matricula["id_cursos"]:
-            ids_estudiantes_curso.add(matricula["id_estudiante"])
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        ids_estudiantes_curso = matriculas_db.ids_estudiantes_de_curso(id_curso)
+    else:
+        ids_estudiantes_curso = dict.fromkeys(
+            m["id_estudiante"] for m in matriculas_db if id_curso in m["id_cursos"]
+        )
 
     estudiantes_encontrados = []
     for id_est in ids_estudiantes_curso:
-        est_obj = next((est for est in estudiantes_db if est["id_estudiante"] == id_est), None)
+        est_obj = est.buscar_estudiante_por_id(estudiantes_db, id_est)
         if est_obj:
             estudiantes_encontrados.append(est_obj)
 
@@ -188,23 +1049,235 @@ def calcular_total_creditos(
     Returns:
         int: El total de créditos.
     """
-    matricula_reciente = None
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        periodo = matriculas_db.periodo_ultima_matricula(id_estudiante)
+        if periodo is None:
+            return 0
+        return matriculas_db.total_creditos(id_estudiante, periodo, cursos_db)
 
+    ids_cursos_matriculados = None
     for matricula in reversed(matriculas_db):
         if matricula["id_estudiante"] == id_estudiante:
-            matricula_reciente = matricula
+            ids_cursos_matriculados = matricula["id_cursos"]
             break
 
-    if not matricula_reciente:
+    if ids_cursos_matriculados is None:
         return 0
 
-    ids_cursos_matriculados = matricula_reciente["id_cursos"]
     total_creditos = 0
 
     for id_cur in ids_cursos_matriculados:
-        curso_obj = next((curso for curso in cursos_db if curso["id_curso"] == id_cur), None)
+        curso_obj = cur.buscar_curso_por_id(cursos_db, id_cur)
 
         if curso_obj:
             total_creditos += curso_obj.get("creditos", 0)
 
-    return total_creditos
\ No newline at end of file
+    return total_creditos
+
+
+def obtener_periodos(matriculas_db: List[Dict[str, Any]]) -> List[str]:
+    """
+    Devuelve los periodos académicos con matrículas, ordenados.
+
+    Args:
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+
+    Returns:
+        List[str]: Los periodos (ej. ["2024-02", "2025-01"]).
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        return matriculas_db.ids_periodos()
+    return sorted({m["periodo_academico"] for m in matriculas_db})
+
+
+def comprobar_creditos(matriculas_db: List[Dict[str, Any]], cursos_db: List[Dict[str, Any]]) -> None:
+    """
+    Descarta los totales de créditos guardados si los cursos cambiaron desde
+    que se calcularon. Se llama antes de modificar un curso, para después
+    conservar el resto con 'invalidar_creditos_de_curso'.
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        matriculas_db.comprobar_creditos(cursos_db)
+
+
+def invalidar_creditos_de_curso(
+        matriculas_db: List[Dict[str, Any]],
+        id_curso: str,
+        cursos_db: Optional[List[Dict[str, Any]]] = None
+) -> None:
+    """
+    Descarta los totales de créditos guardados que dependen de un curso.
+    Se llama cuando cambian sus créditos. Con una lista normal no hay nada que hacer.
+
+    Args:
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+        id_curso (str): El ID del curso modificado.
+        cursos_db (Optional[List[Dict[str, Any]]]): La BD de cursos ya modificada;
+            si es un Almacen, los demás totales no se descartan (ver 'comprobar_creditos').
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        matriculas_db.invalidar_creditos_de_curso(id_curso, cursos_db)
+
+
+def descartar_creditos(matriculas_db: List[Dict[str, Any]]) -> None:
+    """
+    Descarta todos los totales de créditos guardados. Se llama cuando los
+    cursos o las matrículas se vuelven a leer completos de disco.
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        matriculas_db.descartar_creditos()
+
+
+def creditos_por_estudiante(
+        periodo: str,
+        matriculas_db: List[Dict[str, Any]],
+        cursos_db: List[Dict[str, Any]]
+) -> Dict[str, int]:
+    """
+    Calcula los créditos de la última matrícula de cada estudiante en un periodo.
+    Con un AlmacenMatriculas los totales ya guardados no se recalculan.
+
+    Args:
+        periodo (str): El periodo académico.
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+        cursos_db (List[Dict[str, Any]]): La BD de cursos.
+
+    Returns:
+        Dict[str, int]: {id_estudiante: créditos}, en orden de matrícula.
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        return {
+            id_est: matriculas_db.total_creditos(id_est, periodo, cursos_db)
+            for id_est in matriculas_db.ids_estudiantes_de_periodo(periodo)
+        }
+
+    ultimas: Dict[str, Dict[str, Any]] = {}
+    for matricula in matriculas_db:
+        if matricula["periodo_academico"] == periodo:
+            ultimas[matricula["id_estudiante"]] = matricula
+    totales = {}
+    for id_est, matricula in ultimas.items():
+        cursos_obj = (cur.buscar_curso_por_id(cursos_db, id_cur) for id_cur in matricula["id_cursos"])
+        totales[id_est] = sum(c.get("creditos", 0) for c in cursos_obj if c)
+    return totales
+
+
+def obtener_comatriculas(matriculas_db: List[Dict[str, Any]]) -> CoMatriculas:
+    """
+    Devuelve los conteos de co-matrícula (curso × curso, por periodo).
+    Con un AlmacenMatriculas se reutilizan los que mantiene el almacén.
+
+    Args:
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+
+    Returns:
+        CoMatriculas: Los conteos (ver 'CoMatriculas.mas_frecuentes').
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        return matriculas_db.comatriculas()
+    return construir_comatriculas(matriculas_db)
+
+
+# Cierres armados para listas de matrículas normales, por id() de la lista
+# de cursos: (referencia a la lista, su versión, cierre). Solo para un
+# Almacen, cuya 'version' indica si el cierre sigue al día.
+_cierres_por_cursos: Dict[int, Tuple[weakref.ref, int, CierrePrerrequisitos]] = {}
+
+
+def _guardar_cierre(cursos_db: Almacen, cierre: CierrePrerrequisitos) -> None:
+    clave = id(cursos_db)
+    # La entrada se borra cuando la lista deja de existir (su id() se puede reutilizar)
+    referencia = weakref.ref(cursos_db, lambda _, clave=clave: _cierres_por_cursos.pop(clave, None))
+    _cierres_por_cursos[clave] = (referencia, cursos_db.version, cierre)
+
+
+def obtener_cierre_prerrequisitos(matriculas_db: List[Dict[str, Any]], cursos_db: List[Dict[str, Any]]) -> CierrePrerrequisitos:
+    """
+    Devuelve el cierre de prerrequisitos de los cursos (ver prerrequisitos.py).
+    Con un AlmacenMatriculas se reutiliza el que guarda el almacén; con una
+    lista de matrículas normal, el guardado para 'cursos_db' si es un Almacen.
+    Tras modificar los cursos, 'confirmar_cierre_prerrequisitos' evita que
+    se vuelva a armar.
+
+    Args:
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+        cursos_db (List[Dict[str, Any]]): La BD de cursos.
+
+    Returns:
+        CierrePrerrequisitos: El cierre (ver 'ciclo_al_establecer' y 'faltantes').
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        return matriculas_db.cierre_prerrequisitos(cursos_db)
+    if not isinstance(cursos_db, Almacen):
+        return construir_cierre(cursos_db)
+    guardado = _cierres_por_cursos.get(id(cursos_db))
+    if guardado is not None and guardado[0]() is cursos_db and guardado[1] == cursos_db.version:
+        return guardado[2]
+    cierre = construir_cierre(cursos_db)
+    _guardar_cierre(cursos_db, cierre)
+    return cierre
+
+
+def confirmar_cierre_prerrequisitos(
+        matriculas_db: List[Dict[str, Any]],
+        cursos_db: List[Dict[str, Any]],
+        cierre: CierrePrerrequisitos
+) -> None:
+    """
+    Indica que 'cierre' (obtenido con 'obtener_cierre_prerrequisitos' antes
+    de modificar los cursos) ya refleja esas modificaciones, ej. con
+    'establecer'. Así el cierre guardado sigue vigente en lugar de volver a
+    armarse en la próxima consulta.
+    """
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        matriculas_db.confirmar_cierre_prerrequisitos(cursos_db, cierre)
+        return
+    guardado = _cierres_por_cursos.get(id(cursos_db))
+    if guardado is not None and guardado[2] is cierre and guardado[0]() is cursos_db:
+        _guardar_cierre(cursos_db, cierre)
+
+
+def prerrequisitos_faltantes(
+        matriculas_db: List[Dict[str, Any]],
+        cursos_db: List[Dict[str, Any]],
+        id_estudiante: str,
+        ids_cursos: List[str],
+        periodo: str,
+        cierre: Optional[CierrePrerrequisitos] = None
+) -> Dict[str, List[str]]:
+    """
+    Busca, para cada curso pedido, los prerrequisitos que el estudiante no
+    tomó en un periodo anterior a 'periodo'. Con un AlmacenMatriculas no se
+    recorren el grafo ni las matrículas: cuesta O(cursos pedidos) más los
+    periodos del estudiante.
+
+    Args:
+        matriculas_db (List[Dict[str, Any]]): La BD de matrículas.
+        cursos_db (List[Dict[str, Any]]): La BD de cursos.
+        id_estudiante (str): El ID del estudiante.
+        ids_cursos (List[str]): Los cursos que quiere tomar.
+        periodo (str): El periodo de la nueva matrícula.
+        cierre (Optional[CierrePrerrequisitos]): El cierre ya obtenido con
+            'obtener_cierre_prerrequisitos' (ej. para muchas consultas seguidas).
+
+    Returns:
+        Dict[str, List[str]]: {id_curso: prerrequisitos faltantes}, solo con
+        los cursos a los que les falta alguno.
+    """
+    if cierre is None:
+        cierre = obtener_cierre_prerrequisitos(matriculas_db, cursos_db)
+    if isinstance(matriculas_db, AlmacenMatriculas):
+        tomados = matriculas_db.cursos_tomados_antes(id_estudiante, periodo)
+    else:
+        ultimas = {}
+        for matricula in matriculas_db:
+            if matricula["id_estudiante"] == id_estudiante and matricula["periodo_academico"] < periodo:
+                ultimas[matricula["periodo_academico"]] = matricula["id_cursos"]
+        tomados = cierre.bits(id_curso for ids in ultimas.values() for id_curso in ids)
+
+    faltantes = {}
+    for id_curso in ids_cursos:
+        faltan = cierre.faltantes(id_curso, tomados)
+        if faltan:
+            faltantes[id_curso] = faltan
+    return faltantes
@@ -0,0 +1,190 @@
+"""
+Módulo de Prerrequisitos (prerrequisitos.py)
+
+Cada curso puede exigir otros cursos tomados antes (campo
+'prerrequisitos' de cursos.csv). Para no recorrer el grafo en cada
+matrícula se precalcula su cierre transitivo: para cada curso, todos los
+cursos que exige directa o indirectamente (si C003 exige C002 y C002
+exige C001, C003 exige ambos).
+
+Los conjuntos de cursos son enteros usados como bitsets: el curso con
+código k (ver 'Internador') es el bit k. Así, comprobar si un estudiante
+cumple los prerrequisitos de un curso es un AND entre el cierre del
+curso y los cursos que ya tomó (ver 'faltantes'), sin importar cuántos
+cursos haya en la cadena.
+
+El grafo no puede tener ciclos (un curso no puede exigirse a sí mismo a
+través de otros): 'ciclo_al_establecer' lo comprueba antes de guardar.
+Además se guarda el índice inverso (qué cursos exigen a cada uno), para
+saber sin recorrer el catálogo si un curso se puede eliminar.
+"""
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+from gestion_matriculas.almacen import Internador
+
+
+class CierrePrerrequisitos:
+    """
+    Prerrequisitos directos de cada curso y su cierre transitivo como bitsets.
+
+    Args:
+        codigos (Internador): Da el bit de cada ID de curso. Debe ser el mismo
+            con el que se arman los bitsets de cursos tomados. Solo se le
+            agregan los cursos que son prerrequisito de otro.
+    """
+
+    def __init__(self, codigos: Internador) -> None:
+        self.codigos = codigos
+        self._directos: Dict[str, Tuple[str, ...]] = {}
+        self._cierre: Dict[str, int] = {}
+        # curso -> cursos que lo exigen directamente
+        self._dependientes: Dict[str, Set[str]] = {}
+
+    def bit(self, id_curso: str) -> int:
+        """
+        Devuelve el bitset que contiene solo a 'id_curso' (0 si no tiene
+        código: ningún cierre lo incluye). No agrega códigos.
+        """
+        codigo = self.codigos.buscar_codigo(id_curso)
+        return 0 if codigo is None else 1 << codigo
+
+    def bits(self, ids_cursos: Iterable[str]) -> int:
+        """Devuelve el bitset de varios cursos (los que no tienen código no aportan)."""
+        conjunto = 0
+        for id_curso in ids_cursos:
+            codigo = self.codigos.buscar_codigo(id_curso)
+            if codigo is not None:
+                conjunto |= 1 << codigo
+        return conjunto
+
+    def ids(self, conjunto: int) -> List[str]:
+        """Devuelve los IDs de los cursos de un bitset, ordenados."""
+        ids = []
+        while conjunto:
+            menor = conjunto & -conjunto
+            ids.append(self.codigos.valor(menor.bit_length() - 1))
+            conjunto ^= menor
+        return sorted(ids)
+
+    def requeridos(self, id_curso: str) -> int:
+        """Bitset de todos los cursos que exige 'id_curso' (directa o indirectamente)."""
+        return self._cierre.get(id_curso, 0)
+
+    def dependientes(self, id_curso: str) -> List[str]:
+        """Devuelve los cursos que exigen directamente a 'id_curso', ordenados."""
+        return sorted(self._dependientes.get(id_curso, ()))
+
+    def _cierre_de(self, prerrequisitos: Iterable[str]) -> int:
+        # Aquí sí se registran códigos: cada prerrequisito necesita su bit
+        cierre = 0
+        for id_prerrequisito in prerrequisitos:
+            cierre |= (1 << self.codigos.codigo(id_prerrequisito)) | self._cierre.get(id_prerrequisito, 0)
+        return cierre
+
+    def _enlazar(self, id_curso: str, prerrequisitos: Tuple[str, ...]) -> None:
+        """Guarda los prerrequisitos directos de un curso y su índice inverso."""
+        for id_prerrequisito in self._directos.pop(id_curso, ()):
+            dependientes = self._dependientes[id_prerrequisito]
+            dependientes.discard(id_curso)
+            if not dependientes:
+                del self._dependientes[id_prerrequisito]
+        if prerrequisitos:
+            self._directos[id_curso] = prerrequisitos
+            for id_prerrequisito in prerrequisitos:
+                self._dependientes.setdefault(id_prerrequisito, set()).add(id_curso)
+
+    def ciclo_al_establecer(self, id_curso: str, prerrequisitos: Iterable[str]) -> Optional[str]:
+        """
+        Indica si dar a 'id_curso' esos prerrequisitos formaría un ciclo:
+        ocurre si alguno es el mismo curso o ya exige a 'id_curso'. Cuesta
+        O(prerrequisitos) gracias al cierre.
+
+        Returns:
+            Optional[str]: El prerrequisito que cierra el ciclo, o None.
+        """
+        bit_curso = self.bit(id_curso)
+        for id_prerrequisito in prerrequisitos:
+            if id_prerrequisito == id_curso or self._cierre.get(id_prerrequisito, 0) & bit_curso:
+                return id_prerrequisito
+        return None
+
+    def establecer(self, id_curso: str, prerrequisitos: Iterable[str]) -> None:
+        """
+        Reemplaza los prerrequisitos directos de un curso y actualiza los cierres.
+        Si solo se agregan, se suman al cierre de los cursos que exigen a
+        'id_curso'; si se quita alguno, los cierres se recalculan.
+
+        Raises:
+            ValueError: Si los prerrequisitos formarían un ciclo.
+        """
+        prerrequisitos = tuple(dict.fromkeys(prerrequisitos))
+        ciclo = self.ciclo_al_establecer(id_curso, prerrequisitos)
+        if ciclo is not None:
+            raise ValueError(f"El curso {ciclo} ya exige (directa o indirectamente) a {id_curso}: formaría un ciclo.")
+
+        anterior = self._cierre.get(id_curso, 0)
+        self._enlazar(id_curso, prerrequisitos)
+        nuevo = self._cierre_de(prerrequisitos)
+        if nuevo & anterior != anterior:
+            self.recalcular()
+            return
+        if nuevo == anterior:
+            return
+        self._cierre[id_curso] = nuevo
+        bit_curso = self.bit(id_curso)
+        if not bit_curso:
+            return  # Ningún curso lo exige
+        for otro, cierre in self._cierre.items():
+            if cierre & bit_curso:
+                self._cierre[otro] = cierre | nuevo
+
+    def recalcular(self) -> List[str]:
+        """
+        Vuelve a calcular todos los cierres desde los prerrequisitos directos,
+        en orden topológico (cada curso después de los que exige).
+
+        Returns:
+            List[str]: Los cursos que quedaron en un ciclo (sin cierre), ordenados.
+        """
+        pendientes = {id_curso: len(directos) for id_curso, directos in self._directos.items()}
+        self._cierre = {}
+        listos = [id_curso for id_curso in self._dependientes if id_curso not in self._directos]
+        while listos:
+            id_prerrequisito = listos.pop()
+            for id_curso in self._dependientes.get(id_prerrequisito, ()):
+                pendientes[id_curso] -= 1
+                if pendientes[id_curso] == 0:
+                    self._cierre[id_curso] = self._cierre_de(self._directos[id_curso])
+                    listos.append(id_curso)
+        return sorted(id_curso for id_curso, faltan in pendientes.items() if faltan > 0)
+
+    def faltantes(self, id_curso: str, tomados: int) -> List[str]:
+        """
+        Devuelve los prerrequisitos (directos o indirectos) de 'id_curso'
+        que no están en el bitset 'tomados'. Si no falta ninguno cuesta O(1).
+        """
+        return self.ids(self._cierre.get(id_curso, 0) & ~tomados)
+
+
+def construir_cierre(cursos_db: Iterable[Dict[str, Any]], codigos: Optional[Internador] = None) -> CierrePrerrequisitos:
+    """
+    Arma el cierre de prerrequisitos de todos los cursos en O(cursos + prerrequisitos).
+    Si los datos tienen un ciclo (ej. editados a mano), los cursos del ciclo
+    quedan sin prerrequisitos exigibles y se muestra una advertencia.
+
+    Args:
+        cursos_db (Iterable[Dict[str, Any]]): La BD de cursos.
+        codigos (Optional[Internador]): Los códigos de bit (uno nuevo si es None).
+
+    Returns:
+        CierrePrerrequisitos: El cierre de todos los cursos.
+    """
+    cierre = CierrePrerrequisitos(codigos if codigos is not None else Internador())
+    for curso in cursos_db:
+        prerrequisitos = tuple(dict.fromkeys(curso.get("prerrequisitos") or ()))
+        if prerrequisitos:
+            cierre._enlazar(curso["id_curso"], prerrequisitos)
+    en_ciclo = cierre.recalcular()
+    if en_ciclo:
+        print(f"Advertencia: Prerrequisitos en ciclo entre {', '.join(en_ciclo)}. No se exigirán.")
+    return cierre
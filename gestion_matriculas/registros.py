@@ -0,0 +1,133 @@
+"""
+Módulo de Registros (registros.py)
+
+Define las clases de registro de cada entidad: 'Estudiante', 'Curso',
+'Carrera' y 'Matricula'. Usan '__slots__', por lo que cada fila ocupa
+mucha menos memoria que un diccionario.
+
+Para que 'ui.py', 'servicios.py' y el resto del código sigan funcionando
+sin cambios, los registros se comportan como diccionarios: admiten
+registro["nombre"], registro.get("creditos", 0), 'in', keys(), items(),
+dict(registro) y la comparación con diccionarios normales.
+"""
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Mapping
+
+from gestion_matriculas.utils import texto_a_lista
+
+
+class Registro(MutableMapping):
+    """
+    Clase base de los registros. Las subclases declaran sus campos
+    en '__slots__' (en el mismo orden que las columnas del archivo).
+    """
+    __slots__ = ()
+
+    def __init__(self, *valores: Any, **campos: Any) -> None:
+        for campo, valor in zip(self.__slots__, valores):
+            setattr(self, campo, valor)
+        for campo in self.__slots__[len(valores):]:
+            setattr(self, campo, campos.get(campo))
+
+    @classmethod
+    def desde_dict(cls, datos: Mapping[str, Any]) -> "Registro":
+        """
+        Crea un registro a partir de un diccionario (ej. una fila de csv.DictReader).
+        Los campos que falten quedan en None y los sobrantes se ignoran.
+        """
+        return cls(**{campo: datos.get(campo) for campo in cls.__slots__})
+
+    def a_dict(self) -> Dict[str, Any]:
+        """Devuelve una copia del registro como diccionario normal (ej. para JSON)."""
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    # --- Compatibilidad con diccionarios ---
+
+    def __getitem__(self, campo: str) -> Any:
+        if campo not in self.__slots__:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def __setitem__(self, campo: str, valor: Any) -> None:
+        if campo not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} no tiene el campo '{campo}'")
+        setattr(self, campo, valor)
+
+    def __delitem__(self, campo: str) -> None:
+        raise TypeError(f"No se pueden eliminar campos de {type(self).__name__}")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __contains__(self, campo: object) -> bool:
+        return campo in self.__slots__
+
+    def __eq__(self, otro: object) -> bool:
+        # Mapping.__eq__ arma dos diccionarios por comparación (ej. en list.remove):
+        # se comparan los campos directamente
+        if otro is self:
+            return True
+        if type(otro) is type(self):
+            for campo in self.__slots__:
+                if getattr(self, campo) != getattr(otro, campo):
+                    return False
+            return True
+        if isinstance(otro, dict):
+            if len(otro) != len(self.__slots__):
+                return False
+            for campo in self.__slots__:
+                if campo not in otro or otro[campo] != getattr(self, campo):
+                    return False
+            return True
+        return super().__eq__(otro)
+
+    def copy(self) -> "Registro":
+        return type(self)(*(getattr(self, campo) for campo in self.__slots__))
+
+    def __repr__(self) -> str:
+        campos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+
+class Estudiante(Registro):
+    """Registro de un estudiante (estudiantes.csv)."""
+    __slots__ = ("id_estudiante", "nombre", "id_carrera")
+
+    def __init__(self, *valores: Any, **campos: Any) -> None:
+        super().__init__(*valores, **campos)
+        # La carrera se repite en muchos estudiantes: se comparte una sola cadena
+        if isinstance(self.id_carrera, str):
+            self.id_carrera = sys.intern(self.id_carrera)
+
+
+class Curso(Registro):
+    """
+    Registro de un curso (cursos.csv). 'prerrequisitos' es la lista de IDs
+    de los cursos que hay que haber tomado antes (en el CSV, "C001;C002").
+    """
+    __slots__ = ("id_curso", "nombre_curso", "creditos", "prerrequisitos")
+
+    def __init__(self, *valores: Any, **campos: Any) -> None:
+        super().__init__(*valores, **campos)
+        self.prerrequisitos: List[str] = [sys.intern(c) for c in texto_a_lista(self.prerrequisitos)]
+
+
+class Carrera(Registro):
+    """Registro de una carrera (carreras.csv)."""
+    __slots__ = ("id_carrera", "nombre_carrera")
+
+
+class Matricula(Registro):
+    """Registro de una matrícula (matriculas.json)."""
+    __slots__ = ("id_matricula", "id_estudiante", "id_cursos", "periodo_academico")
+
+    def __init__(self, *valores: Any, **campos: Any) -> None:
+        super().__init__(*valores, **campos)
+        # IDs de cursos y periodos se repiten en miles de matrículas
+        self.id_cursos: List[str] = [sys.intern(c) for c in (self.id_cursos or [])]
+        if isinstance(self.periodo_academico, str):
+            self.periodo_academico = sys.intern(self.periodo_academico)
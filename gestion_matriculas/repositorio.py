@@ -0,0 +1,1356 @@
+"""
+Módulo de Repositorios (repositorio.py)
+
+Capa de persistencia intercambiable para las cuatro entidades
+(estudiantes, cursos, carreras y matrículas). Hay dos backends:
+- RepositorioArchivos: los archivos CSV/JSON actuales de 'data/'.
+- RepositorioSQLite: una base de datos 'sqlite3' con claves primarias
+  indexadas y escrituras de una sola fila.
+
+Los servicios siguen trabajando sobre listas de diccionarios en memoria;
+el repositorio solo se encarga de cargarlas y de persistir cada cambio
+(insertar, actualizar o eliminar un registro).
+
+El backend se elige con la variable de entorno MATRICULAS_BACKEND
+("archivos" por defecto, o "sqlite"). Con MATRICULAS_CATALOGO=fijo el
+backend de archivos guarda cursos y carreras en tablas binarias de ancho
+fijo (ver tabla_fija.py) que se modifican registro a registro. Con
+MATRICULAS_COMPARTIDO=1 varias terminales pueden trabajar a la vez sobre
+el mismo 'data/' (ver "Modo compartido" en RepositorioArchivos). Al iniciar, 'cargar_todo' lee
+las cuatro entidades (en paralelo con el backend de archivos) y mide
+cuánto tardó cada una. El backend de archivos guarda además una imagen
+binaria (pickle) de los datos ya indexados, en la carpeta de caché del
+usuario, y la reutiliza mientras los archivos fuente no cambien de tamaño
+ni de fecha. Para migrar los datos
+actuales:
+
+    python -m gestion_matriculas.repositorio migrar [ruta.db]
+"""
+import gc
+import hashlib
+import json
+import os
+import pickle
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import List, Dict, Any, Optional, Tuple, Callable, Set
+
+import gestion_matriculas.estudiantes as est
+import gestion_matriculas.cursos as cur
+import gestion_matriculas.matriculas as mat
+import gestion_matriculas.carreras as car
+from gestion_matriculas import bitacora, concurrencia, tabla_fija
+from gestion_matriculas.almacen import GeneradorIds, SeguimientoCambios
+from gestion_matriculas.registros import Estudiante, Curso, Carrera, Matricula
+from gestion_matriculas.utils import escritura_atomica, lista_a_texto
+
+ENTIDADES = ("estudiantes", "cursos", "carreras", "matriculas")
+
+CLAVES_PRIMARIAS = {
+    "estudiantes": "id_estudiante",
+    "cursos": "id_curso",
+    "carreras": "id_carrera",
+    "matriculas": "id_matricula",
+}
+
+DB_PATH = "data/matriculas.db"
+SECUENCIAS_PATH = "data/secuencias.json"
+# Archivo que se bloquea para escribir en 'data/' en modo compartido
+BLOQUEO_PATH = "data/.bloqueo"
+
+# Modos de carga de 'RepositorioArchivos.cargar_todo'
+MODOS_CARGA = ("secuencial", "hilos", "procesos")
+# A partir de este tamaño total de archivos se cargan en procesos aparte:
+# decodificar CSV/JSON retiene el GIL, así que los hilos solo solapan la lectura
+CARGA_PROCESOS_BYTES = 8 * 1024 * 1024
+
+# Imagen binaria de los datos cargados (arranque en caliente). No va en
+# 'data/': esa carpeta puede ser compartida entre usuarios (modo compartido)
+# y cargar un pickle ejecuta código, así que se guarda en la caché de cada
+# usuario (ver '_ruta_cache'). None = la ruta por defecto.
+CACHE_PATH: Optional[str] = None
+# Se incrementa cuando cambia la estructura de los almacenes o registros
+CACHE_VERSION = 4
+
+# El backend de archivos agrupa las escrituras: los cambios pendientes se
+# escriben al acumular GUARDADO_MAX_CAMBIOS, al pasar GUARDADO_INTERVALO
+# segundos desde el primero, al salir de un submenú y al cerrar.
+GUARDADO_MAX_CAMBIOS = 20
+GUARDADO_INTERVALO = 30.0
+
+
+class Repositorio:
+    """
+    Interfaz común de los backends de persistencia.
+    Las subclases implementan todos los métodos.
+
+    Además de los registros se persiste la marca de agua de IDs de cada
+    entidad (ver GeneradorIds.ultimo_id). Se guarda al eliminar, al guardar
+    todo y al cerrar: en una inserción el ID nuevo ya queda en los datos.
+    """
+
+    def __init__(self) -> None:
+        # Listas cargadas por entidad (para conocer sus marcas de agua)
+        self._datos: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _marcas_de_agua(self) -> Dict[str, int]:
+        """Devuelve la marca de agua de IDs de cada entidad cargada."""
+        return {
+            entidad: registros.ultimo_id
+            for entidad, registros in self._datos.items()
+            if isinstance(registros, GeneradorIds)
+        }
+
+    def _aplicar_marca(self, entidad: str, registros: List[Dict[str, Any]], marcas: Dict[str, int]) -> None:
+        """Registra la lista cargada y le aplica la marca de agua persistida."""
+        self._datos[entidad] = registros
+        if isinstance(registros, GeneradorIds):
+            registros.asegurar_ultimo_id(marcas.get(entidad, 0))
+
+    def cargar(self, entidad: str) -> List[Dict[str, Any]]:
+        """Carga todos los registros de una entidad."""
+        raise NotImplementedError
+
+    def cargar_todo(
+            self,
+            entidades: Tuple[str, ...] = ENTIDADES
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, float]]:
+        """
+        Carga varias entidades y mide cuánto tardó cada una.
+        Esta versión las carga una tras otra.
+
+        Returns:
+            Tuple[Dict[str, List], Dict[str, float]]: (registros por entidad,
+            segundos de carga por entidad).
+        """
+        datos, tiempos = {}, {}
+        for entidad in entidades:
+            inicio = time.perf_counter()
+            datos[entidad] = self.cargar(entidad)
+            tiempos[entidad] = time.perf_counter() - inicio
+        return datos, tiempos
+
+    def guardar(self, entidad: str, registros: List[Dict[str, Any]]) -> None:
+        """Reemplaza todos los registros guardados de una entidad."""
+        raise NotImplementedError
+
+    def insertar(self, entidad: str, registro: Dict[str, Any]) -> str:
+        """
+        Persiste un registro nuevo (ya agregado a la lista en memoria).
+
+        Returns:
+            str: El ID con el que quedó guardado. En modo compartido puede no
+            ser el propuesto, si otra terminal ya lo usó (ver '_preparar_insercion').
+        """
+        raise NotImplementedError
+
+    def insertar_lote(self, entidad: str, registros: List[Dict[str, Any]]) -> None:
+        """
+        Persiste varios registros nuevos (ya agregados, al final de la lista).
+        Por defecto los inserta uno por uno; los backends lo hacen en una
+        sola escritura.
+        """
+        for registro in registros:
+            self.insertar(entidad, registro)
+
+    def actualizar(self, entidad: str, registro: Dict[str, Any]) -> None:
+        """Persiste los cambios de un registro existente."""
+        raise NotImplementedError
+
+    def eliminar(self, entidad: str, id_registro: str) -> None:
+        """Persiste la eliminación de un registro (ya quitado de la lista)."""
+        raise NotImplementedError
+
+    def sincronizar(self) -> List[str]:
+        """
+        Escribe los cambios pendientes. Por defecto cada operación ya se
+        escribe al momento y no hay nada que hacer.
+
+        Returns:
+            List[str]: Las entidades que se escribieron.
+        """
+        return []
+
+    def tomar_errores(self) -> List[str]:
+        """Devuelve (y olvida) los errores de escritura ocurridos en segundo plano."""
+        return []
+
+    def refrescar(self) -> None:
+        """Incorpora los cambios guardados por otras terminales (si el backend lo necesita)."""
+
+    def matriculas_por_estudiante(self, id_estudiante: str) -> List[Dict[str, Any]]:
+        """Devuelve las matrículas de un estudiante."""
+        raise NotImplementedError
+
+    def matriculas_por_curso(self, id_curso: str) -> List[Dict[str, Any]]:
+        """Devuelve las matrículas que incluyen un curso."""
+        raise NotImplementedError
+
+    def matriculas_por_periodo(self, periodo: str) -> List[Dict[str, Any]]:
+        """Devuelve las matrículas de un periodo académico."""
+        raise NotImplementedError
+
+    def cerrar(self) -> None:
+        """Libera los recursos del backend al salir de la aplicación."""
+
+
+class EscritorSegundoPlano:
+    """
+    Hilo que hace las escrituras a disco sin bloquear la interfaz.
+
+    Recibe copias de los datos (que nadie más modifica) y las escribe en
+    el orden en que llegan. Si hay varias copias pendientes de la misma
+    clave, solo se escribe la más reciente. Los errores se acumulan para
+    mostrarlos en la siguiente pantalla (ver 'tomar_errores').
+    """
+
+    def __init__(self) -> None:
+        self._cola: queue.Queue = queue.Queue()
+        self._versiones: Dict[str, int] = {}
+        self._errores: List[str] = []
+        self._candado = threading.Lock()
+        self._hilo = threading.Thread(target=self._trabajar, name="escritor-datos", daemon=True)
+        self._hilo.start()
+
+    def encolar(self, clave: str, funcion: Callable[..., None], *args: Any, reemplazable: bool = True) -> None:
+        """
+        Programa 'funcion(*args)' en el hilo de escritura.
+
+        Args:
+            clave (str): Qué se escribe (ej. "cursos"); una tarea más nueva
+                con la misma clave deja sin efecto a las anteriores.
+            funcion (Callable[..., None]): La función que escribe (puede lanzar excepciones).
+            *args: Sus argumentos (copias que no se modificarán después).
+            reemplazable (bool): False para tareas que siempre deben
+                ejecutarse (ej. añadir una fila); no anulan a las demás.
+        """
+        version = None
+        if reemplazable:
+            with self._candado:
+                version = self._versiones.get(clave, 0) + 1
+                self._versiones[clave] = version
+        self._cola.put((clave, version, funcion, args))
+
+    def _trabajar(self) -> None:
+        while True:
+            tarea = self._cola.get()
+            try:
+                if tarea is None:
+                    return
+                clave, version, funcion, args = tarea
+                with self._candado:
+                    vigente = version is None or self._versiones[clave] == version
+                if vigente:
+                    funcion(*args)
+            except Exception as e:
+                with self._candado:
+                    self._errores.append(f"Error al guardar {clave}: {e}")
+            finally:
+                self._cola.task_done()
+
+    def esperar(self) -> None:
+        """Barrera: espera a que terminen todas las escrituras encoladas."""
+        self._cola.join()
+
+    def tomar_errores(self) -> List[str]:
+        """Devuelve y vacía la lista de errores de escritura."""
+        with self._candado:
+            errores, self._errores = self._errores, []
+        return errores
+
+    def detener(self) -> None:
+        """Termina las escrituras pendientes y cierra el hilo."""
+        self.esperar()
+        self._cola.put(None)
+        self._hilo.join()
+
+
+class RepositorioArchivos(Repositorio):
+    """
+    Backend sobre los archivos CSV/JSON de 'data/'.
+    Delega en las funciones 'cargar_*' y 'guardar_*' de cada módulo.
+    En los CSV, un registro nuevo se añade como una fila al final y las
+    actualizaciones y eliminaciones se anotan en la bitácora del archivo
+    (ver bitacora.py); el CSV se reescribe completo solo cuando la
+    bitácora supera BITACORA_MAX_BYTES o al cerrar. Los cambios que no se
+    avisaron con insertar/actualizar/eliminar quedan pendientes y se
+    escriben juntos (ver GUARDADO_MAX_CAMBIOS y 'sincronizar').
+    Las matrículas nuevas van al journal (ver matriculas.py) y las marcas
+    de agua de IDs a 'secuencias.json'.
+
+    Con 'catalogo_fijo=True' los cursos y las carreras se leen y modifican
+    en sus tablas de ancho fijo (TABLA_PATH de cada módulo, que se crea
+    desde el CSV la primera vez): cada cambio escribe solo los bytes de
+    ese registro. Al cerrar se vuelve a escribir el CSV como respaldo.
+
+    Con 'segundo_plano=True' los CSV y las secuencias se escriben en un
+    EscritorSegundoPlano a partir de una copia de los datos, así la
+    interfaz no espera al disco. Las matrículas completas se siguen
+    escribiendo aquí porque comparten el journal con las inserciones.
+
+    Modo compartido ('compartido=True'): cada escritura se hace con el
+    bloqueo de BLOQUEO_PATH tomado y se compara el sello de versión de
+    los archivos con el de la última lectura o escritura propia. Si otra
+    terminal solo añadió filas o líneas (lo habitual: inserciones,
+    bitácora y journal), se leen únicamente esas líneas y se incorporan a
+    las listas en memoria; si reemplazó un archivo (ej. al compactar), se
+    recarga esa entidad. Un ID nuevo que otra terminal usó al mismo tiempo
+    se reasigna, y actualizar o eliminar un registro que otra terminal
+    acaba de modificar se rechaza (queda su versión). Los avisos se
+    entregan con 'tomar_errores'. En este modo todo se escribe en el
+    momento (sin hilo de escritura), solo con CSV/JSON, y al cerrar no
+    se compacta mientras pueda haber otras terminales abiertas.
+
+    En cualquier modo, 'refrescar' (que la interfaz llama antes de cada
+    menú) usa los mismos sellos para detectar, solo con os.stat, los
+    cambios que otro proceso hizo en 'data/' (otra terminal, un script de
+    importación) y aplica a los almacenes únicamente lo añadido.
+    """
+
+    _CARGADORES = {
+        "estudiantes": est.cargar_estudiantes,
+        "cursos": cur.cargar_cursos,
+        "carreras": car.cargar_carreras,
+        "matriculas": mat.cargar_matriculas,
+    }
+    _GUARDADORES = {
+        "estudiantes": est.guardar_estudiantes,
+        "cursos": cur.guardar_cursos,
+        "carreras": car.guardar_carreras,
+        "matriculas": mat.guardar_matriculas,
+    }
+    # Versiones que propagan los errores (para escribir también la bitácora)
+    _ESCRITORES = {
+        "estudiantes": est.escribir_estudiantes,
+        "cursos": cur.escribir_cursos,
+        "carreras": car.escribir_carreras,
+    }
+    # Entidades en CSV (con bitácora de cambios): módulo y clave primaria
+    _MODULOS_CSV = {
+        "estudiantes": (est, "id_estudiante"),
+        "cursos": (cur, "id_curso"),
+        "carreras": (car, "id_carrera"),
+    }
+
+    # Cómo convertir una fila del CSV en registro (para las filas que añade otro proceso)
+    _DESDE_FILA = {
+        "estudiantes": Estudiante.desde_dict,
+        "cursos": cur.curso_desde_fila,
+        "carreras": Carrera.desde_dict,
+    }
+    # Catálogos que admiten el formato de ancho fijo: módulo, creador del almacén y registro
+    _MODULOS_FIJOS = {
+        "cursos": (cur, cur.crear_almacen_cursos, Curso),
+        "carreras": (car, car.crear_almacen_carreras, Carrera),
+    }
+
+    def __init__(self, segundo_plano: bool = False, catalogo_fijo: bool = False, compartido: bool = False) -> None:
+        if compartido and (segundo_plano or catalogo_fijo):
+            raise ValueError("El modo compartido no admite escritura en segundo plano ni catálogo de ancho fijo")
+        super().__init__()
+        # Operaciones sin escribir por entidad y momento de la primera
+        self._pendientes: Dict[str, int] = {}
+        self._primer_pendiente: Optional[float] = None
+        self._escritor = EscritorSegundoPlano() if segundo_plano else None
+        # Bytes anotados en la bitácora de cada CSV desde su última reescritura
+        self._bytes_bitacora: Dict[str, int] = {}
+        self._catalogo_fijo = catalogo_fijo
+        self._tablas: Dict[str, tabla_fija.TablaFija] = {}
+        # Tablas de ancho fijo cuyo CSV de respaldo quedó desactualizado
+        self._tablas_modificadas: set = set()
+        self._compartido = compartido
+        self._bloqueo = concurrencia.BloqueoArchivo(BLOQUEO_PATH) if compartido else nullcontext()
+        # Sello de versión de cada archivo tras la última lectura o escritura propia
+        self._sellos: Dict[str, Optional[concurrencia.Sello]] = {}
+        self._avisos: List[str] = []
+
+    def _leer_secuencias(self) -> Dict[str, int]:
+        try:
+            with open(SECUENCIAS_PATH, mode='r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Advertencia: No se pudieron leer las secuencias de IDs: {e}")
+            return {}
+
+    def _escribir_secuencias(self, marcas: Dict[str, int]) -> None:
+        guardadas = self._leer_secuencias()
+        for entidad, marca in marcas.items():
+            # Otra terminal pudo dejar una marca mayor: nunca se baja
+            guardadas[entidad] = max(guardadas.get(entidad, 0), marca)
+        with escritura_atomica(SECUENCIAS_PATH, encoding='utf-8') as file:
+            json.dump(guardadas, file, indent=4)
+
+    def _guardar_secuencias(self) -> None:
+        with self._bloqueo:
+            self._ejecutar("secuencias", self._escribir_secuencias, self._marcas_de_agua())
+
+    def _ejecutar(self, clave: str, funcion: Callable[..., None], *args: Any, reemplazable: bool = True) -> None:
+        """
+        Hace una escritura en el hilo de escritura (ver EscritorSegundoPlano.encolar)
+        o, si no lo hay, aquí mismo mostrando el error si falla.
+        """
+        if self._escritor is not None:
+            self._escritor.encolar(clave, self._escribir_y_sellar, clave, funcion, args, reemplazable=reemplazable)
+            return
+        try:
+            self._escribir_y_sellar(clave, funcion, args)
+        except Exception as e:
+            print(f"Error al guardar {clave}: {e}")
+
+    def _escribir_y_sellar(self, clave: str, funcion: Callable[..., None], args: Tuple[Any, ...]) -> None:
+        # El sello se toma justo después de la escritura propia (también en el
+        # hilo de escritura), para que 'refrescar' no la confunda con una ajena
+        funcion(*args)
+        if clave in CLAVES_PRIMARIAS:
+            self._sellar(clave)
+
+    def _es_fija(self, entidad: str) -> bool:
+        return self._catalogo_fijo and entidad in self._MODULOS_FIJOS
+
+    def _tabla(self, entidad: str) -> tabla_fija.TablaFija:
+        """Abre la tabla de ancho fijo de la entidad; si no existe, la crea desde el CSV."""
+        if entidad not in self._tablas:
+            modulo, _, _ = self._MODULOS_FIJOS[entidad]
+            if not os.path.exists(modulo.TABLA_PATH):
+                tabla_fija.escribir_tabla(modulo.TABLA_PATH, modulo.CAMPOS_FIJOS, self._CARGADORES[entidad]())
+            try:
+                self._tablas[entidad] = tabla_fija.TablaFija(modulo.TABLA_PATH, modulo.CAMPOS_FIJOS)
+            except ValueError:
+                # Tabla de una versión anterior (con menos campos): se convierte una vez
+                if not tabla_fija.migrar_tabla(modulo.TABLA_PATH, modulo.CAMPOS_FIJOS):
+                    raise
+                self._tablas[entidad] = tabla_fija.TablaFija(modulo.TABLA_PATH, modulo.CAMPOS_FIJOS)
+        return self._tablas[entidad]
+
+    def _reescribir_tabla(self, entidad: str, registros: List[Dict[str, Any]]) -> None:
+        """Reemplaza la tabla de ancho fijo completa (con anchos nuevos); se reabre al volver a usarla."""
+        modulo, _, _ = self._MODULOS_FIJOS[entidad]
+        tabla = self._tablas.pop(entidad, None)
+        if tabla is not None:
+            tabla.cerrar()
+        try:
+            tabla_fija.escribir_tabla(modulo.TABLA_PATH, modulo.CAMPOS_FIJOS, registros)
+        except IOError as e:
+            print(f"Error al guardar {entidad}: {e}")
+        self._tablas_modificadas.add(entidad)
+
+    def _cambiar_en_tabla(self, entidad: str, operacion: str, registro: Dict[str, Any]) -> None:
+        """
+        Aplica en su lugar el cambio de un registro a la tabla de ancho fijo.
+        Si un texto ya no cabe en su campo, reescribe la tabla con anchos mayores.
+        """
+        tabla = self._tabla(entidad)
+        try:
+            if operacion == "insertar":
+                tabla.agregar(registro)
+            elif operacion == "actualizar":
+                tabla.actualizar(registro)
+            else:
+                tabla.eliminar(registro[tabla.campos[0][0]])
+        except ValueError:
+            if entidad not in self._datos:
+                raise
+            self._reescribir_tabla(entidad, self._datos[entidad])
+        self._tablas_modificadas.add(entidad)
+        self._confirmar_cambio(entidad)
+
+    def _escribir(self, entidad: str, registros: List[Dict[str, Any]]) -> None:
+        """
+        Escribe una entidad completa. Los CSV se escriben desde una copia si hay
+        hilo de escritura, y su bitácora se vacía porque ya queda incluida.
+        """
+        if self._es_fija(entidad):
+            self._reescribir_tabla(entidad, registros)
+            return
+        if entidad not in self._MODULOS_CSV:
+            self._GUARDADORES[entidad](registros)
+            return
+        if self._escritor is not None:
+            registros = [registro.copy() for registro in registros]
+        modulo, _ = self._MODULOS_CSV[entidad]
+        self._ejecutar(entidad, _reescribir_csv, self._ESCRITORES[entidad], registros, modulo.FILE_PATH)
+        self._bytes_bitacora[entidad] = 0
+
+    def _anotar_en_bitacora(self, entidad: str, operacion: str, registro: Dict[str, Any]) -> None:
+        """Anota una actualización o eliminación y reescribe el CSV si la bitácora creció demasiado."""
+        modulo, clave = self._MODULOS_CSV[entidad]
+        linea = bitacora.linea_de_cambio(operacion, clave, registro)
+        self._ejecutar(entidad, bitacora.anexar_linea, modulo.FILE_PATH, linea, reemplazable=False)
+        self._confirmar_cambio(entidad)
+
+        if entidad not in self._bytes_bitacora:
+            self._bytes_bitacora[entidad] = bitacora.tamano_bitacora(modulo.FILE_PATH)
+        self._bytes_bitacora[entidad] += len(linea.encode('utf-8'))
+        if self._bytes_bitacora[entidad] > bitacora.BITACORA_MAX_BYTES and entidad in self._datos:
+            self._compactar(entidad)
+
+    def _compactar(self, entidad: str) -> None:
+        """Reescribe el CSV con los registros en memoria (vaciando su bitácora)."""
+        registros = self._datos[entidad]
+        self._escribir(entidad, registros)
+        self._pendientes.pop(entidad, None)
+        if isinstance(registros, SeguimientoCambios):
+            registros.marcar_guardado()
+
+    def _confirmar_cambio(self, entidad: str, cantidad: int = 1) -> None:
+        """Descuenta del almacén los cambios que ya se escribieron por su cuenta."""
+        registros = self._datos.get(entidad)
+        if isinstance(registros, SeguimientoCambios):
+            registros.descontar_cambio(cantidad)
+
+    def tomar_errores(self) -> List[str]:
+        errores, self._avisos = self._avisos, []
+        if self._escritor is not None:
+            errores.extend(self._escritor.tomar_errores())
+        return errores
+
+    # --- Cambios externos y modo compartido ---
+
+    def _rutas_de_entidad(self, entidad: str) -> Tuple[List[str], List[str]]:
+        """Archivos de una entidad: (los que crecen por el final, los que solo se reemplazan)."""
+        if entidad == "matriculas":
+            return [mat.JOURNAL_PATH], [os.path.join(mat.PERIODOS_DIR, mat.CATALOGO_ARCHIVO), mat.FILE_PATH]
+        modulo, _ = self._MODULOS_CSV[entidad]
+        return [modulo.FILE_PATH, bitacora.ruta_bitacora(modulo.FILE_PATH)], []
+
+    def _sellar(self, entidad: str) -> None:
+        """Anota el sello de versión actual de los archivos de la entidad."""
+        if self._es_fija(entidad):
+            return
+        crecen, completos = self._rutas_de_entidad(entidad)
+        for ruta in crecen + completos:
+            self._sellos[ruta] = concurrencia.sello_version(ruta)
+
+    def _refrescar(self, entidad: str) -> Set[Any]:
+        """
+        Incorpora a la lista en memoria lo que otros procesos escribieron en
+        los archivos de la entidad desde la última lectura o escritura propia.
+        Si solo añadieron líneas se leen únicamente esas; si reemplazaron un
+        archivo se recarga la entidad. Se llama con el bloqueo tomado y sin
+        escrituras propias en curso.
+
+        Returns:
+            Set[Any]: Los IDs que tocaron los otros procesos.
+        """
+        registros = self._datos.get(entidad)
+        if self._es_fija(entidad) or not isinstance(registros, SeguimientoCambios):
+            return set()
+        crecen, completos = self._rutas_de_entidad(entidad)
+        antes = {ruta: self._sellos.get(ruta) for ruta in crecen + completos}
+        ahora = {ruta: concurrencia.sello_version(ruta) for ruta in antes}
+        if ahora == antes:
+            return set()
+
+        solo_anexos = (all(concurrencia.solo_crecio(antes[ruta], ahora[ruta]) for ruta in crecen)
+                       and all(antes[ruta] == ahora[ruta] for ruta in completos))
+        # Lo que escribieron otros ya está en disco: no queda pendiente aquí
+        with registros.sin_registrar_cambios():
+            if solo_anexos:
+                desde = {ruta: antes[ruta][1] if antes[ruta] else 0 for ruta in crecen}
+                if entidad == "cursos":
+                    mat.comprobar_creditos(self._datos.get("matriculas"), registros)
+                tocados = self._leer_anexos(entidad, registros, desde)
+                if entidad == "cursos":
+                    # Otro proceso pudo cambiar créditos: caen solo los totales de esos cursos
+                    for id_curso in tocados:
+                        mat.invalidar_creditos_de_curso(self._datos.get("matriculas"), id_curso, registros)
+            else:
+                if registros.hay_cambios:
+                    self._avisos.append(
+                        f"Otro proceso reemplazó los archivos de {entidad}: se recargaron "
+                        f"y se descartaron los cambios sin guardar."
+                    )
+                tocados = self._recargar(entidad, registros)
+        self._sellos.update(ahora)
+        return tocados
+
+    def _leer_anexos(self, entidad: str, registros: List[Dict[str, Any]], desde: Dict[str, int]) -> Set[Any]:
+        """Lee solo las filas y líneas añadidas desde 'desde' (bytes por archivo) y las aplica."""
+        clave = CLAVES_PRIMARIAS[entidad]
+        if entidad == "matriculas":
+            nuevos = mat.leer_journal(desde[mat.JOURNAL_PATH])
+        else:
+            modulo, _ = self._MODULOS_CSV[entidad]
+            filas = bitacora.leer_filas(modulo.FILE_PATH, modulo.FILE_HEADERS, desde[modulo.FILE_PATH])
+            nuevos = [self._DESDE_FILA[entidad](fila) for fila in filas]
+
+        tocados = set()
+        for registro in nuevos:
+            tocados.add(registro[clave])
+            if registros.buscar(registro[clave]) is None:
+                registros.append(registro)
+        if entidad != "matriculas":
+            cambios = bitacora.leer_cambios(modulo.FILE_PATH, desde[bitacora.ruta_bitacora(modulo.FILE_PATH)])
+            tocados |= bitacora.aplicar(registros, cambios, clave)
+        return tocados
+
+    def _recargar(self, entidad: str, registros: List[Dict[str, Any]]) -> Set[Any]:
+        """Vuelve a leer la entidad completa y reemplaza el contenido de la lista (es el mismo objeto)."""
+        clave = CLAVES_PRIMARIAS[entidad]
+        nuevos = self._CARGADORES[entidad]()
+        anteriores = {registro[clave]: dict(registro) for registro in registros}
+        tocados = {registro[clave] for registro in nuevos if anteriores.pop(registro[clave], None) != dict(registro)}
+        tocados.update(anteriores)
+        registros[:] = list(nuevos)
+        if entidad in ("cursos", "matriculas"):
+            # Los totales de créditos dependen de ambas entidades
+            mat.descartar_creditos(self._datos.get("matriculas"))
+        return tocados
+
+    def _preparar_insercion(self, entidad: str, nuevos: List[Dict[str, Any]]) -> None:
+        """
+        Refresca la entidad antes de escribir registros nuevos (los últimos
+        de la lista). Si otra terminal usó el mismo ID, el registro recibe
+        el siguiente libre.
+        """
+        registros = self._datos.get(entidad)
+        clave = CLAVES_PRIMARIAS[entidad]
+        cantidad = len(nuevos)
+        if (not isinstance(registros, SeguimientoCambios) or len(registros) < cantidad
+                or any(registros[-cantidad + i][clave] != registro[clave] for i, registro in enumerate(nuevos))):
+            self._refrescar(entidad)
+            return
+        with registros.sin_registrar_cambios():
+            # Se sacan los registros nuevos para que las filas de otros queden antes
+            for _ in range(cantidad):
+                registros.pop()
+            self._refrescar(entidad)
+            for registro in nuevos:
+                if registros.buscar(registro[clave]) is not None:
+                    anterior = registro[clave]
+                    registro[clave] = registros.proximo_id()
+                    self._avisos.append(
+                        f"Otro operador registró {anterior} al mismo tiempo; el registro nuevo quedó como {registro[clave]}."
+                    )
+                registros.append(registro)
+
+    def _hay_conflicto(self, entidad: str, id_registro: Any, operacion: str) -> bool:
+        """
+        Refresca la entidad y dice si otra terminal tocó el mismo registro.
+        En ese caso se conserva su versión (la de disco) y se avisa.
+        """
+        if not self._compartido or id_registro not in self._refrescar(entidad):
+            return False
+        registros = self._datos[entidad]
+        if operacion == "eliminar":
+            # El registro ya se quitó de la lista: se vuelve a leer de disco
+            with registros.sin_registrar_cambios():
+                self._recargar(entidad, registros)
+        self._confirmar_cambio(entidad)
+        self._avisos.append(
+            f"Conflicto: otro operador modificó {id_registro} ({entidad}) al mismo tiempo. "
+            f"Se conservó su versión; vuelva a intentarlo."
+        )
+        return True
+
+    def refrescar(self) -> None:
+        """
+        Comprueba (con os.stat, sin leer los archivos) si algún proceso
+        externo cambió los datos y lo incorpora a las listas en memoria:
+        con el journal y la bitácora solo se leen los registros añadidos.
+        """
+        if self._escritor is not None:
+            # Las escrituras propias deben estar en disco (y selladas) antes de comparar
+            self._escritor.esperar()
+        with self._bloqueo:
+            for entidad in list(self._datos):
+                self._refrescar(entidad)
+
+    def cargar(self, entidad: str) -> List[Dict[str, Any]]:
+        with self._bloqueo:
+            if self._es_fija(entidad):
+                # Sin analizar texto: cada registro se desempaqueta de sus bytes
+                _, crear_almacen, tipo_registro = self._MODULOS_FIJOS[entidad]
+                registros = crear_almacen(tipo_registro(*valores) for valores in self._tabla(entidad).valores())
+            else:
+                registros = self._CARGADORES[entidad]()
+            self._aplicar_marca(entidad, registros, self._leer_secuencias())
+            self._sellar(entidad)
+        return registros
+
+    def _rutas_de_datos(self) -> List[str]:
+        """Archivos fuente de las cuatro entidades."""
+        rutas = [est.FILE_PATH, cur.FILE_PATH, car.FILE_PATH, mat.FILE_PATH, mat.JOURNAL_PATH]
+        rutas.extend(bitacora.ruta_bitacora(ruta) for ruta in (est.FILE_PATH, cur.FILE_PATH, car.FILE_PATH))
+        if self._catalogo_fijo:
+            rutas.extend(modulo.TABLA_PATH for modulo, _, _ in self._MODULOS_FIJOS.values())
+        if os.path.isdir(mat.PERIODOS_DIR):
+            rutas.extend(os.path.join(mat.PERIODOS_DIR, nombre) for nombre in sorted(os.listdir(mat.PERIODOS_DIR)))
+        return rutas
+
+    def _bytes_en_disco(self) -> int:
+        """Tamaño total de los archivos de datos (para elegir el modo de carga)."""
+        return sum(os.path.getsize(ruta) for ruta in self._rutas_de_datos() if os.path.isfile(ruta))
+
+    def _firma_archivos(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        """Tamaño y fecha de modificación (ns) de cada archivo fuente, o None si no existe."""
+        firma = {}
+        for ruta in self._rutas_de_datos():
+            try:
+                estado = os.stat(ruta)
+                firma[ruta] = (estado.st_size, estado.st_mtime_ns)
+            except OSError:
+                firma[ruta] = None
+        return firma
+
+    def _leer_cache(self, firma: Dict[str, Optional[Tuple[int, int]]]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Devuelve los datos de la imagen binaria si sigue vigente, o None.
+        Una imagen que no es del usuario actual o que otros pueden modificar
+        no se carga (ver '_cache_confiable').
+        """
+        try:
+            with open(_ruta_cache(), mode='rb') as file:
+                if not _cache_confiable(file.fileno()):
+                    print("Advertencia: La imagen de datos puede ser modificada por otros usuarios; "
+                          "se cargarán los archivos.")
+                    return None
+                # Sin el recolector de basura la carga de miles de objetos es mucho más rápida
+                gc_activo = gc.isenabled()
+                gc.disable()
+                try:
+                    contenido = pickle.load(file)
+                finally:
+                    if gc_activo:
+                        gc.enable()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Advertencia: No se pudo leer la imagen de datos, se cargarán los archivos: {e}")
+            return None
+
+        if contenido.get("version") != CACHE_VERSION or contenido.get("firma") != firma:
+            return None
+        return contenido["datos"]
+
+    def _guardar_cache(self, datos: Dict[str, List[Dict[str, Any]]], firma: Dict[str, Optional[Tuple[int, int]]]) -> None:
+        """
+        Escribe la imagen binaria (de forma atómica, para no dejarla a medias),
+        legible y modificable solo por el usuario actual.
+        """
+        ruta = _ruta_cache()
+        try:
+            os.makedirs(os.path.dirname(ruta) or ".", mode=0o700, exist_ok=True)
+            with escritura_atomica(ruta, mode='wb') as file:
+                if hasattr(os, "fchmod"):
+                    os.fchmod(file.fileno(), 0o600)
+                pickle.dump({"version": CACHE_VERSION, "firma": firma, "datos": datos}, file,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except (IOError, pickle.PicklingError) as e:
+            print(f"Advertencia: No se pudo guardar la imagen de datos: {e}")
+
+    def cargar_todo(
+            self,
+            entidades: Tuple[str, ...] = ENTIDADES,
+            modo: Optional[str] = None,
+            usar_cache: bool = True
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, float]]:
+        """
+        Lee y decodifica los archivos de todas las entidades a la vez, de modo
+        que el arranque tarda lo que el archivo más lento y no la suma de todos.
+
+        Si la imagen binaria (ver '_ruta_cache') coincide con el tamaño y la fecha de
+        los archivos fuente, se usa en su lugar; si no, se cargan los archivos
+        y se vuelve a escribir la imagen.
+
+        Args:
+            entidades (Tuple[str, ...]): Entidades a cargar.
+            modo (Optional[str]): "secuencial", "hilos" o "procesos". Por defecto
+                se lee MATRICULAS_CARGA; si no está definida se usan procesos
+                cuando hay varios núcleos y los archivos superan
+                CARGA_PROCESOS_BYTES, e hilos si no.
+            usar_cache (bool): False para ignorar la imagen binaria.
+
+        Returns:
+            Tuple[Dict[str, List], Dict[str, float]]: (registros por entidad,
+            segundos que tardó cada archivo, o {"cache": segundos}).
+        """
+        with self._bloqueo:
+            firma = self._firma_archivos()
+            datos, tiempos = None, None
+            if usar_cache:
+                inicio = time.perf_counter()
+                en_cache = self._leer_cache(firma)
+                if en_cache is not None and all(entidad in en_cache for entidad in entidades):
+                    marcas = self._leer_secuencias()
+                    datos = {entidad: en_cache[entidad] for entidad in entidades}
+                    for entidad, registros in datos.items():
+                        self._aplicar_marca(entidad, registros, marcas)
+                    tiempos = {"cache": time.perf_counter() - inicio}
+
+            if datos is None:
+                datos, tiempos = self._cargar_archivos(entidades, modo)
+                if usar_cache and set(entidades) == set(ENTIDADES):
+                    self._guardar_cache(datos, firma)
+            for entidad in datos:
+                self._sellar(entidad)
+        return datos, tiempos
+
+    def _cargar_archivos(
+            self,
+            entidades: Tuple[str, ...],
+            modo: Optional[str]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, float]]:
+        """Carga las entidades desde sus archivos (ver 'cargar_todo')."""
+        modo = (modo or os.environ.get("MATRICULAS_CARGA", "")).strip().lower()
+        if not modo:
+            varios_nucleos = (os.cpu_count() or 1) > 1
+            modo = "procesos" if varios_nucleos and self._bytes_en_disco() > CARGA_PROCESOS_BYTES else "hilos"
+        if modo not in MODOS_CARGA:
+            raise ValueError(f"Modo de carga desconocido: '{modo}'")
+        if modo == "secuencial":
+            return super().cargar_todo(entidades)
+
+        # Las tablas de ancho fijo quedan abiertas en este proceso: se leen aquí
+        fijas = tuple(entidad for entidad in entidades if self._es_fija(entidad))
+        datos, tiempos = super().cargar_todo(fijas)
+        resto = [entidad for entidad in entidades if entidad not in fijas]
+        if not resto:
+            return datos, tiempos
+
+        ejecutor = ProcessPoolExecutor if modo == "procesos" else ThreadPoolExecutor
+        with ejecutor(max_workers=len(resto)) as pool:
+            futuros = {entidad: pool.submit(_cargar_entidad_medida, entidad) for entidad in resto}
+            resultados = {entidad: futuro.result() for entidad, futuro in futuros.items()}
+
+        marcas = self._leer_secuencias()
+        for entidad, (registros, segundos) in resultados.items():
+            self._aplicar_marca(entidad, registros, marcas)
+            datos[entidad] = registros
+            tiempos[entidad] = segundos
+        return datos, tiempos
+
+    def guardar(self, entidad: str, registros: List[Dict[str, Any]]) -> None:
+        with self._bloqueo:
+            self._datos[entidad] = registros
+            self._escribir(entidad, registros)
+            self._pendientes.pop(entidad, None)
+            if isinstance(registros, SeguimientoCambios):
+                registros.marcar_guardado()
+            self._guardar_secuencias()
+            self._sellar(entidad)
+
+    def _programar_guardado(self, entidad: str, operacion: str, registro: Dict[str, Any]) -> None:
+        """Anota un cambio pendiente y escribe todo si se llegó a algún límite."""
+        if entidad not in self._datos:
+            # Los guardadores reescriben el archivo completo: nunca se les pasa
+            # una lista parcial, primero se carga la entidad
+            self._cargar_y_aplicar(entidad, operacion, registro)
+
+        self._pendientes[entidad] = self._pendientes.get(entidad, 0) + 1
+        if self._primer_pendiente is None:
+            self._primer_pendiente = time.monotonic()
+        if (sum(self._pendientes.values()) >= GUARDADO_MAX_CAMBIOS
+                or time.monotonic() - self._primer_pendiente >= GUARDADO_INTERVALO):
+            self.sincronizar()
+
+    def _cargar_y_aplicar(self, entidad: str, operacion: str, registro: Dict[str, Any]) -> None:
+        """
+        Carga una entidad que este repositorio aún no tenía y le aplica el
+        cambio avisado (la lista del llamador ya lo tiene, la cargada no).
+        """
+        registros = self.cargar(entidad)
+        clave = CLAVES_PRIMARIAS[entidad]
+        posicion = next((i for i, actual in enumerate(registros) if actual[clave] == registro[clave]), None)
+        if operacion == "insertar":
+            if posicion is None:
+                registros.append(registro)
+        elif posicion is not None:
+            if operacion == "actualizar":
+                registros[posicion] = registro
+            else:
+                del registros[posicion]
+
+    def entidades_pendientes(self) -> List[str]:
+        """
+        Devuelve las entidades con cambios sin escribir: las avisadas con
+        insertar/actualizar/eliminar y las que su almacén marca como modificadas.
+        """
+        return [
+            entidad for entidad, registros in self._datos.items()
+            if entidad in self._pendientes or (isinstance(registros, SeguimientoCambios) and registros.hay_cambios)
+        ]
+
+    def sincronizar(self) -> List[str]:
+        for tabla in self._tablas.values():
+            tabla.sincronizar()
+        with self._bloqueo:
+            escritas = self.entidades_pendientes()
+            for entidad in escritas:
+                if self._compartido:
+                    # Antes de reescribir se incorpora lo que hayan escrito otras terminales
+                    self._refrescar(entidad)
+                registros = self._datos[entidad]
+                self._escribir(entidad, registros)
+                if isinstance(registros, SeguimientoCambios):
+                    registros.marcar_guardado()
+                self._sellar(entidad)
+            if escritas:
+                self._guardar_secuencias()
+        self._pendientes.clear()
+        self._primer_pendiente = None
+        return escritas
+
+    def insertar(self, entidad: str, registro: Dict[str, Any]) -> str:
+        with self._bloqueo:
+            if self._compartido:
+                self._preparar_insercion(entidad, [registro])
+            self._insertar(entidad, registro)
+            self._sellar(entidad)
+        return registro[CLAVES_PRIMARIAS[entidad]]
+
+    def insertar_lote(self, entidad: str, registros: List[Dict[str, Any]]) -> None:
+        if not registros:
+            return
+        with self._bloqueo:
+            if self._compartido:
+                self._preparar_insercion(entidad, registros)
+            if entidad == "matriculas":
+                # Todas las líneas del lote van al journal en una sola escritura
+                mat.registrar_matriculas(registros)
+                self._compactar_journal()
+            elif entidad in self._MODULOS_CSV and entidad in self._datos:
+                if self._es_fija(entidad):
+                    # Una sola reescritura (con anchos nuevos si hace falta) en lugar de un remapeo por fila
+                    self._reescribir_tabla(entidad, self._datos[entidad])
+                else:
+                    modulo, _ = self._MODULOS_CSV[entidad]
+                    self._ejecutar(entidad, bitacora.anexar_filas, modulo.FILE_PATH, modulo.FILE_HEADERS,
+                                   [dict(registro) for registro in registros], reemplazable=False)
+                self._confirmar_cambio(entidad, len(registros))
+            else:
+                for registro in registros:
+                    self._insertar(entidad, registro)
+            self._sellar(entidad)
+
+    def _insertar(self, entidad: str, registro: Dict[str, Any]) -> None:
+        if entidad == "matriculas":
+            mat.registrar_matricula(registro)
+            self._compactar_journal()
+            return
+        if self._es_fija(entidad):
+            self._cambiar_en_tabla(entidad, "insertar", registro)
+            return
+        if entidad in self._MODULOS_CSV:
+            # Una fila al final del CSV: el costo no depende del tamaño del archivo
+            modulo, _ = self._MODULOS_CSV[entidad]
+            self._ejecutar(entidad, bitacora.anexar_fila, modulo.FILE_PATH, modulo.FILE_HEADERS,
+                           dict(registro), reemplazable=False)
+            self._confirmar_cambio(entidad)
+            return
+        self._programar_guardado(entidad, "insertar", registro)
+
+    def _compactar_journal(self) -> None:
+        """
+        Vuelca el journal a las particiones si creció demasiado. Solo con las
+        matrículas cargadas: compactar con una lista parcial reescribiría los
+        periodos (o el almacén completo) sin las demás.
+        """
+        if "matriculas" in self._datos and mat.necesita_compactacion():
+            mat.compactar_matriculas(self._datos["matriculas"])
+
+    def actualizar(self, entidad: str, registro: Dict[str, Any]) -> None:
+        with self._bloqueo:
+            if self._hay_conflicto(entidad, registro[CLAVES_PRIMARIAS[entidad]], "actualizar"):
+                return
+            self._actualizar(entidad, registro)
+            self._sellar(entidad)
+
+    def _actualizar(self, entidad: str, registro: Dict[str, Any]) -> None:
+        if self._es_fija(entidad):
+            self._cambiar_en_tabla(entidad, "actualizar", registro)
+            return
+        if entidad in self._MODULOS_CSV:
+            self._anotar_en_bitacora(entidad, "actualizar", registro)
+            return
+        self._programar_guardado(entidad, "actualizar", registro)
+
+    def eliminar(self, entidad: str, id_registro: str) -> None:
+        with self._bloqueo:
+            if self._hay_conflicto(entidad, id_registro, "eliminar"):
+                return
+            self._eliminar(entidad, id_registro)
+            self._sellar(entidad)
+
+    def _eliminar(self, entidad: str, id_registro: str) -> None:
+        if self._es_fija(entidad):
+            self._cambiar_en_tabla(entidad, "eliminar", {CLAVES_PRIMARIAS[entidad]: id_registro})
+            return
+        if entidad in self._MODULOS_CSV:
+            _, clave = self._MODULOS_CSV[entidad]
+            self._anotar_en_bitacora(entidad, "eliminar", {clave: id_registro})
+            return
+        self._programar_guardado(entidad, "eliminar", {CLAVES_PRIMARIAS[entidad]: id_registro})
+
+    def matriculas_por_estudiante(self, id_estudiante: str) -> List[Dict[str, Any]]:
+        matriculas = self._datos.get("matriculas", [])
+        if isinstance(matriculas, mat.AlmacenMatriculas):
+            return matriculas.matriculas_de_estudiante(id_estudiante)
+        return [m for m in matriculas if m["id_estudiante"] == id_estudiante]
+
+    def matriculas_por_curso(self, id_curso: str) -> List[Dict[str, Any]]:
+        matriculas = self._datos.get("matriculas", [])
+        if isinstance(matriculas, mat.AlmacenMatriculas):
+            return matriculas.matriculas_de_curso(id_curso)
+        return [m for m in matriculas if id_curso in m["id_cursos"]]
+
+    def matriculas_por_periodo(self, periodo: str) -> List[Dict[str, Any]]:
+        matriculas = self._datos.get("matriculas")
+        if isinstance(matriculas, mat.AlmacenMatriculas):
+            return matriculas.matriculas_de_periodo(periodo)
+        # Sin matrículas cargadas se lee solo la partición del periodo
+        return list(mat.cargar_matriculas([periodo]))
+
+    def cerrar(self) -> None:
+        with self._bloqueo:
+            self._cerrar()
+
+    def _cerrar(self) -> None:
+        self.sincronizar()
+        for entidad in self._tablas_modificadas:
+            if entidad in self._datos:
+                # El CSV de respaldo se escribe una sola vez, al salir
+                self._ejecutar(entidad, _reescribir_csv, self._ESCRITORES[entidad],
+                               [registro.copy() for registro in self._datos[entidad]],
+                               self._MODULOS_CSV[entidad][0].FILE_PATH)
+        for tabla in self._tablas.values():
+            tabla.cerrar()
+        self._tablas.clear()
+        for entidad, (modulo, _) in self._MODULOS_CSV.items():
+            if self._es_fija(entidad) or self._compartido:
+                # En modo compartido otra terminal podría estar leyendo solo lo añadido
+                continue
+            if entidad in self._bytes_bitacora:
+                anotado = self._bytes_bitacora[entidad]
+            else:
+                anotado = bitacora.tamano_bitacora(modulo.FILE_PATH)
+            if entidad in self._datos and anotado:
+                self._compactar(entidad)
+        if "matriculas" in self._datos and not self._compartido:
+            mat.compactar_matriculas(self._datos["matriculas"])
+        if self._datos:
+            self._guardar_secuencias()
+        if self._escritor is not None:
+            # Barrera: nada queda a medio escribir al salir
+            self._escritor.detener()
+        # Cada cambio ya se escribió en los archivos: la imagen queda al día
+        # para que el próximo arranque no tenga que volver a leerlos
+        if set(self._datos) == set(ENTIDADES):
+            self._guardar_cache(dict(self._datos), self._firma_archivos())
+
+
+class RepositorioSQLite(Repositorio):
+    """
+    Backend sobre una base de datos SQLite (módulo estándar 'sqlite3').
+    Cada entidad es una tabla con su ID como clave primaria; los cursos
+    de cada matrícula van en la tabla 'matricula_cursos', indexada por
+    curso, y 'matriculas' está indexada por estudiante.
+    """
+
+    _COLUMNAS = {
+        "estudiantes": est.FILE_HEADERS,
+        "cursos": cur.FILE_HEADERS,
+        "carreras": car.FILE_HEADERS,
+        "matriculas": ["id_matricula", "id_estudiante", "periodo_academico"],
+    }
+
+    _REGISTROS = {
+        "estudiantes": Estudiante,
+        "cursos": Curso,
+        "carreras": Carrera,
+        "matriculas": Matricula,
+    }
+
+    _ALMACENES = {
+        "estudiantes": est.crear_almacen_estudiantes,
+        "cursos": cur.crear_almacen_cursos,
+        "carreras": car.crear_almacen_carreras,
+    }
+
+    _ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS carreras (
+            id_carrera TEXT PRIMARY KEY,
+            nombre_carrera TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS estudiantes (
+            id_estudiante TEXT PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            id_carrera TEXT
+        );
+        CREATE TABLE IF NOT EXISTS cursos (
+            id_curso TEXT PRIMARY KEY,
+            nombre_curso TEXT NOT NULL,
+            creditos INTEGER NOT NULL DEFAULT 0,
+            prerrequisitos TEXT NOT NULL DEFAULT ''
+        );
+        CREATE TABLE IF NOT EXISTS matriculas (
+            id_matricula TEXT PRIMARY KEY,
+            id_estudiante TEXT NOT NULL,
+            periodo_academico TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS matricula_cursos (
+            id_matricula TEXT NOT NULL,
+            posicion INTEGER NOT NULL,
+            id_curso TEXT NOT NULL,
+            PRIMARY KEY (id_matricula, posicion)
+        );
+        CREATE TABLE IF NOT EXISTS secuencias (
+            entidad TEXT PRIMARY KEY,
+            ultimo_id INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_matriculas_estudiante ON matriculas (id_estudiante);
+        CREATE INDEX IF NOT EXISTS idx_matricula_cursos_curso ON matricula_cursos (id_curso);
+        CREATE INDEX IF NOT EXISTS idx_matriculas_periodo ON matriculas (periodo_academico);
+    """
+
+    def __init__(self, ruta: str = DB_PATH) -> None:
+        super().__init__()
+        self.ruta = ruta
+        self._conn = sqlite3.connect(ruta)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(self._ESQUEMA)
+        self._agregar_columnas_nuevas()
+
+    # --- Helpers internos ---
+
+    def _agregar_columnas_nuevas(self) -> None:
+        """Agrega a una base creada con una versión anterior las columnas que le falten."""
+        columnas = {fila["name"] for fila in self._conn.execute("PRAGMA table_info(cursos)")}
+        if "prerrequisitos" not in columnas:
+            with self._conn:
+                self._conn.execute("ALTER TABLE cursos ADD COLUMN prerrequisitos TEXT NOT NULL DEFAULT ''")
+
+    def _fila_a_registro(self, entidad: str, fila: sqlite3.Row) -> Dict[str, Any]:
+        return self._REGISTROS[entidad](**{columna: fila[columna] for columna in self._COLUMNAS[entidad]})
+
+    def _valores(self, entidad: str, registro: Dict[str, Any]) -> List[Any]:
+        valores = [registro.get(columna) for columna in self._COLUMNAS[entidad]]
+        if entidad == "cursos":
+            valores[2] = registro.get("creditos", 0)
+            valores[3] = lista_a_texto(registro.get("prerrequisitos") or [])
+        return valores
+
+    def _leer_matriculas(self, condicion: str = "", parametros: tuple = ()) -> List[Dict[str, Any]]:
+        """Lee matrículas (en orden de inserción) junto con sus cursos."""
+        filas = self._conn.execute(
+            f"SELECT * FROM matriculas {condicion} ORDER BY rowid", parametros
+        ).fetchall()
+        matriculas = []
+        por_id = {}
+        for fila in filas:
+            registro = self._fila_a_registro("matriculas", fila)
+            registro["id_cursos"] = []
+            matriculas.append(registro)
+            por_id[registro["id_matricula"]] = registro
+
+        filas_cursos = self._conn.execute(
+            "SELECT id_matricula, id_curso FROM matricula_cursos "
+            f"WHERE id_matricula IN (SELECT id_matricula FROM matriculas {condicion}) "
+            "ORDER BY id_matricula, posicion",
+            parametros
+        ).fetchall()
+
+        for fila in filas_cursos:
+            registro = por_id.get(fila["id_matricula"])
+            if registro is not None:
+                registro["id_cursos"].append(fila["id_curso"])
+        return matriculas
+
+    def _insertar_fila(self, entidad: str, registro: Dict[str, Any]) -> None:
+        columnas = self._COLUMNAS[entidad]
+        marcadores = ", ".join("?" for _ in columnas)
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {entidad} ({', '.join(columnas)}) VALUES ({marcadores})",
+            self._valores(entidad, registro)
+        )
+        if entidad == "matriculas":
+            self._conn.execute("DELETE FROM matricula_cursos WHERE id_matricula = ?", (registro["id_matricula"],))
+            self._conn.executemany(
+                "INSERT INTO matricula_cursos (id_matricula, posicion, id_curso) VALUES (?, ?, ?)",
+                [(registro["id_matricula"], pos, id_curso) for pos, id_curso in enumerate(registro["id_cursos"])]
+            )
+
+    def _guardar_secuencias(self) -> None:
+        """Persiste las marcas de agua (se llama dentro de una transacción)."""
+        self._conn.executemany(
+            "INSERT INTO secuencias (entidad, ultimo_id) VALUES (?, ?) "
+            "ON CONFLICT (entidad) DO UPDATE SET ultimo_id = MAX(ultimo_id, excluded.ultimo_id)",
+            list(self._marcas_de_agua().items())
+        )
+
+    # --- Interfaz del repositorio ---
+
+    def cargar(self, entidad: str) -> List[Dict[str, Any]]:
+        if entidad == "matriculas":
+            registros = mat.crear_almacen_matriculas(self._leer_matriculas())
+        else:
+            filas = self._conn.execute(f"SELECT * FROM {entidad} ORDER BY rowid").fetchall()
+            registros = self._ALMACENES[entidad](self._fila_a_registro(entidad, fila) for fila in filas)
+
+        marcas = dict(self._conn.execute("SELECT entidad, ultimo_id FROM secuencias").fetchall())
+        self._aplicar_marca(entidad, registros, marcas)
+        return registros
+
+    def guardar(self, entidad: str, registros: List[Dict[str, Any]]) -> None:
+        self._datos[entidad] = registros
+        with self._conn:
+            self._conn.execute(f"DELETE FROM {entidad}")
+            if entidad == "matriculas":
+                self._conn.execute("DELETE FROM matricula_cursos")
+            for registro in registros:
+                self._insertar_fila(entidad, registro)
+            self._guardar_secuencias()
+
+    def insertar(self, entidad: str, registro: Dict[str, Any]) -> str:
+        with self._conn:
+            self._insertar_fila(entidad, registro)
+        return registro[CLAVES_PRIMARIAS[entidad]]
+
+    def insertar_lote(self, entidad: str, registros: List[Dict[str, Any]]) -> None:
+        # Una sola transacción: un solo commit (y fsync) para todo el lote
+        with self._conn:
+            for registro in registros:
+                self._insertar_fila(entidad, registro)
+
+    def actualizar(self, entidad: str, registro: Dict[str, Any]) -> None:
+        clave = CLAVES_PRIMARIAS[entidad]
+        columnas = [c for c in self._COLUMNAS[entidad] if c != clave]
+        asignaciones = ", ".join(f"{c} = ?" for c in columnas)
+        valores = dict(zip(self._COLUMNAS[entidad], self._valores(entidad, registro)))
+        with self._conn:
+            self._conn.execute(
+                f"UPDATE {entidad} SET {asignaciones} WHERE {clave} = ?",
+                [valores[c] for c in columnas] + [registro[clave]]
+            )
+
+    def eliminar(self, entidad: str, id_registro: str) -> None:
+        clave = CLAVES_PRIMARIAS[entidad]
+        with self._conn:
+            self._conn.execute(f"DELETE FROM {entidad} WHERE {clave} = ?", (id_registro,))
+            if entidad == "matriculas":
+                self._conn.execute("DELETE FROM matricula_cursos WHERE id_matricula = ?", (id_registro,))
+            self._guardar_secuencias()
+
+    def matriculas_por_estudiante(self, id_estudiante: str) -> List[Dict[str, Any]]:
+        return self._leer_matriculas("WHERE id_estudiante = ?", (id_estudiante,))
+
+    def matriculas_por_curso(self, id_curso: str) -> List[Dict[str, Any]]:
+        return self._leer_matriculas(
+            "WHERE id_matricula IN (SELECT id_matricula FROM matricula_cursos WHERE id_curso = ?)",
+            (id_curso,)
+        )
+
+    def matriculas_por_periodo(self, periodo: str) -> List[Dict[str, Any]]:
+        return self._leer_matriculas("WHERE periodo_academico = ?", (periodo,))
+
+    def cerrar(self) -> None:
+        with self._conn:
+            self._guardar_secuencias()
+        self._conn.close()
+
+
+def _reescribir_csv(escribir: Callable[[List[Dict[str, Any]]], None], registros: List[Dict[str, Any]], ruta_csv: str) -> None:
+    """Reescribe un CSV completo y, solo si salió bien, vacía su bitácora."""
+    escribir(registros)
+    bitacora.vaciar_bitacora(ruta_csv)
+
+
+def _cargar_entidad_medida(entidad: str) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Carga una entidad desde sus archivos y mide el tiempo.
+    Es una función de módulo para poder ejecutarla en otro proceso.
+    """
+    inicio = time.perf_counter()
+    registros = RepositorioArchivos._CARGADORES[entidad]()
+    return registros, time.perf_counter() - inicio
+
+
+def _ruta_cache() -> str:
+    """
+    Ruta de la imagen binaria: CACHE_PATH o, por defecto, un archivo por
+    carpeta de datos dentro de la caché del usuario (XDG_CACHE_HOME,
+    LOCALAPPDATA o ~/.cache).
+    """
+    if CACHE_PATH:
+        return CACHE_PATH
+    base = (os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    carpeta_datos = os.path.abspath(os.path.dirname(est.FILE_PATH))
+    nombre = hashlib.sha256(carpeta_datos.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(base, "gestion_matriculas", f"datos_{nombre}.pickle")
+
+
+def _cache_confiable(descriptor: int) -> bool:
+    """
+    Indica si la imagen abierta se puede cargar: en POSIX debe ser del
+    usuario actual y nadie más debe poder escribirla.
+    """
+    if not hasattr(os, "getuid"):
+        return True
+    estado = os.fstat(descriptor)
+    return estado.st_uid == os.getuid() and not estado.st_mode & 0o022
+
+
+def crear_repositorio(tipo: Optional[str] = None, ruta_db: Optional[str] = None) -> Repositorio:
+    """
+    Crea el backend de persistencia configurado.
+
+    Args:
+        tipo (Optional[str]): "archivos" o "sqlite". Por defecto se lee
+            la variable de entorno MATRICULAS_BACKEND.
+        ruta_db (Optional[str]): Ruta de la base SQLite. Por defecto se lee
+            MATRICULAS_DB o se usa DB_PATH.
+
+    Returns:
+        Repositorio: El backend listo para usar.
+    """
+    tipo = (tipo or os.environ.get("MATRICULAS_BACKEND", "archivos")).strip().lower()
+    if tipo == "sqlite":
+        return RepositorioSQLite(ruta_db or os.environ.get("MATRICULAS_DB", DB_PATH))
+    if tipo == "archivos":
+        if os.environ.get("MATRICULAS_COMPARTIDO", "").strip() == "1":
+            return RepositorioArchivos(compartido=True)
+        catalogo_fijo = os.environ.get("MATRICULAS_CATALOGO", "csv").strip().lower() == "fijo"
+        return RepositorioArchivos(segundo_plano=True, catalogo_fijo=catalogo_fijo)
+    raise ValueError(f"Backend de persistencia desconocido: '{tipo}'")
+
+
+def migrar_archivos_a_sqlite(ruta_db: str = DB_PATH) -> Dict[str, int]:
+    """
+    Copia todos los datos de los archivos CSV/JSON a una base SQLite.
+    Reemplaza el contenido previo de las tablas.
+
+    Args:
+        ruta_db (str): Ruta de la base de datos de destino.
+
+    Returns:
+        Dict[str, int]: Número de registros migrados por entidad.
+    """
+    origen = RepositorioArchivos()
+    destino = RepositorioSQLite(ruta_db)
+    totales = {}
+    try:
+        for entidad in ENTIDADES:
+            registros = origen.cargar(entidad)
+            destino.guardar(entidad, registros)
+            totales[entidad] = len(registros)
+    finally:
+        destino.cerrar()
+    return totales
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrar":
+        ruta = sys.argv[2] if len(sys.argv) > 2 else DB_PATH
+        resultado = migrar_archivos_a_sqlite(ruta)
+        for nombre, total in resultado.items():
+            print(f"{nombre}: {total} registro(s) migrados a {ruta}")
+    else:
+        print("Uso: python -m gestion_matriculas.repositorio migrar [ruta.db]")
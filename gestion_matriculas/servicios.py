@@ -11,12 +11,16 @@ Funciones en este módulo:
 - NO importan 'ui' ni interactúan directamente con la consola.
 - Devuelven diccionarios de respuesta para que 'main.py' se los pase a 'ui.py'.
 """
-from typing import List, Dict, Any, Optional
+import csv
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 # Importar los módulos de datos
 import gestion_matriculas.estudiantes as est
 import gestion_matriculas.cursos as cur
 import gestion_matriculas.matriculas as mat
 import gestion_matriculas.carreras as car
+import gestion_matriculas.analitica as ana
+import gestion_matriculas.examenes as exa
+from gestion_matriculas.almacen import editando, normalizar_nombre
 
 
 # --- Servicios de Estudiantes ---
@@ -32,9 +36,8 @@ def srv_registrar_estudiante(lista_est: List[Dict], lista_car: List[Dict], nombr
     if not car.buscar_carrera_por_id(lista_car, id_carrera):
         return {"tipo": "error", "mensaje": f"El ID de carrera '{id_carrera}' no es válido."}
 
-    for est_existente in lista_est:
-        if est_existente["nombre"].strip().lower() == nombre.strip().lower():
-            return {"tipo": "error", "mensaje": f"Ya existe un estudiante con el nombre '{nombre}'."}
+    if est.existe_nombre_estudiante(lista_est, nombre):
+        return {"tipo": "error", "mensaje": f"Ya existe un estudiante con el nombre '{nombre}'."}
 
     nuevo_est = est.crear_estudiante(lista_est, nombre, id_carrera)
     lista_est.append(nuevo_est)
@@ -55,7 +58,8 @@ def srv_actualizar_estudiante(lista_est: List[Dict], lista_car: List[Dict], id_e
     if n_id_carrera and not car.buscar_carrera_por_id(lista_car, n_id_carrera):
         return {"tipo": "error", "mensaje": f"El ID de carrera '{n_id_carrera}' no es válido. No se actualizó la carrera."}
 
-    est.actualizar_estudiante(estudiante_obj, n_nombre, n_id_carrera)
+    with editando(lista_est, estudiante_obj):
+        est.actualizar_estudiante(estudiante_obj, n_nombre, n_id_carrera)
     return {"tipo": "exito", "mensaje": f"Estudiante {id_est} actualizado con éxito."}
 
 
@@ -64,9 +68,8 @@ def srv_eliminar_estudiante(lista_est: List[Dict], lista_mat: List[Dict], id_est
     Servicio para validar y eliminar un estudiante.
     VALIDACIÓN: No permite eliminar si tiene matrículas.
     """
-    for matricula in lista_mat:
-        if matricula.get("id_estudiante") == id_est:
-            return {"tipo": "error", "mensaje": f"No se puede eliminar. Estudiante {id_est} tiene matrículas registradas."}
+    if mat.contar_matriculas_de_estudiante(lista_mat, id_est) > 0:
+        return {"tipo": "error", "mensaje": f"No se puede eliminar. Estudiante {id_est} tiene matrículas registradas."}
 
     exito = est.eliminar_estudiante(lista_est, id_est)
     if exito:
@@ -76,46 +79,110 @@ def srv_eliminar_estudiante(lista_est: List[Dict], lista_mat: List[Dict], id_est
 
 # --- Servicios de Cursos ---
 
-def srv_registrar_curso(lista_cur: List[Dict], nombre: str, creditos: Optional[int]) -> Dict[str, str]:
+def _prerrequisitos_inexistentes(lista_cur: List[Dict], prerrequisitos: List[str]) -> Optional[Dict[str, str]]:
+    """Devuelve la respuesta de error si algún prerrequisito no es un curso registrado."""
+    inexistentes = [id_c for id_c in prerrequisitos if not cur.buscar_curso_por_id(lista_cur, id_c)]
+    if inexistentes:
+        return {"tipo": "error", "mensaje": f"Prerrequisitos inexistentes: {', '.join(inexistentes)}."}
+    return None
+
+
+def srv_registrar_curso(
+    lista_cur: List[Dict],
+    nombre: str,
+    creditos: Optional[int],
+    prerrequisitos: Optional[List[str]] = None,
+    lista_mat: Optional[List[Dict]] = None
+) -> Dict[str, str]:
     """
     Servicio para validar y crear un nuevo curso.
+    Los prerrequisitos deben ser cursos registrados (un curso nuevo no
+    puede formar un ciclo: ningún otro lo exige todavía). El cierre de
+    prerrequisitos guardado en 'lista_mat' se actualiza sin rearmarlo.
     """
     if not nombre or creditos is None:
         return {"tipo": "error", "mensaje": "Nombre y créditos son obligatorios."}
     if creditos < 0:
         return {"tipo": "error", "mensaje": "Los créditos no pueden ser negativos."}
-
-    nuevo_cur = cur.crear_curso(lista_cur, nombre, creditos)
+    error = _prerrequisitos_inexistentes(lista_cur, prerrequisitos or [])
+    if error:
+        return error
+
+    lista_mat = lista_mat if lista_mat is not None else []
+    cierre = mat.obtener_cierre_prerrequisitos(lista_mat, lista_cur)
+    mat.comprobar_creditos(lista_mat, lista_cur)
+    nuevo_cur = cur.crear_curso(lista_cur, nombre, creditos, prerrequisitos)
     lista_cur.append(nuevo_cur)
+    cierre.establecer(nuevo_cur["id_curso"], nuevo_cur["prerrequisitos"])
+    mat.confirmar_cierre_prerrequisitos(lista_mat, lista_cur, cierre)
+    mat.invalidar_creditos_de_curso(lista_mat, nuevo_cur["id_curso"], lista_cur)
     return {"tipo": "exito", "mensaje": f"Curso '{nombre}' creado con ID {nuevo_cur['id_curso']}"}
 
 
-def srv_actualizar_curso(lista_cur: List[Dict], id_cur: str, n_nombre: Optional[str], n_creditos: Optional[int]) -> Dict[str, str]:
+def srv_actualizar_curso(
+    lista_cur: List[Dict],
+    id_cur: str,
+    n_nombre: Optional[str],
+    n_creditos: Optional[int],
+    lista_mat: Optional[List[Dict]] = None,
+    n_prerrequisitos: Optional[List[str]] = None
+) -> Dict[str, str]:
     """
     Servicio para validar y actualizar un curso.
+    Descarta los totales de créditos guardados en 'lista_mat' que incluyen
+    el curso (los demás siguen vigentes). Rechaza los prerrequisitos que
+    formarían un ciclo (con el cierre precalculado, sin recorrer el grafo).
     """
-    if not n_nombre and n_creditos is None:
+    if not n_nombre and n_creditos is None and n_prerrequisitos is None:
         return {"tipo": "info", "mensaje": "No se ingresaron datos para actualizar."}
 
     curso_obj = cur.buscar_curso_por_id(lista_cur, id_cur)
     if not curso_obj:
         return {"tipo": "error", "mensaje": f"Curso con ID {id_cur} no encontrado."}
 
-    cur.actualizar_curso(curso_obj, n_nombre, n_creditos)
+    lista_mat = lista_mat if lista_mat is not None else []
+    cierre = mat.obtener_cierre_prerrequisitos(lista_mat, lista_cur)
+    if n_prerrequisitos is not None:
+        error = _prerrequisitos_inexistentes(lista_cur, n_prerrequisitos)
+        if error:
+            return error
+        ciclo = cierre.ciclo_al_establecer(id_cur, n_prerrequisitos)
+        if ciclo is not None:
+            return {"tipo": "error",
+                    "mensaje": f"El curso {ciclo} ya exige (directa o indirectamente) a {id_cur}: se formaría un ciclo."}
+
+    mat.comprobar_creditos(lista_mat, lista_cur)
+    with editando(lista_cur, curso_obj):
+        cur.actualizar_curso(curso_obj, n_nombre, n_creditos, n_prerrequisitos)
+    if n_prerrequisitos is not None:
+        cierre.establecer(id_cur, curso_obj["prerrequisitos"])
+    mat.confirmar_cierre_prerrequisitos(lista_mat, lista_cur, cierre)
+    # Solo se recalculan los totales de las matrículas con este curso
+    mat.invalidar_creditos_de_curso(lista_mat, id_cur, lista_cur)
     return {"tipo": "exito", "mensaje": f"Curso {id_cur} actualizado con éxito."}
 
 
 def srv_eliminar_curso(lista_cur: List[Dict], lista_mat: List[Dict], id_cur: str) -> Dict[str, str]:
     """
     Servicio para validar y eliminar un curso.
-    VALIDACIÓN: No permite eliminar si está en una matrícula.
+    VALIDACIÓN: No permite eliminar si está en una matrícula o si otro
+    curso lo tiene como prerrequisito.
     """
-    for matricula in lista_mat:
-        if id_cur in matricula.get("id_cursos", []):
-            return {"tipo": "error", "mensaje": f"No se puede eliminar. Curso {id_cur} está en matrículas registradas."}
-
+    if mat.contar_matriculas_de_curso(lista_mat, id_cur) > 0:
+        return {"tipo": "error", "mensaje": f"No se puede eliminar. Curso {id_cur} está en matrículas registradas."}
+    # El índice inverso del cierre evita recorrer los prerrequisitos de todos los cursos
+    cierre = mat.obtener_cierre_prerrequisitos(lista_mat, lista_cur)
+    dependientes = cierre.dependientes(id_cur)
+    if dependientes:
+        return {"tipo": "error",
+                "mensaje": f"No se puede eliminar. Curso {id_cur} es prerrequisito de: {', '.join(dependientes)}."}
+
+    mat.comprobar_creditos(lista_mat, lista_cur)
     exito = cur.eliminar_curso(lista_cur, id_cur)
     if exito:
+        cierre.establecer(id_cur, [])
+        mat.confirmar_cierre_prerrequisitos(lista_mat, lista_cur, cierre)
+        mat.invalidar_creditos_de_curso(lista_mat, id_cur, lista_cur)
         return {"tipo": "exito", "mensaje": f"Curso con ID {id_cur} eliminado."}
     else:
         return {"tipo": "error", "mensaje": f"Curso con ID {id_cur} no encontrado."}
@@ -129,9 +196,8 @@ def srv_registrar_carrera(lista_car: List[Dict], nombre: str) -> Dict[str, str]:
     if not nombre:
         return {"tipo": "error", "mensaje": "El nombre de la carrera no puede estar vacío."}
 
-    for car_existente in lista_car:
-        if car_existente["nombre_carrera"].strip().lower() == nombre.strip().lower():
-            return {"tipo": "error", "mensaje": f"Ya existe una carrera con el nombre '{nombre}'."}
+    if car.existe_nombre_carrera(lista_car, nombre):
+        return {"tipo": "error", "mensaje": f"Ya existe una carrera con el nombre '{nombre}'."}
 
     nueva_car = car.crear_carrera(lista_car, nombre)
     lista_car.append(nueva_car)
@@ -149,7 +215,8 @@ def srv_actualizar_carrera(lista_car: List[Dict], id_car: str, n_nombre: Optiona
     if not carrera_obj:
         return {"tipo": "error", "mensaje": f"Carrera con ID {id_car} no encontrada."}
 
-    car.actualizar_carrera(carrera_obj, n_nombre)
+    with editando(lista_car, carrera_obj):
+        car.actualizar_carrera(carrera_obj, n_nombre)
     return {"tipo": "exito", "mensaje": f"Carrera {id_car} actualizada con éxito."}
 
 
@@ -158,9 +225,8 @@ def srv_eliminar_carrera(lista_car: List[Dict], lista_est: List[Dict], id_car: s
     Servicio para validar y eliminar una carrera.
     VALIDACIÓN: No permite eliminar si tiene estudiantes.
     """
-    for estudiante in lista_est:
-        if estudiante.get("id_carrera") == id_car:
-            return {"tipo": "error", "mensaje": f"No se puede eliminar. Carrera {id_car} tiene estudiantes asignados."}
+    if est.contar_estudiantes_por_carrera(lista_est, id_car) > 0:
+        return {"tipo": "error", "mensaje": f"No se puede eliminar. Carrera {id_car} tiene estudiantes asignados."}
 
     exito = car.eliminar_carrera(lista_car, id_car)
     if exito:
@@ -169,8 +235,150 @@ def srv_eliminar_carrera(lista_car: List[Dict], lista_est: List[Dict], id_car: s
         return {"tipo": "error", "mensaje": f"Carrera con ID {id_car} no encontrada."}
 
 
+# --- Importación en lote (archivos CSV) ---
+# Cada fila se valida con las mismas reglas que el registro individual.
+# Las filas válidas se crean con un bloque de IDs consecutivos y se agregan
+# a la lista; 'main' las persiste con una sola escritura (Repositorio.insertar_lote).
+
+def _filas_a_importar(ruta: str, columnas: List[str]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Recorre el archivo fila por fila (sin cargarlo completo) y entrega
+    (número de fila en el archivo, valores de 'columnas' sin espacios sobrantes).
+
+    Raises:
+        ValueError: Si al encabezado le falta alguna de las columnas.
+    """
+    with open(ruta, mode='r', newline='', encoding='utf-8-sig') as file:
+        reader = csv.DictReader(file)
+        faltantes = [columna for columna in columnas if columna not in (reader.fieldnames or [])]
+        if faltantes:
+            raise ValueError(f"Al archivo le faltan las columnas: {', '.join(faltantes)}.")
+        for num_fila, fila in enumerate(reader, 2):
+            yield num_fila, {columna: (fila.get(columna) or "").strip() for columna in columnas}
+
+
+def _resultado_importacion(entidad: str, importados: List[Dict], errores: List[str]) -> Dict[str, Any]:
+    """Arma la respuesta de una importación: mensaje, registros creados y errores por fila."""
+    if errores and not importados:
+        tipo, mensaje = "error", f"No se importaron {entidad}: {len(errores)} fila(s) con errores."
+    elif errores:
+        tipo = "info"
+        mensaje = f"Se importaron {len(importados)} {entidad}; {len(errores)} fila(s) con errores no se importaron."
+    elif importados:
+        tipo, mensaje = "exito", f"Se importaron {len(importados)} {entidad}."
+    else:
+        tipo, mensaje = "info", "El archivo no tiene filas para importar."
+    return {"tipo": tipo, "mensaje": mensaje, "importados": importados, "errores": errores}
+
+
+def srv_importar_estudiantes(lista_est: List[Dict], lista_car: List[Dict], ruta: str) -> Dict[str, Any]:
+    """
+    Servicio para importar estudiantes desde un CSV con columnas 'nombre' e 'id_carrera'.
+    Valida que la carrera exista y que el nombre no esté registrado ni
+    repetido dentro del archivo. Las filas válidas se agregan a 'lista_est'.
+
+    Returns:
+        Dict[str, Any]: 'tipo' y 'mensaje', más 'importados' (los estudiantes
+        nuevos) y 'errores' (un texto por fila rechazada).
+    """
+    ids_carrera = {carrera["id_carrera"] for carrera in lista_car}
+    vistos: Dict[str, int] = {}
+    validos, errores = [], []
+    try:
+        for num_fila, fila in _filas_a_importar(ruta, ["nombre", "id_carrera"]):
+            nombre, id_carrera = fila["nombre"], fila["id_carrera"]
+            normalizado = normalizar_nombre(nombre)
+            if not nombre or not id_carrera:
+                errores.append(f"Fila {num_fila}: Nombre y Carrera son obligatorios.")
+            elif id_carrera not in ids_carrera:
+                errores.append(f"Fila {num_fila}: El ID de carrera '{id_carrera}' no es válido.")
+            elif normalizado in vistos:
+                errores.append(f"Fila {num_fila}: El nombre '{nombre}' ya aparece en la fila {vistos[normalizado]}.")
+            elif est.existe_nombre_estudiante(lista_est, nombre):
+                errores.append(f"Fila {num_fila}: Ya existe un estudiante con el nombre '{nombre}'.")
+            else:
+                vistos[normalizado] = num_fila
+                validos.append((nombre, id_carrera))
+    except FileNotFoundError:
+        return {"tipo": "error", "mensaje": f"No se encontró el archivo '{ruta}'."}
+    except (ValueError, csv.Error) as e:
+        return {"tipo": "error", "mensaje": f"No se pudo leer '{ruta}': {e}"}
+
+    nuevos = est.crear_estudiantes(lista_est, validos)
+    lista_est.extend(nuevos)
+    return _resultado_importacion("estudiantes", nuevos, errores)
+
+
+def srv_importar_cursos(lista_cur: List[Dict], ruta: str) -> Dict[str, Any]:
+    """
+    Servicio para importar cursos desde un CSV con columnas 'nombre_curso' y 'creditos'.
+    Los créditos deben ser un entero entre 0 y cur.CREDITOS_MAX.
+    Las filas válidas se agregan a 'lista_cur' (ver srv_importar_estudiantes).
+    """
+    validos, errores = [], []
+    try:
+        for num_fila, fila in _filas_a_importar(ruta, ["nombre_curso", "creditos"]):
+            nombre, creditos_str = fila["nombre_curso"], fila["creditos"]
+            if not nombre or not creditos_str:
+                errores.append(f"Fila {num_fila}: Nombre y créditos son obligatorios.")
+                continue
+            try:
+                creditos = int(creditos_str)
+            except ValueError:
+                errores.append(f"Fila {num_fila}: Los créditos '{creditos_str}' no son un número.")
+                continue
+            if not 0 <= creditos <= cur.CREDITOS_MAX:
+                errores.append(f"Fila {num_fila}: Los créditos deben estar entre 0 y {cur.CREDITOS_MAX}.")
+            else:
+                validos.append((nombre, creditos))
+    except FileNotFoundError:
+        return {"tipo": "error", "mensaje": f"No se encontró el archivo '{ruta}'."}
+    except (ValueError, csv.Error) as e:
+        return {"tipo": "error", "mensaje": f"No se pudo leer '{ruta}': {e}"}
+
+    nuevos = cur.crear_cursos(lista_cur, validos)
+    lista_cur.extend(nuevos)
+    return _resultado_importacion("cursos", nuevos, errores)
+
+
+def srv_importar_carreras(lista_car: List[Dict], ruta: str) -> Dict[str, Any]:
+    """
+    Servicio para importar carreras desde un CSV con la columna 'nombre_carrera'.
+    El nombre no puede estar registrado ni repetido dentro del archivo.
+    Las filas válidas se agregan a 'lista_car' (ver srv_importar_estudiantes).
+    """
+    vistos: Dict[str, int] = {}
+    validos, errores = [], []
+    try:
+        for num_fila, fila in _filas_a_importar(ruta, ["nombre_carrera"]):
+            nombre = fila["nombre_carrera"]
+            normalizado = normalizar_nombre(nombre)
+            if not nombre:
+                errores.append(f"Fila {num_fila}: El nombre de la carrera no puede estar vacío.")
+            elif normalizado in vistos:
+                errores.append(f"Fila {num_fila}: El nombre '{nombre}' ya aparece en la fila {vistos[normalizado]}.")
+            elif car.existe_nombre_carrera(lista_car, nombre):
+                errores.append(f"Fila {num_fila}: Ya existe una carrera con el nombre '{nombre}'.")
+            else:
+                vistos[normalizado] = num_fila
+                validos.append(nombre)
+    except FileNotFoundError:
+        return {"tipo": "error", "mensaje": f"No se encontró el archivo '{ruta}'."}
+    except (ValueError, csv.Error) as e:
+        return {"tipo": "error", "mensaje": f"No se pudo leer '{ruta}': {e}"}
+
+    nuevas = car.crear_carreras(lista_car, validos)
+    lista_car.extend(nuevas)
+    return _resultado_importacion("carreras", nuevas, errores)
+
+
 # --- Servicios de Matrículas ---
 
+def _mensaje_prerrequisitos(faltantes: Dict[str, List[str]]) -> str:
+    """Describe los prerrequisitos faltantes (ej. "C003 exige C001, C002")."""
+    return "; ".join(f"{id_c} exige {', '.join(ids)}" for id_c, ids in faltantes.items()) + "."
+
+
 def srv_matricular_estudiante(
     id_est: str,
     ids_cursos: List[str],
@@ -202,11 +410,336 @@ def srv_matricular_estudiante(
         msg_invalidos = f"IDs inválidos: {', '.join(cursos_invalidos)}" if cursos_invalidos else ""
         return {"tipo": "error", "mensaje": f"No se proporcionaron cursos válidos. {msg_invalidos}"}
 
+    faltantes = mat.prerrequisitos_faltantes(lista_mat, lista_cur, id_est, cursos_validos, periodo)
+    if faltantes:
+        cursos_validos = [id_c for id_c in cursos_validos if id_c not in faltantes]
+        if not cursos_validos:
+            return {"tipo": "error", "mensaje": f"No cumple los prerrequisitos. {_mensaje_prerrequisitos(faltantes)}"}
+
     nueva_mat = mat.matricular_estudiante(lista_mat, id_est, cursos_validos, periodo)
     lista_mat.append(nueva_mat)
+    # Deja calculado el total de créditos de la nueva matrícula
+    mat.calcular_total_creditos(id_est, lista_mat, lista_cur)
 
     msg_exito = f"Estudiante {est_obj['nombre']} matriculado en {len(cursos_validos)} curso(s)."
     if cursos_invalidos:
         msg_exito += f" (IDs ignorados por no existir: {', '.join(cursos_invalidos)})"
+    if faltantes:
+        msg_exito += f" (Rechazados por prerrequisitos: {_mensaje_prerrequisitos(faltantes)})"
+
+    return {"tipo": "exito", "mensaje": msg_exito}
+
+
+def srv_matricular_lote(
+    solicitudes: List[Tuple[str, List[str], str]],
+    lista_est: List[Dict],
+    lista_cur: List[Dict],
+    lista_mat: List[Dict]
+) -> Dict[str, Any]:
+    """
+    Servicio para matricular a muchos estudiantes de una vez (ej. una cohorte).
+    Cada solicitud (id_estudiante, ids de cursos, periodo) se valida igual
+    que en 'srv_matricular_estudiante', pero contra conjuntos de IDs armados
+    una sola vez. Las matrículas válidas reciben un bloque de IDs seguidos
+    y se agregan juntas a 'lista_mat' (para persistirlas con insertar_lote).
+
+    Returns:
+        Dict[str, Any]: 'tipo' y 'mensaje' del lote, 'matriculas' (las
+        creadas) y 'resultados' (un {"tipo", "mensaje"} por solicitud, en orden).
+    """
+    nombres = {e["id_estudiante"]: e["nombre"] for e in lista_est}
+    ids_cursos_existentes = {c["id_curso"] for c in lista_cur}
+    cierre = mat.obtener_cierre_prerrequisitos(lista_mat, lista_cur)
+    resultados: List[Optional[Dict[str, str]]] = []
+    aceptadas = []
+    for id_est, ids_cursos, periodo in solicitudes:
+        if not id_est or not ids_cursos or not periodo:
+            resultados.append({"tipo": "error", "mensaje": "Faltan datos (ID Estudiante, Cursos o Periodo)."})
+            continue
+        if id_est not in nombres:
+            resultados.append({"tipo": "error", "mensaje": f"ID de estudiante {id_est} no existe."})
+            continue
+        cursos_validos = [id_c for id_c in ids_cursos if id_c in ids_cursos_existentes]
+        cursos_invalidos = [id_c for id_c in ids_cursos if id_c not in ids_cursos_existentes]
+        if not cursos_validos:
+            resultados.append({"tipo": "error",
+                               "mensaje": f"No se proporcionaron cursos válidos. IDs inválidos: {', '.join(cursos_invalidos)}"})
+            continue
+        # Contra el historial previo al lote (el cierre se arma una sola vez)
+        faltantes = mat.prerrequisitos_faltantes(lista_mat, lista_cur, id_est, cursos_validos, periodo, cierre)
+        cursos_validos = [id_c for id_c in cursos_validos if id_c not in faltantes]
+        if not cursos_validos:
+            resultados.append({"tipo": "error",
+                               "mensaje": f"No cumple los prerrequisitos. {_mensaje_prerrequisitos(faltantes)}"})
+            continue
+        aceptadas.append((len(resultados), (id_est, cursos_validos, periodo), cursos_invalidos, faltantes))
+        resultados.append(None)
+
+    nuevas = mat.matricular_estudiantes(lista_mat, [solicitud for _, solicitud, _, _ in aceptadas])
+    lista_mat.extend(nuevas)
+    for (posicion, (id_est, cursos_validos, _), cursos_invalidos, faltantes), nueva in zip(aceptadas, nuevas):
+        mensaje = f"Estudiante {nombres[id_est]} matriculado en {len(cursos_validos)} curso(s) ({nueva['id_matricula']})."
+        if cursos_invalidos:
+            mensaje += f" (IDs ignorados por no existir: {', '.join(cursos_invalidos)})"
+        if faltantes:
+            mensaje += f" (Rechazados por prerrequisitos: {_mensaje_prerrequisitos(faltantes)})"
+        resultados[posicion] = {"tipo": "exito", "mensaje": mensaje}
+    if isinstance(lista_mat, mat.AlmacenMatriculas):
+        # Deja calculados los totales de créditos (en una lista simple no se guardan)
+        for nueva in nuevas:
+            mat.calcular_total_creditos(nueva["id_estudiante"], lista_mat, lista_cur)
+
+    rechazadas = len(resultados) - len(nuevas)
+    if rechazadas and not nuevas:
+        tipo, mensaje = "error", f"No se registró ninguna matrícula: {rechazadas} solicitud(es) con errores."
+    elif rechazadas:
+        tipo, mensaje = "info", f"Se registraron {len(nuevas)} matrícula(s); {rechazadas} solicitud(es) con errores."
+    elif nuevas:
+        tipo, mensaje = "exito", f"Se registraron {len(nuevas)} matrícula(s)."
+    else:
+        tipo, mensaje = "info", "No hay solicitudes de matrícula."
+    return {"tipo": tipo, "mensaje": mensaje, "matriculas": nuevas, "resultados": resultados}
+
+
+def srv_importar_matriculas(ruta: str, lista_est: List[Dict], lista_cur: List[Dict], lista_mat: List[Dict]) -> Dict[str, Any]:
+    """
+    Servicio para matricular desde un CSV con columnas 'id_estudiante',
+    'id_cursos' (separados por ';') y 'periodo_academico' (ver srv_matricular_lote).
 
-    return {"tipo": "exito", "mensaje": msg_exito}
\ No newline at end of file
+    Returns:
+        Dict[str, Any]: Igual que las demás importaciones: 'importados' y 'errores' por fila.
+    """
+    filas, solicitudes = [], []
+    try:
+        for num_fila, fila in _filas_a_importar(ruta, ["id_estudiante", "id_cursos", "periodo_academico"]):
+            filas.append(num_fila)
+            ids_cursos = fila["id_cursos"].replace(";", " ").split()
+            solicitudes.append((fila["id_estudiante"], ids_cursos, fila["periodo_academico"]))
+    except FileNotFoundError:
+        return {"tipo": "error", "mensaje": f"No se encontró el archivo '{ruta}'."}
+    except (ValueError, csv.Error) as e:
+        return {"tipo": "error", "mensaje": f"No se pudo leer '{ruta}': {e}"}
+
+    lote = srv_matricular_lote(solicitudes, lista_est, lista_cur, lista_mat)
+    errores = [f"Fila {num_fila}: {resultado['mensaje']}"
+               for num_fila, resultado in zip(filas, lote["resultados"]) if resultado["tipo"] == "error"]
+    return _resultado_importacion("matrículas", lote["matriculas"], errores)
+
+
+# --- Servicios de Estadísticas ---
+
+def srv_estadisticas_referencias(
+    lista_est: List[Dict],
+    lista_cur: List[Dict],
+    lista_car: List[Dict],
+    lista_mat: List[Dict]
+) -> Dict[str, Dict[str, int]]:
+    """
+    Servicio que reúne los conteos de referencias que protegen las eliminaciones:
+    estudiantes por carrera, matrículas por curso y matrículas por estudiante.
+    Con listas indexadas (Almacen) cada conteo cuesta O(1).
+    """
+    return {
+        "estudiantes_por_carrera": {
+            c["id_carrera"]: est.contar_estudiantes_por_carrera(lista_est, c["id_carrera"]) for c in lista_car
+        },
+        "matriculas_por_curso": {
+            c["id_curso"]: mat.contar_matriculas_de_curso(lista_mat, c["id_curso"]) for c in lista_cur
+        },
+        "matriculas_por_estudiante": {
+            e["id_estudiante"]: mat.contar_matriculas_de_estudiante(lista_mat, e["id_estudiante"]) for e in lista_est
+        },
+    }
+
+
+def srv_reporte_creditos(
+    lista_est: List[Dict],
+    lista_cur: List[Dict],
+    lista_mat: List[Dict],
+    periodo: str,
+    minimo: int
+) -> List[Dict[str, Any]]:
+    """
+    Servicio que lista los estudiantes cuya última matrícula del periodo
+    supera 'minimo' créditos, de mayor a menor.
+    Usa los totales de créditos ya calculados (ver AlmacenMatriculas.total_creditos).
+    """
+    reporte = []
+    for id_est, creditos in mat.creditos_por_estudiante(periodo, lista_mat, lista_cur).items():
+        if creditos > minimo:
+            est_obj = est.buscar_estudiante_por_id(lista_est, id_est)
+            nombre = est_obj["nombre"] if est_obj else "(eliminado)"
+            reporte.append({"id_estudiante": id_est, "nombre": nombre, "creditos": creditos})
+    reporte.sort(key=lambda fila: fila["creditos"], reverse=True)
+    return reporte
+
+
+# --- Servicios de Reportes (analítica con NumPy) ---
+
+def _sin_numpy() -> Optional[Dict[str, str]]:
+    """Devuelve la respuesta de error si NumPy no está instalado, o None."""
+    if ana.numpy_disponible():
+        return None
+    return {"tipo": "error", "mensaje": "Los reportes necesitan NumPy. Instálelo con 'pip install numpy'."}
+
+
+def srv_reporte_inscritos(lista_cur: List[Dict], lista_mat: List[Dict], periodo: Optional[str]) -> Dict[str, Any]:
+    """
+    Servicio que cuenta los estudiantes inscritos en cada curso en un periodo
+    (en todos si es None), de mayor a menor.
+
+    Returns:
+        Dict[str, Any]: 'tipo', 'mensaje' y 'filas' ({"id_curso", "nombre_curso", "inscritos"}).
+    """
+    error = _sin_numpy()
+    if error:
+        return error
+    tablas = ana.construir_tablas(lista_mat, lista_cur)
+    nombres = {c["id_curso"]: c["nombre_curso"] for c in lista_cur}
+    filas = [
+        {"id_curso": id_cur, "nombre_curso": nombres.get(id_cur, "(eliminado)"), "inscritos": inscritos}
+        for id_cur, inscritos in ana.inscritos_por_curso(tablas, periodo).items()
+    ]
+    return {"tipo": "exito", "mensaje": f"{len(filas)} curso(s) con inscritos.", "filas": filas}
+
+
+def srv_reporte_carga_por_carrera(
+    lista_est: List[Dict],
+    lista_cur: List[Dict],
+    lista_car: List[Dict],
+    lista_mat: List[Dict],
+    periodo: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Servicio con la distribución de créditos (promedio, mínimo, mediana y
+    máximo) de los estudiantes de cada carrera en un periodo.
+
+    Returns:
+        Dict[str, Any]: 'tipo', 'mensaje' y 'filas' (una por carrera, con 'id_carrera' y 'nombre_carrera').
+    """
+    error = _sin_numpy()
+    if error:
+        return error
+    tablas = ana.construir_tablas(lista_mat, lista_cur)
+    nombres = {c["id_carrera"]: c["nombre_carrera"] for c in lista_car}
+    filas = [
+        {"id_carrera": id_car, "nombre_carrera": nombres.get(id_car, "(eliminada)"), **estadisticas}
+        for id_car, estadisticas in ana.carga_por_carrera(tablas, lista_est, periodo).items()
+    ]
+    return {"tipo": "exito", "mensaje": f"{len(filas)} carrera(s) con estudiantes matriculados.", "filas": filas}
+
+
+def srv_reporte_sobrecarga(
+    lista_est: List[Dict],
+    lista_cur: List[Dict],
+    lista_mat: List[Dict],
+    periodo: Optional[str],
+    maximo: int = ana.CREDITOS_SOBRECARGA
+) -> Dict[str, Any]:
+    """
+    Servicio que lista a los estudiantes con más de 'maximo' créditos en un
+    periodo (como 'srv_reporte_creditos', pero calculado de una vez para todos).
+
+    Returns:
+        Dict[str, Any]: 'tipo', 'mensaje' y 'filas' ({"id_estudiante", "nombre", "periodo", "creditos"}).
+    """
+    error = _sin_numpy()
+    if error:
+        return error
+    tablas = ana.construir_tablas(lista_mat, lista_cur)
+    nombres = {e["id_estudiante"]: e["nombre"] for e in lista_est}
+    filas = [
+        {**fila, "nombre": nombres.get(fila["id_estudiante"], "(eliminado)")}
+        for fila in ana.estudiantes_sobrecargados(tablas, periodo, maximo)
+    ]
+    return {"tipo": "exito", "mensaje": f"{len(filas)} estudiante(s) con más de {maximo} créditos.", "filas": filas}
+
+
+def srv_reporte_tendencia(lista_cur: List[Dict], lista_mat: List[Dict]) -> Dict[str, Any]:
+    """
+    Servicio con la evolución por periodo: estudiantes, inscripciones y créditos.
+
+    Returns:
+        Dict[str, Any]: 'tipo', 'mensaje' y 'filas' (una por periodo, en orden).
+    """
+    error = _sin_numpy()
+    if error:
+        return error
+    filas = ana.tendencia_por_periodo(ana.construir_tablas(lista_mat, lista_cur))
+    return {"tipo": "exito", "mensaje": f"{len(filas)} periodo(s) con matrículas.", "filas": filas}
+
+
+def srv_reporte_cursos_en_comun(
+    lista_cur: List[Dict],
+    lista_mat: List[Dict],
+    id_curso: str,
+    periodo: Optional[str],
+    k: int = 5
+) -> Dict[str, Any]:
+    """
+    Servicio que lista los k cursos que más estudiantes toman junto con
+    'id_curso' en un periodo (en todos si es None). No necesita NumPy:
+    usa los conteos de co-matrícula (ver comatriculas.py).
+
+    Returns:
+        Dict[str, Any]: 'tipo', 'mensaje' y 'filas' ({"id_curso", "nombre_curso", "estudiantes"}).
+    """
+    curso_obj = cur.buscar_curso_por_id(lista_cur, id_curso)
+    if not curso_obj:
+        return {"tipo": "error", "mensaje": f"Curso con ID {id_curso} no encontrado."}
+
+    nombres = {c["id_curso"]: c["nombre_curso"] for c in lista_cur}
+    filas = [
+        {"id_curso": otro, "nombre_curso": nombres.get(otro, "(eliminado)"), "estudiantes": estudiantes}
+        for otro, estudiantes in mat.obtener_comatriculas(lista_mat).mas_frecuentes(id_curso, periodo, k)
+    ]
+    return {"tipo": "exito", "mensaje": f"Cursos que se toman junto con {curso_obj['nombre_curso']}.", "filas": filas}
+
+
+def srv_generar_horario_examenes(
+    lista_est: List[Dict],
+    lista_cur: List[Dict],
+    lista_mat: List[Dict],
+    periodo: str,
+    franjas_por_dia: int = exa.FRANJAS_POR_DIA,
+    max_por_dia: int = exa.EXAMENES_MAX_POR_DIA
+) -> Dict[str, Any]:
+    """
+    Servicio que asigna una franja de examen a cada curso del periodo sin
+    que un estudiante tenga dos exámenes a la vez (ver examenes.py).
+
+    Returns:
+        Dict[str, Any]: 'tipo', 'mensaje', 'franjas' ({"franja", "dia", "cursos"},
+        con cursos {"id_curso", "nombre_curso"}) y 'sobrecargados'
+        ({"id_estudiante", "nombre", "dia", "examenes"}).
+    """
+    if franjas_por_dia < 1 or max_por_dia < 1:
+        return {"tipo": "error", "mensaje": "Las franjas por día y el máximo de exámenes deben ser al menos 1."}
+
+    horario = exa.generar_horario(mat.obtener_comatriculas(lista_mat), periodo, franjas_por_dia, max_por_dia)
+    if not horario["franja_de_curso"]:
+        return {"tipo": "error", "mensaje": f"No hay matrículas en el periodo {periodo}."}
+
+    nombres_cursos = {c["id_curso"]: c["nombre_curso"] for c in lista_cur}
+    franjas = [
+        {"franja": franja, "dia": franja // franjas_por_dia, "cursos": []}
+        for franja in range(horario["franjas"])
+    ]
+    for id_curso, franja in sorted(horario["franja_de_curso"].items()):
+        franjas[franja]["cursos"].append(
+            {"id_curso": id_curso, "nombre_curso": nombres_cursos.get(id_curso, "(eliminado)")}
+        )
+
+    nombres = {e["id_estudiante"]: e["nombre"] for e in lista_est}
+    sobrecargados = [
+        {**fila, "nombre": nombres.get(fila["id_estudiante"], "(eliminado)")}
+        for fila in horario["sobrecargados"]
+    ]
+    dias = (horario["franjas"] + franjas_por_dia - 1) // franjas_por_dia
+    return {
+        "tipo": "exito",
+        "mensaje": f"{len(horario['franja_de_curso'])} curso(s) en {horario['franjas']} franja(s) ({dias} día(s)); "
+                   f"{len(sobrecargados)} caso(s) con más de {max_por_dia} exámenes en un día.",
+        "franjas": franjas,
+        "sobrecargados": sobrecargados,
+    }
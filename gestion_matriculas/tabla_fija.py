@@ -0,0 +1,221 @@
+"""
+Módulo de Tablas de Ancho Fijo (tabla_fija.py)
+
+Formato binario opcional para las tablas de catálogo (cursos y carreras).
+Cada registro ocupa siempre los mismos bytes, así que el registro i está
+en 'inicio + i * tamaño' y se puede leer o modificar en su lugar sin
+tocar el resto del archivo. El archivo se accede con 'mmap'.
+
+Estructura del archivo:
+- Encabezado: firma (MTF1), versión, cantidad de campos y el ancho de
+  cada campo de texto (los anchos se eligen al crear el archivo según el
+  valor más largo, con un mínimo por campo).
+- Registros: un byte 'activo' (0 = eliminado) y los campos: los de texto
+  en UTF-8 rellenados con bytes nulos y los enteros como int32.
+
+Al abrir el archivo solo se recorren los IDs para armar el índice
+ID -> posición; los demás campos se decodifican al leerlos.
+"""
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from gestion_matriculas.utils import escritura_atomica, lista_a_texto
+
+FIRMA = b"MTF1"
+VERSION = 1
+_ENCABEZADO = struct.Struct("<4sHH")
+
+# Campo: (nombre, tipo, ancho mínimo). Tipo "s" = texto, "i" = entero.
+Campo = Tuple[str, str, int]
+
+
+def _formato(campos: Tuple[Campo, ...], anchos: List[int]) -> struct.Struct:
+    partes = ["<B"]
+    for (_, tipo, _), ancho in zip(campos, anchos):
+        partes.append(f"{ancho}s" if tipo == "s" else "i")
+    return struct.Struct("".join(partes))
+
+
+def _codificar(campos: Tuple[Campo, ...], anchos: List[int], registro: Dict[str, Any]) -> List[Any]:
+    valores = []
+    for (nombre, tipo, _), ancho in zip(campos, anchos):
+        valor = lista_a_texto(registro.get(nombre))
+        if tipo == "i":
+            valores.append(int(valor or 0))
+            continue
+        datos = ("" if valor is None else str(valor)).encode("utf-8")
+        if len(datos) > ancho:
+            raise ValueError(f"'{nombre}' supera los {ancho} bytes del archivo de ancho fijo")
+        valores.append(datos)
+    return valores
+
+
+def _decodificar(campos: Tuple[Campo, ...], valores: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    return tuple(
+        valor.rstrip(b"\0").decode("utf-8") if tipo == "s" else valor
+        for (_, tipo, _), valor in zip(campos, valores)
+    )
+
+
+def escribir_tabla(ruta: str, campos: Tuple[Campo, ...], registros: List[Dict[str, Any]]) -> None:
+    """
+    Crea (o reemplaza, de forma atómica) un archivo de ancho fijo con los registros.
+    Cada campo de texto mide lo que su valor más largo, con su ancho mínimo.
+    Los errores de E/S se propagan.
+
+    Args:
+        ruta (str): El archivo de destino.
+        campos (Tuple[Campo, ...]): Los campos, en el orden de los registros.
+        registros (List[Dict[str, Any]]): Los registros a escribir.
+    """
+    anchos = []
+    for nombre, tipo, minimo in campos:
+        if tipo == "s":
+            largo = max((len(str(lista_a_texto(r.get(nombre)) or "").encode("utf-8")) for r in registros), default=0)
+            anchos.append(max(minimo, largo))
+        else:
+            anchos.append(4)
+    formato = _formato(campos, anchos)
+    with escritura_atomica(ruta, mode='wb') as file:
+        file.write(_ENCABEZADO.pack(FIRMA, VERSION, len(campos)))
+        file.write(struct.pack(f"<{len(campos)}H", *anchos))
+        for registro in registros:
+            file.write(formato.pack(1, *_codificar(campos, anchos, registro)))
+
+
+def migrar_tabla(ruta: str, campos: Tuple[Campo, ...]) -> bool:
+    """
+    Convierte al formato actual una tabla escrita con menos campos (los
+    primeros de 'campos', ej. antes de agregar una columna). Los campos
+    nuevos quedan vacíos. Los errores de E/S se propagan.
+
+    Returns:
+        bool: False si el archivo no es una tabla anterior de estos campos.
+    """
+    with open(ruta, mode='rb') as file:
+        try:
+            firma, version, cantidad = _ENCABEZADO.unpack(file.read(_ENCABEZADO.size))
+        except struct.error:
+            return False
+    if firma != FIRMA or version != VERSION or not 0 < cantidad < len(campos):
+        return False
+
+    anterior = TablaFija(ruta, campos[:cantidad])
+    try:
+        nombres = [nombre for nombre, _, _ in campos]
+        registros = [dict(zip(nombres, valores)) for valores in anterior.valores()]
+    finally:
+        anterior.cerrar()
+    escribir_tabla(ruta, campos, registros)
+    return True
+
+
+class TablaFija:
+    """
+    Archivo de ancho fijo abierto con 'mmap', con un índice ID -> desplazamiento.
+
+    Las búsquedas por ID leen directo del archivo mapeado; actualizar y
+    eliminar escriben solo los bytes del registro (O(1)). Agregar escribe
+    al final y vuelve a mapear el archivo.
+    """
+
+    def __init__(self, ruta: str, campos: Tuple[Campo, ...]) -> None:
+        self.ruta = ruta
+        self.campos = campos
+        self._archivo = open(ruta, mode='r+b')
+        try:
+            firma, version, cantidad = _ENCABEZADO.unpack(self._archivo.read(_ENCABEZADO.size))
+            if firma != FIRMA or version != VERSION or cantidad != len(campos):
+                raise ValueError(f"'{ruta}' no es una tabla de ancho fijo compatible")
+            self.anchos = list(struct.unpack(f"<{cantidad}H", self._archivo.read(2 * cantidad)))
+        except (struct.error, ValueError):
+            self._archivo.close()
+            raise
+        self._inicio = _ENCABEZADO.size + 2 * len(campos)
+        self._formato = _formato(campos, self.anchos)
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0)
+        self._offsets: Dict[str, int] = {}
+        self._indexar()
+
+    def _indexar(self) -> None:
+        # Solo se leen el byte 'activo' y el ID (primer campo) de cada registro
+        ancho_id = self.anchos[0]
+        tamano = self._formato.size
+        mapa = self._mapa
+        for offset in range(self._inicio, len(mapa) - tamano + 1, tamano):
+            if mapa[offset]:
+                self._offsets[mapa[offset + 1:offset + 1 + ancho_id].rstrip(b"\0").decode("utf-8")] = offset
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, id_registro: object) -> bool:
+        return id_registro in self._offsets
+
+    def _leer(self, offset: int) -> Tuple[Any, ...]:
+        return _decodificar(self.campos, self._formato.unpack_from(self._mapa, offset)[1:])
+
+    def buscar(self, id_registro: str) -> Optional[Dict[str, Any]]:
+        """Lee un registro por su ID directamente del archivo (None si no existe)."""
+        offset = self._offsets.get(id_registro)
+        if offset is None:
+            return None
+        return dict(zip((nombre for nombre, _, _ in self.campos), self._leer(offset)))
+
+    def valores(self) -> Iterator[Tuple[Any, ...]]:
+        """Recorre los registros activos en el orden del archivo, como tuplas de valores."""
+        for offset in sorted(self._offsets.values()):
+            yield self._leer(offset)
+
+    def actualizar(self, registro: Dict[str, Any]) -> bool:
+        """
+        Reescribe en su lugar el registro con el mismo ID.
+
+        Returns:
+            bool: False si el ID no está en la tabla.
+
+        Raises:
+            ValueError: Si un texto no cabe en el ancho de su campo.
+        """
+        offset = self._offsets.get(registro.get(self.campos[0][0]))
+        if offset is None:
+            return False
+        self._formato.pack_into(self._mapa, offset, 1, *_codificar(self.campos, self.anchos, registro))
+        return True
+
+    def agregar(self, registro: Dict[str, Any]) -> None:
+        """
+        Añade un registro al final del archivo.
+
+        Raises:
+            ValueError: Si un texto no cabe en el ancho de su campo.
+        """
+        datos = self._formato.pack(1, *_codificar(self.campos, self.anchos, registro))
+        self._mapa.close()
+        self._archivo.seek(0, os.SEEK_END)
+        offset = self._archivo.tell()
+        self._archivo.write(datos)
+        self._archivo.flush()
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0)
+        self._offsets[registro[self.campos[0][0]]] = offset
+
+    def eliminar(self, id_registro: str) -> bool:
+        """Marca el registro como eliminado (su espacio queda libre hasta reescribir el archivo)."""
+        offset = self._offsets.pop(id_registro, None)
+        if offset is None:
+            return False
+        self._mapa[offset] = 0
+        return True
+
+    def sincronizar(self) -> None:
+        """Fuerza la escritura a disco de las páginas modificadas."""
+        self._mapa.flush()
+
+    def cerrar(self) -> None:
+        """Escribe lo pendiente y libera el mapa y el archivo."""
+        if not self._mapa.closed:
+            self._mapa.flush()
+            self._mapa.close()
+        self._archivo.close()
@@ -12,6 +12,8 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.prompt import Prompt, IntPrompt
 from typing import List, Dict, Any, Tuple, Optional
+import gestion_matriculas.carreras as car
+from gestion_matriculas.utils import texto_a_lista
 
 # Inicializar la consola de Rich
 console = Console()
@@ -29,12 +31,13 @@ def mostrar_menu_principal() -> str:
         "2. Gestión de Cursos\n"
         "3. Gestión de Carreras\n"
         "4. Gestión de Matrículas\n"
-        "5. Salir",
+        "5. Reportes\n"
+        "6. Salir",
         title="Menú Principal",
         border_style="blue",
         width=60
     ))
-    opcion = Prompt.ask("[bold]Seleccione una opción[/bold]", choices=["1", "2", "3", "4", "5"], default="5")
+    opcion = Prompt.ask("[bold]Seleccione una opción[/bold]", choices=["1", "2", "3", "4", "5", "6"], default="6")
     return opcion
 
 
@@ -46,12 +49,13 @@ def mostrar_menu_crud(entidad: str) -> str:
         f"3. Actualizar {entidad}\n"
         f"4. Eliminar {entidad}\n"
         f"5. Buscar {entidad}\n"
-        f"6. Volver al menú principal",
+        f"6. Importar {entidad}s desde CSV\n"
+        f"7. Volver al menú principal",
         title=f"Gestión de {entidad}s",
         border_style="green",
         width=60
     ))
-    opcion = Prompt.ask("[bold]Seleccione una opción[/bold]", choices=["1", "2", "3", "4", "5", "6"], default="6")
+    opcion = Prompt.ask("[bold]Seleccione una opción[/bold]", choices=["1", "2", "3", "4", "5", "6", "7"], default="7")
     return opcion
 
 
@@ -61,12 +65,33 @@ def mostrar_menu_matriculas() -> str:
         "1. Matricular estudiante en cursos\n"
         "2. Ver cursos de un estudiante\n"
         "3. Ver estudiantes en un curso\n"
-        "4. Volver al menú principal",
+        "4. Ver estadísticas de referencias\n"
+        "5. Estudiantes sobre N créditos\n"
+        "6. Matricular lote desde CSV\n"
+        "7. Volver al menú principal",
         title="Gestión de Matrículas",
         border_style="yellow",
         width=60
     ))
-    opcion = Prompt.ask("[bold]Seleccione una opción[/bold]", choices=["1", "2", "3", "4"], default="4")
+    opcion = Prompt.ask("[bold]Seleccione una opción[/bold]", choices=["1", "2", "3", "4", "5", "6", "7"], default="7")
+    return opcion
+
+
+def mostrar_menu_reportes() -> str:
+    """Muestra el menú de reportes (analítica de todas las matrículas)."""
+    console.print(Panel(
+        "1. Inscritos por curso\n"
+        "2. Carga de créditos por carrera\n"
+        "3. Estudiantes sobrecargados\n"
+        "4. Tendencia por periodo\n"
+        "5. Cursos que se toman juntos\n"
+        "6. Horario de exámenes\n"
+        "7. Volver al menú principal",
+        title="Reportes",
+        border_style="magenta",
+        width=60
+    ))
+    opcion = Prompt.ask("[bold]Seleccione una opción[/bold]", choices=["1", "2", "3", "4", "5", "6", "7"], default="7")
     return opcion
 
 
@@ -76,9 +101,9 @@ def _resolver_nombre_carrera(id_carrera: Optional[str], lista_carreras: List[Dic
     """Función helper para buscar el nombre de una carrera por su ID."""
     if not id_carrera:
         return "[N/A]"
-    for carrera in lista_carreras:
-        if carrera["id_carrera"] == id_carrera:
-            return carrera["nombre_carrera"]
+    carrera = car.buscar_carrera_por_id(lista_carreras, id_carrera)
+    if carrera:
+        return carrera["nombre_carrera"]
     return "[Carrera Desconocida]"
 
 
@@ -113,9 +138,11 @@ def mostrar_tabla_cursos(cursos: List[Dict[str, Any]]) -> None:
     table.add_column("ID Curso", style="dim", width=12)
     table.add_column("Nombre del Curso", min_width=20)
     table.add_column("Créditos", justify="right")
+    table.add_column("Prerrequisitos", style="dim")
 
     for curso in cursos:
-        table.add_row(curso['id_curso'], curso['nombre_curso'], str(curso.get('creditos', 0)))
+        table.add_row(curso['id_curso'], curso['nombre_curso'], str(curso.get('creditos', 0)),
+                      ", ".join(curso.get('prerrequisitos') or []) or "-")
 
     console.print(table)
 
@@ -198,6 +225,151 @@ def mostrar_estudiantes_en_curso(curso: Dict[str, Any], estudiantes: List[Dict[s
     console.print(table)
 
 
+def mostrar_estadisticas(estadisticas: Dict[str, Dict[str, int]], lista_carreras: List[Dict[str, Any]],
+                         lista_cursos: List[Dict[str, Any]]) -> None:
+    """
+    Muestra los conteos de referencias: estudiantes por carrera y matrículas por curso.
+    """
+    table_car = Table(title="Estudiantes por Carrera", show_header=True, header_style="bold blue")
+    table_car.add_column("ID Carrera", style="dim", width=12)
+    table_car.add_column("Nombre de la Carrera", min_width=20)
+    table_car.add_column("Estudiantes", justify="right")
+    for carrera in lista_carreras:
+        total = estadisticas["estudiantes_por_carrera"].get(carrera['id_carrera'], 0)
+        table_car.add_row(carrera['id_carrera'], carrera['nombre_carrera'], str(total))
+
+    table_cur = Table(title="Matrículas por Curso", show_header=True, header_style="bold cyan")
+    table_cur.add_column("ID Curso", style="dim", width=12)
+    table_cur.add_column("Nombre del Curso", min_width=20)
+    table_cur.add_column("Matrículas", justify="right")
+    for curso in lista_cursos:
+        total = estadisticas["matriculas_por_curso"].get(curso['id_curso'], 0)
+        table_cur.add_row(curso['id_curso'], curso['nombre_curso'], str(total))
+
+    con_matricula = sum(1 for total in estadisticas["matriculas_por_estudiante"].values() if total > 0)
+    console.print(table_car)
+    console.print(table_cur)
+    console.print(f"\n[bold green]Estudiantes con al menos una matrícula:[/bold green] {con_matricula}\n")
+
+
+def mostrar_reporte_creditos(reporte: List[Dict[str, Any]], periodo: str, minimo: int) -> None:
+    """Muestra los estudiantes que superan un mínimo de créditos en un periodo."""
+    table = Table(title=f"Estudiantes con más de {minimo} créditos ({periodo})",
+                  show_header=True, header_style="bold magenta")
+    table.add_column("ID Estudiante", style="dim", width=12)
+    table.add_column("Nombre", min_width=20)
+    table.add_column("Créditos", justify="right")
+
+    if not reporte:
+        table.add_row("[dim]Ningún estudiante supera el mínimo[/dim]", "", "")
+    for fila in reporte:
+        table.add_row(fila['id_estudiante'], fila['nombre'], str(fila['creditos']))
+    console.print(table)
+
+
+def mostrar_reporte_inscritos(filas: List[Dict[str, Any]], periodo: Optional[str]) -> None:
+    """Muestra los inscritos de cada curso, de mayor a menor."""
+    table = Table(title=f"Inscritos por Curso ({periodo or 'todos los periodos'})",
+                  show_header=True, header_style="bold cyan")
+    table.add_column("ID Curso", style="dim", width=12)
+    table.add_column("Nombre del Curso", min_width=20)
+    table.add_column("Inscritos", justify="right")
+
+    if not filas:
+        table.add_row("[dim]Sin matrículas en el periodo[/dim]", "", "")
+    for fila in filas:
+        table.add_row(fila['id_curso'], fila['nombre_curso'], str(fila['inscritos']))
+    console.print(table)
+
+
+def mostrar_reporte_carga(filas: List[Dict[str, Any]], periodo: Optional[str]) -> None:
+    """Muestra la distribución de créditos de cada carrera."""
+    table = Table(title=f"Carga de Créditos por Carrera ({periodo or 'todos los periodos'})",
+                  show_header=True, header_style="bold blue")
+    table.add_column("ID Carrera", style="dim", width=12)
+    table.add_column("Nombre de la Carrera", min_width=20)
+    for columna in ("Estudiantes", "Promedio", "Mínimo", "Mediana", "Máximo"):
+        table.add_column(columna, justify="right")
+
+    if not filas:
+        table.add_row("[dim]Sin matrículas en el periodo[/dim]", "", "", "", "", "", "")
+    for fila in filas:
+        table.add_row(fila['id_carrera'], fila['nombre_carrera'], str(fila['estudiantes']),
+                      f"{fila['promedio']:.1f}", str(fila['minimo']), f"{fila['mediana']:g}", str(fila['maximo']))
+    console.print(table)
+
+
+def mostrar_reporte_tendencia(filas: List[Dict[str, Any]]) -> None:
+    """Muestra los totales de cada periodo académico."""
+    table = Table(title="Tendencia por Periodo", show_header=True, header_style="bold green")
+    table.add_column("Periodo", style="dim", width=12)
+    for columna in ("Estudiantes", "Inscripciones", "Créditos", "Créditos promedio"):
+        table.add_column(columna, justify="right")
+
+    if not filas:
+        table.add_row("[dim]Sin matrículas[/dim]", "", "", "", "")
+    for fila in filas:
+        table.add_row(fila['periodo'], str(fila['estudiantes']), str(fila['inscripciones']),
+                      str(fila['creditos']), f"{fila['creditos_promedio']:.1f}")
+    console.print(table)
+
+
+def mostrar_reporte_cursos_en_comun(curso: Dict[str, Any], filas: List[Dict[str, Any]], periodo: Optional[str]) -> None:
+    """Muestra los cursos que más se toman junto con 'curso'."""
+    table = Table(title=f"Cursos tomados junto con {curso['nombre_curso']} ({periodo or 'todos los periodos'})",
+                  show_header=True, header_style="bold magenta")
+    table.add_column("ID Curso", style="dim", width=12)
+    table.add_column("Nombre del Curso", min_width=20)
+    table.add_column("Estudiantes en común", justify="right")
+
+    if not filas:
+        table.add_row("[dim]Ningún estudiante lo toma con otro curso[/dim]", "", "")
+    for fila in filas:
+        table.add_row(fila['id_curso'], fila['nombre_curso'], str(fila['estudiantes']))
+    console.print(table)
+
+
+def mostrar_horario_examenes(franjas: List[Dict[str, Any]], sobrecargados: List[Dict[str, Any]],
+                             periodo: str, max_por_dia: int, maximo: int = 20) -> None:
+    """Muestra la franja de examen de cada curso y a los estudiantes con demasiados exámenes en un día."""
+    table = Table(title=f"Horario de Exámenes ({periodo})", show_header=True, header_style="bold magenta")
+    table.add_column("Día", justify="right", width=5)
+    table.add_column("Franja", justify="right", width=7)
+    table.add_column("Cursos", min_width=30)
+    for fila in franjas:
+        cursos = ", ".join(f"{c['id_curso']} {c['nombre_curso']}" for c in fila['cursos'])
+        table.add_row(str(fila['dia'] + 1), str(fila['franja'] + 1), cursos)
+    console.print(table)
+
+    if not sobrecargados:
+        console.print(f"[green]Ningún estudiante tiene más de {max_por_dia} exámenes en un día.[/green]")
+        return
+    table = Table(title=f"Estudiantes con más de {max_por_dia} exámenes en un día",
+                  show_header=True, header_style="bold red")
+    table.add_column("ID Estudiante", style="dim", width=12)
+    table.add_column("Nombre", min_width=20)
+    table.add_column("Día", justify="right")
+    table.add_column("Exámenes", justify="right")
+    for fila in sobrecargados[:maximo]:
+        table.add_row(fila['id_estudiante'], fila['nombre'], str(fila['dia'] + 1), str(fila['examenes']))
+    console.print(table)
+    if len(sobrecargados) > maximo:
+        console.print(f"[dim]... y {len(sobrecargados) - maximo} caso(s) más.[/dim]")
+
+
+def mostrar_errores_importacion(errores: List[str], maximo: int = 20) -> None:
+    """Muestra las filas rechazadas de una importación (las primeras 'maximo')."""
+    if not errores:
+        return
+    table = Table(title="Filas no importadas", show_header=True, header_style="bold red")
+    table.add_column("Detalle", min_width=40)
+    for error in errores[:maximo]:
+        table.add_row(error)
+    if len(errores) > maximo:
+        table.add_row(f"[dim]... y {len(errores) - maximo} fila(s) más[/dim]")
+    console.print(table)
+
+
 def mostrar_mensaje(mensaje: str, tipo: str = "info") -> None:
     """Muestra un mensaje de éxito (verde), error (rojo) o info (amarillo)."""
     if tipo == "error":
@@ -279,9 +451,9 @@ def pedir_datos_estudiante(lista_carreras: List[Dict[str, Any]], actualizando: b
     return nombre, id_carrera_seleccionada
 
 
-def pedir_datos_curso(actualizando: bool = False) -> Optional[Tuple[str, Optional[int]]]:
+def pedir_datos_curso(actualizando: bool = False) -> Optional[Tuple[str, Optional[int], Optional[List[str]]]]:
     """
-    Pide nombre y créditos. Retorna None si el usuario cancela.
+    Pide nombre, créditos y prerrequisitos. Retorna None si el usuario cancela.
     Se reemplazó IntPrompt para permitir la cancelación.
     """
     console.print(Panel(CANCEL_MESSAGE, border_style="dim", width=60))
@@ -326,7 +498,21 @@ def pedir_datos_curso(actualizando: bool = False) -> Optional[Tuple[str, Optiona
             except ValueError:
                 mostrar_mensaje("Entrada no válida. Debe ser un número.", "error")
 
-    return nombre_curso, creditos
+    # 3. Pedir Prerrequisitos (IDs separados por ';')
+    if actualizando:
+        texto = Prompt.ask("[bold]Prerrequisitos (Ej. C001;C002, '-' para quitarlos)[/bold]" + aviso, default="")
+    else:
+        texto = Prompt.ask("[bold]Prerrequisitos (Ej. C001;C002, vacío si no tiene)[/bold]", default="")
+    texto = texto.strip()
+    if texto.lower() == CANCEL_KEYWORD:
+        return None
+    prerrequisitos: Optional[List[str]] = texto_a_lista(texto.upper())
+    if actualizando and texto == "":
+        prerrequisitos = None  # Señal para "no actualizar"
+    elif texto == "-":
+        prerrequisitos = []
+
+    return nombre_curso, creditos, prerrequisitos
 
 
 def pedir_datos_carrera(actualizando: bool = False) -> Optional[Tuple[str]]:
@@ -343,6 +529,21 @@ def pedir_datos_carrera(actualizando: bool = False) -> Optional[Tuple[str]]:
     return (nombre_carrera,)
 
 
+def pedir_ruta_importacion(columnas: List[str], nota: str = "") -> Optional[str]:
+    """
+    Pide la ruta del archivo CSV a importar. Retorna None si el usuario cancela.
+    """
+    console.print(Panel(
+        f"El archivo debe tener encabezado con las columnas: [bold]{', '.join(columnas)}[/bold]\n"
+        f"{nota + chr(10) if nota else ''}{CANCEL_MESSAGE}",
+        border_style="dim", width=60
+    ))
+    ruta = Prompt.ask("[bold]Ruta del archivo CSV[/bold]").strip()
+    if not ruta or ruta.lower() == CANCEL_KEYWORD:
+        return None
+    return ruta
+
+
 # --- Funciones de Selección (Usadas por Actualizar, Eliminar, Buscar) ---
 
 def seleccionar_estudiante(
@@ -538,4 +739,63 @@ def pedir_datos_matricula(
         mostrar_mensaje("El periodo no puede estar vacío. Matrícula cancelada.", "error")
         return None, [], None
 
-    return id_estudiante, cursos_seleccionados_ids, periodo
\ No newline at end of file
+    return id_estudiante, cursos_seleccionados_ids, periodo
+
+
+def pedir_datos_reporte_creditos(periodo_defecto: Optional[str], minimo_defecto: int = 0) -> Optional[Tuple[str, int]]:
+    """
+    Pide el periodo y el mínimo de créditos del reporte.
+    Retorna None si el usuario cancela.
+    """
+    console.print(Panel(CANCEL_MESSAGE, border_style="dim", width=60))
+    periodo = Prompt.ask("[bold]Periodo académico (Ej. 2025-01)[/bold]", default=periodo_defecto or "2025-01").strip()
+    if not periodo or periodo.lower() == CANCEL_KEYWORD:
+        return None
+
+    while True:
+        minimo_str = Prompt.ask("[bold]Mostrar estudiantes con más de (créditos)[/bold]", default=str(minimo_defecto))
+        if minimo_str.lower() == CANCEL_KEYWORD:
+            return None
+        try:
+            return periodo, int(minimo_str)
+        except ValueError:
+            mostrar_mensaje("Entrada no válida. Debe ser un número.", "error")
+
+
+def pedir_datos_horario_examenes(periodo_defecto: Optional[str], franjas_defecto: int,
+                                 maximo_defecto: int) -> Optional[Tuple[str, int, int]]:
+    """
+    Pide el periodo, las franjas de examen por día y el máximo de exámenes
+    por día de un estudiante. Retorna None si el usuario cancela.
+    """
+    console.print(Panel(CANCEL_MESSAGE, border_style="dim", width=60))
+    periodo = Prompt.ask("[bold]Periodo académico (Ej. 2025-01)[/bold]", default=periodo_defecto or "2025-01").strip()
+    if not periodo or periodo.lower() == CANCEL_KEYWORD:
+        return None
+
+    numeros = []
+    for texto, defecto in (("Franjas de examen por día", franjas_defecto),
+                           ("Avisar con más de (exámenes por día)", maximo_defecto)):
+        while True:
+            valor_str = Prompt.ask(f"[bold]{texto}[/bold]", default=str(defecto))
+            if valor_str.lower() == CANCEL_KEYWORD:
+                return None
+            try:
+                numeros.append(int(valor_str))
+                break
+            except ValueError:
+                mostrar_mensaje("Entrada no válida. Debe ser un número.", "error")
+    return periodo, numeros[0], numeros[1]
+
+
+def pedir_periodo_reporte(periodo_defecto: Optional[str]) -> Optional[str]:
+    """
+    Pide el periodo de un reporte; 'todos' (o vacío) abarca todos los periodos.
+    Retorna None si el usuario cancela y "" para todos los periodos.
+    """
+    console.print(Panel(CANCEL_MESSAGE, border_style="dim", width=60))
+    periodo = Prompt.ask("[bold]Periodo académico (Ej. 2025-01, o 'todos')[/bold]",
+                         default=periodo_defecto or "todos").strip()
+    if periodo.lower() == CANCEL_KEYWORD:
+        return None
+    return "" if periodo.lower() == "todos" else periodo
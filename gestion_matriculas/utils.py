@@ -2,10 +2,16 @@
 Módulo de Utilidades (utils.py)
 
 Contiene funciones auxiliares de propósito general para la aplicación,
-como la limpieza de la pantalla de la consola.
+como la limpieza de la pantalla de la consola y la escritura atómica
+de archivos.
 """
 import os
 import platform
+from contextlib import contextmanager
+from typing import IO, Any, Iterator, List
+
+# Separador de las listas guardadas en una sola columna de texto (ej. C001;C002)
+SEPARADOR_LISTA = ";"
 
 
 def limpiar_pantalla():
@@ -17,4 +23,54 @@ def limpiar_pantalla():
     if platform.system() == "Windows":
         os.system("cls")
     else:
-        os.system("clear")
\ No newline at end of file
+        os.system("clear")
+
+
+@contextmanager
+def escritura_atomica(ruta: str, mode: str = 'w', **kwargs) -> Iterator[IO]:
+    """
+    Abre un archivo temporal junto a 'ruta' y, si el bloque termina sin
+    errores, lo renombra sobre 'ruta' (os.replace es atómico). Si el
+    programa se interrumpe a mitad de la escritura, el archivo original
+    queda intacto en lugar de truncado.
+
+    Uso:
+        with escritura_atomica("data/cursos.csv", newline='', encoding='utf-8') as file:
+            file.write(...)
+
+    Args:
+        ruta (str): El archivo de destino.
+        mode (str): Modo de apertura ('w' o 'wb').
+        **kwargs: Argumentos adicionales para open() (encoding, newline...).
+    """
+    temporal = f"{ruta}.tmp"
+    try:
+        with open(temporal, mode=mode, **kwargs) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def lista_a_texto(valor: Any) -> Any:
+    """
+    Prepara un valor para una columna de texto (CSV o tabla de ancho fijo):
+    las listas (ej. los prerrequisitos de un curso) se unen con SEPARADOR_LISTA
+    y el resto de los valores se devuelve igual.
+    """
+    if isinstance(valor, (list, tuple)):
+        return SEPARADOR_LISTA.join(valor)
+    return valor
+
+
+def texto_a_lista(valor: Any) -> List[str]:
+    """Operación inversa de 'lista_a_texto': 'C001;C002' -> ['C001', 'C002'] (None o '' -> [])."""
+    if isinstance(valor, (list, tuple)):
+        return list(valor)
+    if not valor:
+        return []
+    return [parte.strip() for parte in str(valor).split(SEPARADOR_LISTA) if parte.strip()]
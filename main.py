@@ -8,7 +8,8 @@ Actúa como el "controlador" principal:
 3. Llama a los submenús de gestión.
 4. Pasa los datos (listas) entre las funciones.
 5. Llama a los 'servicios' para ejecutar la lógica.
-6. Llama a los módulos de datos para guardar cambios.
+6. Llama al repositorio de persistencia para guardar cada cambio
+   (archivos CSV/JSON o SQLite, ver repositorio.py).
 
 NUEVO: Los bucles de gestión ahora comprueban si las funciones de UI
 devuelven 'None' (señal de cancelación) y actúan en consecuencia.
@@ -18,16 +19,49 @@ import gestion_matriculas.estudiantes as est
 import gestion_matriculas.cursos as cur
 import gestion_matriculas.matriculas as mat
 import gestion_matriculas.carreras as car
+import gestion_matriculas.analitica as ana
+import gestion_matriculas.examenes as exa
 import gestion_matriculas.ui as ui
 import gestion_matriculas.utils as utils
 import gestion_matriculas.servicios as srv
+import gestion_matriculas.repositorio as repositorio
 from typing import List, Dict, Any
 
 
-def gestionar_estudiantes(lista_estudiantes: List[Dict[str, Any]], lista_carreras: List[Dict[str, Any]], lista_matriculas: List[Dict[str, Any]]):
+def mostrar_errores_de_guardado(repo: repositorio.Repositorio):
+    """
+    Muestra los errores de las escrituras hechas en segundo plano y los
+    conflictos con otras terminales ocurridos desde la última pantalla.
+    """
+    for error in repo.tomar_errores():
+        ui.mostrar_mensaje(error, "error")
+
+
+def guardar_alta(repo: repositorio.Repositorio, entidad: str, registros: List[Dict[str, Any]], resultado: Dict[str, str]):
+    """
+    Persiste el registro que acaba de crear un servicio (el último de la lista)
+    y recién entonces muestra su mensaje: en modo compartido el ID puede
+    cambiar al insertar, si otra terminal ya lo usó, y el mensaje debe
+    mostrar el definitivo.
+    """
+    if resultado["tipo"] != "exito":
+        ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
+        return
+    registro = registros[-1]
+    id_propuesto = str(registro[repositorio.CLAVES_PRIMARIAS[entidad]])
+    id_final = repo.insertar(entidad, registro)
+    mensaje = resultado["mensaje"]
+    if id_final != id_propuesto and mensaje.endswith(id_propuesto):
+        mensaje = mensaje[:-len(id_propuesto)] + id_final
+    ui.mostrar_mensaje(mensaje, resultado["tipo"])
+
+
+def gestionar_estudiantes(lista_estudiantes: List[Dict[str, Any]], lista_carreras: List[Dict[str, Any]], lista_matriculas: List[Dict[str, Any]], repo: repositorio.Repositorio):
     """Bucle del submenú de gestión de estudiantes."""
     while True:
         utils.limpiar_pantalla()
+        repo.refrescar()  # Cambios que otros procesos hicieron en data/
+        mostrar_errores_de_guardado(repo)
         opcion = ui.mostrar_menu_crud("Estudiante")
 
         if opcion == "1":  # Crear
@@ -38,9 +72,7 @@ def gestionar_estudiantes(lista_estudiantes: List[Dict[str, Any]], lista_carrera
 
             nombre, id_carrera = datos_estudiante
             resultado = srv.srv_registrar_estudiante(lista_estudiantes, lista_carreras, nombre, id_carrera)
-            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
-            if resultado["tipo"] == "exito":
-                est.guardar_estudiantes(lista_estudiantes)
+            guardar_alta(repo, "estudiantes", lista_estudiantes, resultado)
 
         elif opcion == "2":  # Ver todos
             ui.mostrar_tabla_estudiantes(lista_estudiantes, lista_carreras)
@@ -65,7 +97,7 @@ def gestionar_estudiantes(lista_estudiantes: List[Dict[str, Any]], lista_carrera
             resultado = srv.srv_actualizar_estudiante(lista_estudiantes, lista_carreras, id_est, n_nombre, n_id_carrera)
             ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
             if resultado["tipo"] == "exito":
-                est.guardar_estudiantes(lista_estudiantes)
+                repo.actualizar("estudiantes", estudiante_obj)
 
         elif opcion == "4":  # Eliminar
             id_est = ui.seleccionar_estudiante(lista_estudiantes, lista_carreras, "eliminar", permitir_cancelar=True)
@@ -75,7 +107,7 @@ def gestionar_estudiantes(lista_estudiantes: List[Dict[str, Any]], lista_carrera
             resultado = srv.srv_eliminar_estudiante(lista_estudiantes, lista_matriculas, id_est)
             ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
             if resultado["tipo"] == "exito":
-                est.guardar_estudiantes(lista_estudiantes)
+                repo.eliminar("estudiantes", id_est)
 
         elif opcion == "5":  # Buscar
             id_est = ui.seleccionar_estudiante(lista_estudiantes, lista_carreras, "buscar", permitir_cancelar=True)
@@ -88,16 +120,32 @@ def gestionar_estudiantes(lista_estudiantes: List[Dict[str, Any]], lista_carrera
             else:
                 ui.mostrar_mensaje(f"Estudiante con ID {id_est} no encontrado.", "error")
 
-        elif opcion == "6":  # Volver
+        elif opcion == "6":  # Importar desde CSV
+            ruta = ui.pedir_ruta_importacion(["nombre", "id_carrera"])
+            if ruta is None:
+                ui.mostrar_mensaje("Importación cancelada.", "info")
+                continue
+
+            resultado = srv.srv_importar_estudiantes(lista_estudiantes, lista_carreras, ruta)
+            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
+            ui.mostrar_errores_importacion(resultado.get("errores", []))
+            if resultado.get("importados"):
+                repo.insertar_lote("estudiantes", resultado["importados"])
+
+        elif opcion == "7":  # Volver
+            repo.sincronizar()  # Escribe de una vez los cambios hechos en el submenú
             break
 
+        mostrar_errores_de_guardado(repo)
         input("\nPresione Enter para continuar...")
 
 
-def gestionar_cursos(lista_cursos: List[Dict[str, Any]], lista_matriculas: List[Dict[str, Any]]):
+def gestionar_cursos(lista_cursos: List[Dict[str, Any]], lista_matriculas: List[Dict[str, Any]], repo: repositorio.Repositorio):
     """Bucle del submenú de gestión de cursos."""
     while True:
         utils.limpiar_pantalla()
+        repo.refrescar()  # Cambios que otros procesos hicieron en data/
+        mostrar_errores_de_guardado(repo)
         opcion = ui.mostrar_menu_crud("Curso")
 
         if opcion == "1":  # Crear
@@ -106,11 +154,9 @@ def gestionar_cursos(lista_cursos: List[Dict[str, Any]], lista_matriculas: List[
                 ui.mostrar_mensaje("Creación de curso cancelada.", "info")
                 continue
 
-            nombre, creditos = datos_curso
-            resultado = srv.srv_registrar_curso(lista_cursos, nombre, creditos)
-            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
-            if resultado["tipo"] == "exito":
-                cur.guardar_cursos(lista_cursos)
+            nombre, creditos, prerrequisitos = datos_curso
+            resultado = srv.srv_registrar_curso(lista_cursos, nombre, creditos, prerrequisitos, lista_matriculas)
+            guardar_alta(repo, "cursos", lista_cursos, resultado)
 
         elif opcion == "2":  # Ver todos
             ui.mostrar_tabla_cursos(lista_cursos)
@@ -131,11 +177,12 @@ def gestionar_cursos(lista_cursos: List[Dict[str, Any]], lista_matriculas: List[
                 ui.mostrar_mensaje("Actualización cancelada.", "info")
                 continue
 
-            n_nombre, n_creditos = datos_nuevos
-            resultado = srv.srv_actualizar_curso(lista_cursos, id_cur, n_nombre, n_creditos)
+            n_nombre, n_creditos, n_prerrequisitos = datos_nuevos
+            resultado = srv.srv_actualizar_curso(lista_cursos, id_cur, n_nombre, n_creditos, lista_matriculas,
+                                                 n_prerrequisitos)
             ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
             if resultado["tipo"] == "exito":
-                cur.guardar_cursos(lista_cursos)
+                repo.actualizar("cursos", curso_obj)
 
         elif opcion == "4":  # Eliminar
             id_cur = ui.seleccionar_curso(lista_cursos, "eliminar", permitir_cancelar=True)
@@ -145,7 +192,7 @@ def gestionar_cursos(lista_cursos: List[Dict[str, Any]], lista_matriculas: List[
             resultado = srv.srv_eliminar_curso(lista_cursos, lista_matriculas, id_cur)
             ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
             if resultado["tipo"] == "exito":
-                cur.guardar_cursos(lista_cursos)
+                repo.eliminar("cursos", id_cur)
 
         elif opcion == "5":  # Buscar
             id_cur = ui.seleccionar_curso(lista_cursos, "buscar", permitir_cancelar=True)
@@ -158,16 +205,32 @@ def gestionar_cursos(lista_cursos: List[Dict[str, Any]], lista_matriculas: List[
             else:
                 ui.mostrar_mensaje(f"Curso con ID {id_cur} no encontrado.", "error")
 
-        elif opcion == "6":  # Volver
+        elif opcion == "6":  # Importar desde CSV
+            ruta = ui.pedir_ruta_importacion(["nombre_curso", "creditos"])
+            if ruta is None:
+                ui.mostrar_mensaje("Importación cancelada.", "info")
+                continue
+
+            resultado = srv.srv_importar_cursos(lista_cursos, ruta)
+            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
+            ui.mostrar_errores_importacion(resultado.get("errores", []))
+            if resultado.get("importados"):
+                repo.insertar_lote("cursos", resultado["importados"])
+
+        elif opcion == "7":  # Volver
+            repo.sincronizar()  # Escribe de una vez los cambios hechos en el submenú
             break
 
+        mostrar_errores_de_guardado(repo)
         input("\nPresione Enter para continuar...")
 
 
-def gestionar_carreras(lista_carreras: List[Dict[str, Any]], lista_estudiantes: List[Dict[str, Any]]):
+def gestionar_carreras(lista_carreras: List[Dict[str, Any]], lista_estudiantes: List[Dict[str, Any]], repo: repositorio.Repositorio):
     """Bucle del submenú de gestión de carreras."""
     while True:
         utils.limpiar_pantalla()
+        repo.refrescar()  # Cambios que otros procesos hicieron en data/
+        mostrar_errores_de_guardado(repo)
         opcion = ui.mostrar_menu_crud("Carrera")
 
         if opcion == "1":  # Crear
@@ -178,9 +241,7 @@ def gestionar_carreras(lista_carreras: List[Dict[str, Any]], lista_estudiantes:
 
             (nombre_carrera,) = datos_carrera
             resultado = srv.srv_registrar_carrera(lista_carreras, nombre_carrera)
-            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
-            if resultado["tipo"] == "exito":
-                car.guardar_carreras(lista_carreras)
+            guardar_alta(repo, "carreras", lista_carreras, resultado)
 
         elif opcion == "2":  # Ver todos
             ui.mostrar_tabla_carreras(lista_carreras)
@@ -205,7 +266,7 @@ def gestionar_carreras(lista_carreras: List[Dict[str, Any]], lista_estudiantes:
             resultado = srv.srv_actualizar_carrera(lista_carreras, id_car, n_nombre)
             ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
             if resultado["tipo"] == "exito":
-                car.guardar_carreras(lista_carreras)
+                repo.actualizar("carreras", carrera_obj)
 
         elif opcion == "4":  # Eliminar
             id_car = ui.seleccionar_carrera(lista_carreras, "eliminar", permitir_cancelar=True)
@@ -215,7 +276,7 @@ def gestionar_carreras(lista_carreras: List[Dict[str, Any]], lista_estudiantes:
             resultado = srv.srv_eliminar_carrera(lista_carreras, lista_estudiantes, id_car)
             ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
             if resultado["tipo"] == "exito":
-                car.guardar_carreras(lista_carreras)
+                repo.eliminar("carreras", id_car)
 
         elif opcion == "5":  # Buscar
             id_car = ui.seleccionar_carrera(lista_carreras, "buscar", permitir_cancelar=True)
@@ -228,9 +289,23 @@ def gestionar_carreras(lista_carreras: List[Dict[str, Any]], lista_estudiantes:
             else:
                 ui.mostrar_mensaje(f"Carrera con ID {id_car} no encontrada.", "error")
 
-        elif opcion == "6":  # Volver
+        elif opcion == "6":  # Importar desde CSV
+            ruta = ui.pedir_ruta_importacion(["nombre_carrera"])
+            if ruta is None:
+                ui.mostrar_mensaje("Importación cancelada.", "info")
+                continue
+
+            resultado = srv.srv_importar_carreras(lista_carreras, ruta)
+            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
+            ui.mostrar_errores_importacion(resultado.get("errores", []))
+            if resultado.get("importados"):
+                repo.insertar_lote("carreras", resultado["importados"])
+
+        elif opcion == "7":  # Volver
+            repo.sincronizar()  # Escribe de una vez los cambios hechos en el submenú
             break
 
+        mostrar_errores_de_guardado(repo)
         input("\nPresione Enter para continuar...")
 
 
@@ -238,11 +313,14 @@ def gestionar_matriculas(
     lista_estudiantes: List[Dict[str, Any]],
     lista_cursos: List[Dict[str, Any]],
     lista_carreras: List[Dict[str, Any]],
-    lista_matriculas: List[Dict[str, Any]]
+    lista_matriculas: List[Dict[str, Any]],
+    repo: repositorio.Repositorio
 ):
     """Bucle del submenú de gestión de matrículas."""
     while True:
         utils.limpiar_pantalla()
+        repo.refrescar()  # Cambios que otros procesos hicieron en data/
+        mostrar_errores_de_guardado(repo)
         opcion = ui.mostrar_menu_matriculas()
 
         if opcion == "1":  # Matricular estudiante
@@ -257,9 +335,7 @@ def gestionar_matriculas(
                 id_est, ids_cursos, periodo,
                 lista_estudiantes, lista_cursos, lista_matriculas
             )
-            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
-            if resultado["tipo"] == "exito":
-                mat.guardar_matriculas(lista_matriculas)
+            guardar_alta(repo, "matriculas", lista_matriculas, resultado)
 
         elif opcion == "2":  # Ver cursos de un estudiante
             id_est = ui.seleccionar_estudiante(lista_estudiantes, lista_carreras, "consultar", permitir_cancelar=True)
@@ -286,21 +362,135 @@ def gestionar_matriculas(
                 est_curso = mat.obtener_estudiantes_por_curso(id_curso, lista_matriculas, lista_estudiantes)
                 ui.mostrar_estudiantes_en_curso(curso_obj, est_curso, lista_carreras)
 
+        elif opcion == "4":  # Estadísticas de referencias
+            estadisticas = srv.srv_estadisticas_referencias(
+                lista_estudiantes, lista_cursos, lista_carreras, lista_matriculas
+            )
+            ui.mostrar_estadisticas(estadisticas, lista_carreras, lista_cursos)
+
+        elif opcion == "5":  # Estudiantes sobre N créditos
+            periodos = mat.obtener_periodos(lista_matriculas)
+            datos = ui.pedir_datos_reporte_creditos(periodos[-1] if periodos else None)
+            if datos is None:
+                ui.mostrar_mensaje("Reporte cancelado.", "info")
+                continue
+
+            periodo, minimo = datos
+            reporte = srv.srv_reporte_creditos(lista_estudiantes, lista_cursos, lista_matriculas, periodo, minimo)
+            ui.mostrar_reporte_creditos(reporte, periodo, minimo)
+
+        elif opcion == "6":  # Matricular lote desde CSV
+            ruta = ui.pedir_ruta_importacion(["id_estudiante", "id_cursos", "periodo_academico"],
+                                             "Separe los cursos de cada fila con ';' (ej. C001;C002).")
+            if ruta is None:
+                ui.mostrar_mensaje("Matrícula en lote cancelada.", "info")
+                continue
+
+            resultado = srv.srv_importar_matriculas(ruta, lista_estudiantes, lista_cursos, lista_matriculas)
+            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
+            ui.mostrar_errores_importacion(resultado.get("errores", []))
+            if resultado.get("importados"):
+                repo.insertar_lote("matriculas", resultado["importados"])
+
         # BUG CORREGIDO: Se quitó el '.' de "4."
-        elif opcion == "4":  # Volver
+        elif opcion == "7":  # Volver
+            repo.sincronizar()  # Escribe de una vez los cambios hechos en el submenú
+            break
+
+        mostrar_errores_de_guardado(repo)
+        input("\nPresione Enter para continuar...")
+
+
+def gestionar_reportes(
+    lista_estudiantes: List[Dict[str, Any]],
+    lista_cursos: List[Dict[str, Any]],
+    lista_carreras: List[Dict[str, Any]],
+    lista_matriculas: List[Dict[str, Any]],
+    repo: repositorio.Repositorio
+):
+    """Bucle del submenú de reportes (solo lectura: no persiste nada)."""
+    while True:
+        utils.limpiar_pantalla()
+        repo.refrescar()  # Cambios que otros procesos hicieron en data/
+        mostrar_errores_de_guardado(repo)
+        opcion = ui.mostrar_menu_reportes()
+        if opcion == "7":  # Volver
             break
 
+        periodos = mat.obtener_periodos(lista_matriculas)
+        periodo_defecto = periodos[-1] if periodos else None
+
+        if opcion == "1":  # Inscritos por curso
+            periodo = ui.pedir_periodo_reporte(periodo_defecto)
+            if periodo is None:
+                continue
+            resultado = srv.srv_reporte_inscritos(lista_cursos, lista_matriculas, periodo or None)
+            if resultado["tipo"] == "exito":
+                ui.mostrar_reporte_inscritos(resultado["filas"], periodo or None)
+
+        elif opcion == "2":  # Carga de créditos por carrera
+            periodo = ui.pedir_periodo_reporte(periodo_defecto)
+            if periodo is None:
+                continue
+            resultado = srv.srv_reporte_carga_por_carrera(
+                lista_estudiantes, lista_cursos, lista_carreras, lista_matriculas, periodo or None
+            )
+            if resultado["tipo"] == "exito":
+                ui.mostrar_reporte_carga(resultado["filas"], periodo or None)
+
+        elif opcion == "3":  # Estudiantes sobrecargados
+            datos = ui.pedir_datos_reporte_creditos(periodo_defecto, ana.CREDITOS_SOBRECARGA)
+            if datos is None:
+                continue
+            periodo, maximo = datos
+            resultado = srv.srv_reporte_sobrecarga(lista_estudiantes, lista_cursos, lista_matriculas, periodo, maximo)
+            if resultado["tipo"] == "exito":
+                ui.mostrar_reporte_creditos(resultado["filas"], periodo, maximo)
+
+        elif opcion == "4":  # Tendencia por periodo
+            resultado = srv.srv_reporte_tendencia(lista_cursos, lista_matriculas)
+            if resultado["tipo"] == "exito":
+                ui.mostrar_reporte_tendencia(resultado["filas"])
+
+        elif opcion == "5":  # Cursos que se toman juntos
+            id_curso = ui.seleccionar_curso(lista_cursos, "consultar", permitir_cancelar=True)
+            if not id_curso:
+                continue
+            periodo = ui.pedir_periodo_reporte(periodo_defecto)
+            if periodo is None:
+                continue
+            resultado = srv.srv_reporte_cursos_en_comun(lista_cursos, lista_matriculas, id_curso, periodo or None)
+            if resultado["tipo"] == "exito":
+                ui.mostrar_reporte_cursos_en_comun(cur.buscar_curso_por_id(lista_cursos, id_curso),
+                                                   resultado["filas"], periodo or None)
+
+        else:  # "6": Horario de exámenes
+            datos = ui.pedir_datos_horario_examenes(periodo_defecto, exa.FRANJAS_POR_DIA, exa.EXAMENES_MAX_POR_DIA)
+            if datos is None:
+                continue
+            periodo, franjas_por_dia, max_por_dia = datos
+            resultado = srv.srv_generar_horario_examenes(
+                lista_estudiantes, lista_cursos, lista_matriculas, periodo, franjas_por_dia, max_por_dia
+            )
+            if resultado["tipo"] == "exito":
+                ui.mostrar_horario_examenes(resultado["franjas"], resultado["sobrecargados"], periodo, max_por_dia)
+
+        if resultado["tipo"] != "exito":
+            ui.mostrar_mensaje(resultado["mensaje"], resultado["tipo"])
         input("\nPresione Enter para continuar...")
 
 
 def main():
     """Función principal que ejecuta la aplicación."""
     try:
-        lista_estudiantes = est.cargar_estudiantes()
-        lista_cursos = cur.cargar_cursos()
-        lista_matriculas = mat.cargar_matriculas()
-        lista_carreras = car.cargar_carreras()
-        ui.mostrar_mensaje("Datos cargados correctamente", "info")
+        repo = repositorio.crear_repositorio()
+        datos, tiempos = repo.cargar_todo()
+        lista_estudiantes = datos["estudiantes"]
+        lista_cursos = datos["cursos"]
+        lista_matriculas = datos["matriculas"]
+        lista_carreras = datos["carreras"]
+        detalle = ", ".join(f"{entidad}: {segundos * 1000:.0f} ms" for entidad, segundos in tiempos.items())
+        ui.mostrar_mensaje(f"Datos cargados correctamente ({detalle})", "info")
     except Exception as e:
         ui.mostrar_mensaje(f"Error fatal al cargar datos: {e}", "error")
         return
@@ -309,21 +499,28 @@ def main():
 
     while True:
         utils.limpiar_pantalla()
+        repo.refrescar()  # Cambios que otros procesos hicieron en data/
+        mostrar_errores_de_guardado(repo)
         opcion = ui.mostrar_menu_principal()
 
         if opcion == "1":
-            gestionar_estudiantes(lista_estudiantes, lista_carreras, lista_matriculas)
+            gestionar_estudiantes(lista_estudiantes, lista_carreras, lista_matriculas, repo)
 
         elif opcion == "2":
-            gestionar_cursos(lista_cursos, lista_matriculas)
+            gestionar_cursos(lista_cursos, lista_matriculas, repo)
 
         elif opcion == "3":
-            gestionar_carreras(lista_carreras, lista_estudiantes)
+            gestionar_carreras(lista_carreras, lista_estudiantes, repo)
 
         elif opcion == "4":
-            gestionar_matriculas(lista_estudiantes, lista_cursos, lista_carreras, lista_matriculas)
+            gestionar_matriculas(lista_estudiantes, lista_cursos, lista_carreras, lista_matriculas, repo)
 
         elif opcion == "5":
+            gestionar_reportes(lista_estudiantes, lista_cursos, lista_carreras, lista_matriculas, repo)
+
+        elif opcion == "6":
+            repo.cerrar()
+            mostrar_errores_de_guardado(repo)
             ui.mostrar_mensaje("¡Hasta luego!", "info")
             break
 
@@ -22,9 +22,9 @@ def carreras_mock() -> List[Dict[str, Any]]:
 def cursos_mock() -> List[Dict[str, Any]]:
     """Fixture que provee una lista de cursos de prueba."""
     return [
-        {"id_curso": "C001", "nombre_curso": "Programacion Basica", "creditos": 3},
-        {"id_curso": "C002", "nombre_curso": "Bases de Datos", "creditos": 4},
-        {"id_curso": "C003", "nombre_curso": "Algebra Lineal", "creditos": 2}
+        {"id_curso": "C001", "nombre_curso": "Programacion Basica", "creditos": 3, "prerrequisitos": []},
+        {"id_curso": "C002", "nombre_curso": "Bases de Datos", "creditos": 4, "prerrequisitos": []},
+        {"id_curso": "C003", "nombre_curso": "Algebra Lineal", "creditos": 2, "prerrequisitos": []}
     ].copy()
 
 @pytest.fixture
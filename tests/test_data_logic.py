@@ -4,9 +4,16 @@ Pruebas para la Lógica de Datos (estudiantes.py, cursos.py, etc.)
 Estas pruebas validan la lógica de bajo nivel, como la generación
 de IDs, las funciones de búsqueda y los cálculos de relaciones.
 """
+import json
+import pickle
 import pytest
 # Importamos los módulos que vamos a probar
-from gestion_matriculas import estudiantes, cursos, carreras, matriculas
+from gestion_matriculas import estudiantes, cursos, carreras, matriculas, tabla_fija, comatriculas, examenes
+from gestion_matriculas import bitacora, prerrequisitos
+from gestion_matriculas.almacen import Almacen, Internador
+from gestion_matriculas.almacen import normalizar_nombre
+from gestion_matriculas.registros import Estudiante, Curso, Matricula
+from gestion_matriculas.utils import escritura_atomica
 
 
 # --- Pruebas de Generación de ID ---
@@ -97,4 +104,511 @@ def test_calcular_total_creditos_otro_estudiante(matriculas_mock, cursos_mock):
 def test_calcular_total_creditos_estudiante_sin_matricula(matriculas_mock, cursos_mock):
     """Prueba que devuelva 0 si el estudiante no tiene matrícula."""
     total_creditos = matriculas.calcular_total_creditos("E999", matriculas_mock, cursos_mock)
-    assert total_creditos == 0
\ No newline at end of file
+    assert total_creditos == 0
+
+# --- Pruebas del Journal de Matrículas ---
+
+@pytest.fixture
+def rutas_matriculas(tmp_path, monkeypatch):
+    """Redirige el snapshot, el journal y las particiones de matrículas a un directorio temporal."""
+    monkeypatch.setattr(matriculas, "FILE_PATH", str(tmp_path / "matriculas.json"))
+    monkeypatch.setattr(matriculas, "JOURNAL_PATH", str(tmp_path / "matriculas.jsonl"))
+    monkeypatch.setattr(matriculas, "PERIODOS_DIR", str(tmp_path / "periodos"))
+    return tmp_path
+
+
+def test_journal_reproduce_matriculas(rutas_matriculas, matriculas_mock):
+    """Prueba que al cargar se combinen el snapshot y las matrículas del journal."""
+    matriculas.guardar_matriculas(matriculas_mock[:1])
+    matriculas.registrar_matricula(matriculas_mock[1])
+
+    cargadas = matriculas.cargar_matriculas()
+    assert [m["id_matricula"] for m in cargadas] == ["M0001", "M0002"]
+
+
+def test_journal_ignora_linea_incompleta(rutas_matriculas, matriculas_mock):
+    """Prueba que una línea truncada al final del journal no impida la carga."""
+    matriculas.registrar_matricula(matriculas_mock[0])
+    with open(matriculas.JOURNAL_PATH, "a", encoding="utf-8") as file:
+        file.write('{"id_matricula": "M00')
+
+    cargadas = matriculas.cargar_matriculas()
+    assert [m["id_matricula"] for m in cargadas] == ["M0001"]
+
+    # La siguiente matrícula no se pega a la línea incompleta
+    matriculas.registrar_matricula(matriculas_mock[1])
+    cargadas = matriculas.cargar_matriculas()
+    assert [m["id_matricula"] for m in cargadas] == ["M0001", "M0002"]
+
+
+def test_compactar_matriculas(rutas_matriculas, matriculas_mock):
+    """Prueba que la compactación vacíe el journal sin perder matrículas."""
+    for matricula in matriculas_mock:
+        matriculas.registrar_matricula(matricula)
+
+    assert matriculas.compactar_matriculas(matriculas_mock) is True
+    assert (rutas_matriculas / "matriculas.jsonl").stat().st_size == 0
+    assert matriculas.compactar_matriculas(matriculas_mock) is False
+    assert len(matriculas.cargar_matriculas()) == 2
+
+
+def test_journal_no_duplica_tras_compactacion_interrumpida(rutas_matriculas, matriculas_mock):
+    """Prueba que una matrícula presente en snapshot y journal se cargue una sola vez."""
+    matriculas.registrar_matricula(matriculas_mock[0])
+    with open(matriculas.FILE_PATH, "w", encoding="utf-8") as file:
+        json.dump(matriculas_mock, file)
+
+    assert len(matriculas.cargar_matriculas()) == 2
+
+
+# --- Pruebas del Almacen indexado por ID ---
+
+def test_almacen_busca_por_id(estudiantes_mock):
+    """Prueba que la búsqueda con Almacen devuelva el mismo registro que la lista."""
+    almacen = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+
+    assert estudiantes.buscar_estudiante_por_id(almacen, "E002") is estudiantes_mock[1]
+    assert estudiantes.buscar_estudiante_por_id(almacen, "E999") is None
+
+
+def test_almacen_sincroniza_altas_y_bajas(cursos_mock):
+    """Prueba que el índice siga a 'append' y a 'eliminar_curso'."""
+    almacen = cursos.crear_almacen_cursos(cursos_mock)
+    nuevo = cursos.crear_curso(almacen, "Redes", 3)
+    almacen.append(nuevo)
+
+    assert cursos.buscar_curso_por_id(almacen, "C004") is nuevo
+    assert cursos.eliminar_curso(almacen, "C001") is True
+    assert cursos.buscar_curso_por_id(almacen, "C001") is None
+    assert len(almacen) == 3
+
+
+def test_almacen_claves_repetidas(carreras_mock):
+    """Prueba que ante IDs repetidos se comporte como la búsqueda lineal."""
+    repetida = {"id_carrera": "CAR001", "nombre_carrera": "Duplicada"}
+    almacen = carreras.crear_almacen_carreras(carreras_mock + [repetida])
+
+    assert carreras.buscar_carrera_por_id(almacen, "CAR001") is carreras_mock[0]
+    almacen.remove(carreras_mock[0])
+    assert carreras.buscar_carrera_por_id(almacen, "CAR001") is repetida
+
+    # Quitar la copia repetida deja el índice como está; después la clave desaparece
+    otra = {"id_carrera": "CAR001", "nombre_carrera": "Otra"}
+    almacen.append(otra)
+    almacen.remove(otra)
+    assert carreras.buscar_carrera_por_id(almacen, "CAR001") is repetida
+    assert carreras.eliminar_carrera(almacen, "CAR001") is True
+    assert carreras.buscar_carrera_por_id(almacen, "CAR001") is None
+
+
+def test_almacen_copia_conserva_indice(estudiantes_mock):
+    """Prueba que una copia (pickle) del Almacen conserve el índice."""
+    almacen = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+    copia = pickle.loads(pickle.dumps(almacen))
+
+    assert copia == almacen
+    assert estudiantes.buscar_estudiante_por_id(copia, "E001")["nombre"] == "Santiago Espitia"
+
+
+# --- Pruebas de los Índices Invertidos de Matrículas ---
+
+def test_indices_matriculas_igual_que_listas(matriculas_mock, cursos_mock, estudiantes_mock):
+    """Prueba que las consultas con AlmacenMatriculas den lo mismo que con listas."""
+    almacen = matriculas.crear_almacen_matriculas(matriculas_mock)
+
+    for id_est in ("E001", "E002", "E999"):
+        assert (matriculas.obtener_cursos_por_estudiante(id_est, almacen, cursos_mock)
+                == matriculas.obtener_cursos_por_estudiante(id_est, matriculas_mock, cursos_mock))
+        assert (matriculas.calcular_total_creditos(id_est, almacen, cursos_mock)
+                == matriculas.calcular_total_creditos(id_est, matriculas_mock, cursos_mock))
+    for id_cur in ("C001", "C002", "C999"):
+        assert (matriculas.obtener_estudiantes_por_curso(id_cur, almacen, estudiantes_mock)
+                == matriculas.obtener_estudiantes_por_curso(id_cur, matriculas_mock, estudiantes_mock))
+        assert almacen.matriculas_de_curso(id_cur) == [m for m in matriculas_mock if id_cur in m["id_cursos"]]
+
+
+def test_indices_matriculas_se_actualizan_al_matricular(matriculas_mock, cursos_mock, estudiantes_mock):
+    """Prueba que una matrícula nueva aparezca en ambos índices."""
+    almacen = matriculas.crear_almacen_matriculas(matriculas_mock)
+    almacen.append(matriculas.matricular_estudiante(almacen, "E002", ["C001"], "2025-02"))
+
+    ids_est = {e["id_estudiante"] for e in matriculas.obtener_estudiantes_por_curso("C001", almacen, estudiantes_mock)}
+    assert ids_est == {"E001", "E002"}
+    # La matrícula más reciente de E002 solo tiene C001 (3 créditos)
+    assert matriculas.calcular_total_creditos("E002", almacen, cursos_mock) == 3
+
+
+def test_indices_matriculas_al_eliminar(matriculas_mock):
+    """Prueba que al quitar una matrícula el estudiante salga del curso."""
+    almacen = matriculas.crear_almacen_matriculas(matriculas_mock)
+    almacen.remove(matriculas_mock[0])
+
+    assert almacen.ids_estudiantes_de_curso("C001") == []
+    assert almacen.ids_estudiantes_de_curso("C002") == ["E002"]
+    assert almacen.matriculas_de_estudiante("E001") == []
+
+
+# --- Pruebas de la Marca de Agua de IDs ---
+
+def test_generar_id_con_almacen(estudiantes_mock, matriculas_mock):
+    """Prueba que el Almacen genere los mismos formatos de ID que la lista."""
+    assert estudiantes._generar_nuevo_id_estudiante(estudiantes.crear_almacen_estudiantes(estudiantes_mock)) == "E003"
+    assert matriculas._generar_nuevo_id_matricula(matriculas.crear_almacen_matriculas(matriculas_mock)) == "M0003"
+    assert carreras._generar_nuevo_id_carrera(carreras.crear_almacen_carreras()) == "CAR001"
+
+
+def test_marca_de_agua_no_reutiliza_ids(cursos_mock):
+    """Prueba que eliminar el último curso no libere su ID."""
+    almacen = cursos.crear_almacen_cursos(cursos_mock)
+    cursos.eliminar_curso(almacen, "C003")
+
+    assert cursos._generar_nuevo_id_curso(almacen) == "C004"
+
+
+def test_reservar_bloque_de_ids(estudiantes_mock):
+    """Prueba que un bloque reservado sea consecutivo y no se vuelva a entregar."""
+    almacen = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+
+    assert almacen.reservar_ids(3) == ["E003", "E004", "E005"]
+    assert almacen.proximo_id() == "E006"
+    assert pickle.loads(pickle.dumps(almacen)).proximo_id() == "E006"
+
+
+def test_normalizar_nombre():
+    """Prueba que se eliminen tildes, mayúsculas y espacios sobrantes."""
+    assert normalizar_nombre("  José   PÉREZ ") == "jose perez"
+    assert normalizar_nombre("Ñandú") == "nandu"
+
+
+# --- Pruebas de los Registros con __slots__ ---
+
+def test_registro_se_usa_como_diccionario():
+    """Prueba el acceso tipo diccionario de los registros."""
+    curso = Curso(id_curso="C001", nombre_curso="Redes", creditos=3)
+
+    assert curso["nombre_curso"] == "Redes"
+    assert curso.get("creditos", 0) == 3
+    assert curso.get("inexistente") is None
+    assert "creditos" in curso
+    assert dict(curso) == {"id_curso": "C001", "nombre_curso": "Redes", "creditos": 3, "prerrequisitos": []}
+    assert curso == {"id_curso": "C001", "nombre_curso": "Redes", "creditos": 3, "prerrequisitos": []}
+    assert curso == curso.copy() and curso != Curso(id_curso="C002", nombre_curso="Redes", creditos=3)
+    assert curso != {"id_curso": "C001", "nombre_curso": "Redes", "creditos": 3}
+
+    curso["creditos"] = 4
+    assert curso.creditos == 4
+    with pytest.raises(KeyError):
+        curso["profesor"] = "X"
+
+
+def test_registro_no_tiene_dict():
+    """Prueba que los registros no lleven un __dict__ por instancia."""
+    estudiante = Estudiante("E001", "Ana", "CAR001")
+
+    assert not hasattr(estudiante, "__dict__")
+    assert pickle.loads(pickle.dumps(estudiante)) == estudiante
+
+
+def test_cargar_devuelve_registros(tmp_path, monkeypatch, cursos_mock, matriculas_mock):
+    """Prueba que los archivos se carguen como registros y se guarden igual que antes."""
+    monkeypatch.setattr(cursos, "FILE_PATH", str(tmp_path / "cursos.csv"))
+    monkeypatch.setattr(matriculas, "FILE_PATH", str(tmp_path / "matriculas.json"))
+    monkeypatch.setattr(matriculas, "JOURNAL_PATH", str(tmp_path / "matriculas.jsonl"))
+    monkeypatch.setattr(matriculas, "PERIODOS_DIR", str(tmp_path / "periodos"))
+    cursos.guardar_cursos(cursos_mock)
+    matriculas.guardar_matriculas(matriculas_mock)
+
+    cargados = cursos.cargar_cursos()
+    assert all(isinstance(c, Curso) for c in cargados)
+    assert cargados == cursos_mock
+
+    cargadas = matriculas.cargar_matriculas()
+    assert all(isinstance(m, Matricula) for m in cargadas)
+    matriculas.guardar_matriculas(cargadas)
+    with open(tmp_path / "periodos" / "2025-01.json", encoding="utf-8") as file:
+        assert json.load(file) == matriculas_mock
+
+
+# --- Pruebas del Almacén Columnar de Matrículas ---
+
+def test_almacen_matriculas_columnar(matriculas_mock):
+    """Prueba que las columnas internen los IDs repetidos y que las filas se lean igual."""
+    almacen = matriculas.crear_almacen_matriculas(matriculas_mock)
+
+    assert almacen == matriculas_mock
+    assert almacen[-1] == matriculas_mock[-1]
+    assert list(almacen.offsets) == [0, 2, 4]
+    # "C002" y "2025-01" se guardan una sola vez
+    assert len(almacen.cursos) == 3
+    assert len(almacen.periodos) == 1
+    assert almacen.buscar("M0002")["id_cursos"] == ["C002", "C003"]
+    assert almacen.buscar("M0009") is None
+
+
+def test_almacen_matriculas_ids_no_estandar(matriculas_mock):
+    """Prueba que los IDs fuera de formato y desordenados se sigan encontrando."""
+    almacen = matriculas.crear_almacen_matriculas(reversed(matriculas_mock))
+    almacen.append(dict(matriculas_mock[0], id_matricula="MIGRADA-7"))
+
+    assert almacen.buscar("M0001")["id_estudiante"] == "E001"
+    assert almacen.buscar("MIGRADA-7")["id_cursos"] == ["C001", "C002"]
+    assert almacen.proximo_id() == "M0003"
+
+    copia = pickle.loads(pickle.dumps(almacen))
+    assert copia == almacen
+    assert copia.total_matriculas_de_curso("C002") == 3
+
+
+# --- Pruebas de la Partición por Periodo ---
+
+def test_particiones_por_periodo(rutas_matriculas, matriculas_mock):
+    """Prueba que cada periodo se guarde aparte y se pueda cargar solo."""
+    anterior = dict(matriculas_mock[0], id_matricula="M0003", periodo_academico="2024-02")
+    matriculas.guardar_matriculas(matriculas_mock + [anterior])
+
+    catalogo = matriculas.cargar_catalogo()
+    assert catalogo["periodos"]["2025-01"]["matriculas"] == 2
+    assert catalogo["ultima_por_estudiante"]["E001"] == "2025-01"
+    assert matriculas.periodo_actual() == "2025-01"
+
+    solo_anterior = matriculas.cargar_matriculas(["2024-02"])
+    assert [m["id_matricula"] for m in solo_anterior] == ["M0003"]
+    # El periodo anterior se carga primero
+    assert [m["id_matricula"] for m in matriculas.cargar_matriculas()] == ["M0003", "M0001", "M0002"]
+
+    # Si el archivo de un periodo que se quita ya no está, el catálogo igual se actualiza
+    (rutas_matriculas / "periodos" / "2024-02.json").unlink()
+    matriculas.guardar_matriculas(matriculas_mock)
+    assert list(matriculas.cargar_catalogo()["periodos"]) == ["2025-01"]
+
+
+def test_compactar_solo_reescribe_periodos_del_journal(rutas_matriculas, matriculas_mock):
+    """Prueba que la compactación no toque los periodos cerrados."""
+    anterior = dict(matriculas_mock[0], id_matricula="M0003", periodo_academico="2024-02")
+    matriculas.guardar_matriculas([anterior])
+    archivo_anterior = rutas_matriculas / "periodos" / "2024-02.json"
+    archivo_anterior.write_text(archivo_anterior.read_text() + "\n")
+    marca = archivo_anterior.stat().st_mtime_ns
+
+    lista = matriculas.cargar_matriculas()
+    for matricula in matriculas_mock:
+        lista.append(matricula)
+        matriculas.registrar_matricula(matricula)
+    assert matriculas.periodo_ultima_matricula("E002") == "2025-01"
+
+    assert matriculas.compactar_matriculas(lista) is True
+    assert archivo_anterior.stat().st_mtime_ns == marca
+    assert len(matriculas.cargar_matriculas(["2025-01"])) == 2
+    assert matriculas.cargar_catalogo()["ultima_por_estudiante"]["E001"] == "2025-01"
+
+
+def test_escritura_atomica_conserva_original(tmp_path):
+    """Prueba que un error a mitad de la escritura no trunque el archivo."""
+    ruta = tmp_path / "cursos.csv"
+    ruta.write_text("original", encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with escritura_atomica(str(ruta), encoding="utf-8") as file:
+            file.write("a medias")
+            raise RuntimeError("corte")
+
+    assert ruta.read_text(encoding="utf-8") == "original"
+    assert list(tmp_path.iterdir()) == [ruta]
+
+
+def test_tabla_fija_actualiza_en_su_lugar(tmp_path, cursos_mock):
+    """Prueba que la tabla de ancho fijo modifique un curso sin cambiar el tamaño del archivo."""
+    ruta = str(tmp_path / "cursos.dat")
+    tabla_fija.escribir_tabla(ruta, cursos.CAMPOS_FIJOS, cursos_mock)
+    tamano = (tmp_path / "cursos.dat").stat().st_size
+
+    tabla = tabla_fija.TablaFija(ruta, cursos.CAMPOS_FIJOS)
+    # La tabla guarda las listas como texto (C001;C002)
+    assert tabla.buscar("C002") == {**cursos_mock[1], "prerrequisitos": ""}
+    assert tabla.actualizar({"id_curso": "C002", "nombre_curso": "Bases de Datos II", "creditos": 5})
+    assert tabla.eliminar("C001")
+    with pytest.raises(ValueError):
+        tabla.actualizar({"id_curso": "C003", "nombre_curso": "x" * 100, "creditos": 2})
+    tabla.cerrar()
+
+    assert (tmp_path / "cursos.dat").stat().st_size == tamano
+    tabla = tabla_fija.TablaFija(ruta, cursos.CAMPOS_FIJOS)
+    assert list(tabla.valores()) == [("C002", "Bases de Datos II", 5, ""), ("C003", "Algebra Lineal", 2, "")]
+    tabla.agregar({"id_curso": "C004", "nombre_curso": "Física", "creditos": 3})
+    assert tabla.buscar("C004")["nombre_curso"] == "Física"
+    tabla.cerrar()
+
+
+def test_analitica_coincide_con_consultas_individuales(cursos_mock, estudiantes_mock, matriculas_mock):
+    """Prueba que los reportes vectorizados den lo mismo que las funciones por estudiante."""
+    pytest.importorskip("numpy")
+    from gestion_matriculas import analitica
+
+    registros = matriculas_mock + [
+        {"id_matricula": "M0003", "id_estudiante": "E002", "id_cursos": ["C001", "C002", "C999"],
+         "periodo_academico": "2025-01"},
+    ]
+    for matriculas_db in (registros, matriculas.crear_almacen_matriculas(registros)):
+        tablas = analitica.construir_tablas(matriculas_db, cursos_mock)
+
+        # Solo cuenta la última matrícula de E002 en 2025-01
+        cargas = {f["id_estudiante"]: f["creditos"] for f in analitica.estudiantes_sobrecargados(tablas, "2025-01", 0)}
+        assert cargas == matriculas.creditos_por_estudiante("2025-01", registros, cursos_mock) == {"E001": 7, "E002": 7}
+        assert analitica.inscritos_por_curso(tablas, "2025-01") == {"C001": 2, "C002": 2, "C999": 1}
+        assert analitica.matriz_incidencia(tablas, "2025-01").sum() == 5
+
+        carga = analitica.carga_por_carrera(tablas, estudiantes_mock, "2025-01")
+        assert carga["CAR001"]["estudiantes"] == 2 and carga["CAR001"]["mediana"] == 7
+        tendencia = analitica.tendencia_por_periodo(tablas)
+        assert [(t["periodo"], t["estudiantes"], t["creditos"]) for t in tendencia] == [("2025-01", 2, 14)]
+
+
+def test_comatriculas_incrementales_coinciden_con_reconstruir(matriculas_mock):
+    """Prueba que los conteos incrementales den lo mismo que reconstruirlos, y el orden del top-K."""
+    almacen = matriculas.crear_almacen_matriculas(matriculas_mock)
+    assert almacen.comatriculas().mas_frecuentes("C002") == [("C001", 1), ("C003", 1)]
+
+    nuevas = [
+        {"id_matricula": "M0003", "id_estudiante": "E003", "id_cursos": ["C002", "C003"], "periodo_academico": "2025-01"},
+        # E001 se matricula de nuevo: su matrícula anterior deja de contar
+        {"id_matricula": "M0004", "id_estudiante": "E001", "id_cursos": ["C003", "C004"], "periodo_academico": "2025-01"},
+        {"id_matricula": "M0005", "id_estudiante": "E001", "id_cursos": ["C001", "C002"], "periodo_academico": "2025-02"},
+    ]
+    for matricula in nuevas:
+        almacen.append(matricula)
+
+    incremental = almacen.comatriculas()
+    assert incremental.mas_frecuentes("C002", "2025-01") == [("C003", 2)]
+    assert incremental.conteo("C001", "C002") == 1
+    assert incremental.mas_frecuentes("C003", k=1) == [("C002", 2)]
+    reconstruida = comatriculas.construir_comatriculas(matriculas_mock + nuevas)
+    for id_curso in ("C001", "C002", "C003", "C004"):
+        assert incremental.vecinos(id_curso) == reconstruida.vecinos(id_curso)
+
+    # Al quitar la última matrícula los conteos se vuelven a armar
+    almacen.remove(almacen[-1])
+    assert almacen.comatriculas().conteo("C001", "C002") == 0
+    assert matriculas.obtener_comatriculas(list(almacen)).periodos() == ["2025-01"]
+
+
+def test_horario_examenes_sin_choques(matriculas_mock):
+    """Prueba que DSATUR no ponga en la misma franja dos cursos con estudiantes en común."""
+    # Un ciclo de 5 cursos necesita 3 franjas; un curso suelto va a la primera
+    ciclo = ["C001", "C002", "C003", "C004", "C005"]
+    nuevas = [
+        {"id_matricula": f"M{i + 10:04d}", "id_estudiante": f"E{i + 10:03d}",
+         "id_cursos": [ciclo[i], ciclo[(i + 1) % 5]], "periodo_academico": "2025-02"}
+        for i in range(5)
+    ]
+    nuevas.append({"id_matricula": "M0020", "id_estudiante": "E020", "id_cursos": ["C009"], "periodo_academico": "2025-02"})
+    conteos = comatriculas.construir_comatriculas(matriculas_mock + nuevas)
+
+    horario = examenes.generar_horario(conteos, "2025-02", franjas_por_dia=1, max_por_dia=1)
+    franja = horario["franja_de_curso"]
+    assert horario["franjas"] == 3
+    assert franja["C009"] == 0
+    for matricula in nuevas:
+        cursos = matricula["id_cursos"]
+        assert len({franja[c] for c in cursos}) == len(cursos)
+    # Con una franja por día cada estudiante del ciclo rinde un examen por día
+    assert horario["sobrecargados"] == []
+
+    # Con dos franjas por día, quien tenga sus dos exámenes el mismo día aparece en el reporte
+    por_dia = examenes.generar_horario(conteos, "2025-02", franjas_por_dia=2, max_por_dia=1)
+    esperados = sorted(m["id_estudiante"] for m in nuevas
+                       if len({franja[c] // 2 for c in m["id_cursos"]}) < len(m["id_cursos"]))
+    assert sorted(f["id_estudiante"] for f in por_dia["sobrecargados"]) == esperados
+    assert examenes.generar_horario(conteos, "2024-01")["franjas"] == 0
+
+
+def test_cierre_prerrequisitos_transitivo_y_ciclos():
+    """Prueba el cierre transitivo, la detección de ciclos y que la actualización incremental coincida."""
+    cierre = prerrequisitos.CierrePrerrequisitos(Internador())
+    cierre.establecer("C002", ["C001"])
+    cierre.establecer("C003", ["C002"])
+    assert cierre.ids(cierre.requeridos("C003")) == ["C001", "C002"]
+    assert cierre.ciclo_al_establecer("C001", ["C003"]) == "C003"
+    assert cierre.ciclo_al_establecer("C001", ["C001"]) == "C001"
+    with pytest.raises(ValueError):
+        cierre.establecer("C001", ["C003"])
+
+    # Agregar un prerrequisito a C001 llega hasta C003 sin recalcular todo
+    cierre.establecer("C001", ["C000"])
+    assert cierre.ids(cierre.requeridos("C003")) == ["C000", "C001", "C002"]
+    incremental = {c: cierre.requeridos(c) for c in ("C001", "C002", "C003")}
+    assert cierre.recalcular() == []
+    assert {c: cierre.requeridos(c) for c in ("C001", "C002", "C003")} == incremental
+
+    # Quitarlo sí recalcula
+    cierre.establecer("C002", [])
+    assert cierre.ids(cierre.requeridos("C003")) == ["C002"]
+    assert cierre.faltantes("C003", cierre.bits(["C002"])) == []
+    assert cierre.dependientes("C002") == ["C003"] and cierre.dependientes("C001") == []
+
+    # Las consultas no registran códigos para IDs desconocidos
+    codigos = len(cierre.codigos)
+    assert cierre.bits(["C999"]) == 0
+    assert cierre.ciclo_al_establecer("C998", ["C003"]) is None
+    assert len(cierre.codigos) == codigos
+
+    # Un ciclo en los datos cargados no se exige
+    en_ciclo = [{"id_curso": "C001", "prerrequisitos": ["C002"]}, {"id_curso": "C002", "prerrequisitos": ["C001"]}]
+    assert prerrequisitos.construir_cierre(en_ciclo).requeridos("C001") == 0
+
+
+def test_prerrequisitos_faltantes(matriculas_mock, cursos_mock):
+    """Prueba que solo cuenten los cursos de periodos anteriores, con almacén y con lista."""
+    cursos_mock[2]["prerrequisitos"] = ["C002"]
+    cursos_mock[1]["prerrequisitos"] = ["C001"]
+    lista_cur = Almacen(cursos_mock, "id_curso")
+    almacen = matriculas.crear_almacen_matriculas(matriculas_mock)
+
+    for matriculas_db in (matriculas_mock, almacen):
+        # E001 tomó C001 y C002 en 2025-01: no cuenta para el mismo periodo
+        assert matriculas.prerrequisitos_faltantes(matriculas_db, lista_cur, "E001", ["C003"], "2025-01") == {
+            "C003": ["C001", "C002"]}
+        assert matriculas.prerrequisitos_faltantes(matriculas_db, lista_cur, "E001", ["C001", "C003"], "2025-02") == {}
+        # E002 tomó C002 sin C001
+        assert matriculas.prerrequisitos_faltantes(matriculas_db, lista_cur, "E002", ["C003"], "2025-02") == {
+            "C003": ["C001"]}
+
+    # El historial se actualiza con cada matrícula y el cierre con cada cambio de cursos
+    almacen.append({"id_matricula": "M0003", "id_estudiante": "E002", "id_cursos": ["C001"],
+                    "periodo_academico": "2025-02"})
+    assert matriculas.prerrequisitos_faltantes(almacen, lista_cur, "E002", ["C003"], "2025-03") == {}
+    with lista_cur.editando(lista_cur[2]) as curso:
+        curso["prerrequisitos"] = ["C002", "C004"]
+    assert matriculas.prerrequisitos_faltantes(almacen, lista_cur, "E002", ["C003"], "2025-03") == {"C003": ["C004"]}
+
+    # Con una lista de matrículas normal el cierre se guarda por lista de cursos
+    cierre = matriculas.obtener_cierre_prerrequisitos(matriculas_mock, lista_cur)
+    assert matriculas.obtener_cierre_prerrequisitos(matriculas_mock, lista_cur) is cierre
+    with lista_cur.editando(lista_cur[0]):
+        pass
+    assert matriculas.obtener_cierre_prerrequisitos(matriculas_mock, lista_cur) is not cierre
+
+
+def test_migracion_columna_prerrequisitos(tmp_path, cursos_mock):
+    """Prueba que el CSV y la tabla fija escritos sin la columna nueva se conviertan al anexar o abrir."""
+    assert Curso(id_curso="C004", nombre_curso="X", creditos=3, prerrequisitos="C001;C002")[
+        "prerrequisitos"] == ["C001", "C002"]
+
+    ruta_csv = tmp_path / "cursos.csv"
+    ruta_csv.write_text("id_curso,nombre_curso,creditos\nC001,Programacion Basica,3\n", encoding="utf-8")
+    bitacora.anexar_filas(str(ruta_csv), cursos.FILE_HEADERS,
+                          [{"id_curso": "C002", "nombre_curso": "Bases de Datos", "creditos": 4, "prerrequisitos": ["C001"]}])
+    assert ruta_csv.read_text(encoding="utf-8").splitlines() == [
+        "id_curso,nombre_curso,creditos,prerrequisitos",
+        "C001,Programacion Basica,3,",
+        "C002,Bases de Datos,4,C001",
+    ]
+
+    ruta = str(tmp_path / "cursos.dat")
+    tabla_fija.escribir_tabla(ruta, cursos.CAMPOS_FIJOS[:3], cursos_mock)
+    with pytest.raises(ValueError):
+        tabla_fija.TablaFija(ruta, cursos.CAMPOS_FIJOS)
+    assert tabla_fija.migrar_tabla(ruta, cursos.CAMPOS_FIJOS)
+    assert not tabla_fija.migrar_tabla(ruta, cursos.CAMPOS_FIJOS)
+    tabla = tabla_fija.TablaFija(ruta, cursos.CAMPOS_FIJOS)
+    assert tabla.buscar("C003") == {**cursos_mock[2], "prerrequisitos": ""}
+    tabla.cerrar()
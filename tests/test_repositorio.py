@@ -0,0 +1,523 @@
+"""
+Pruebas para la Capa de Persistencia (repositorio.py)
+
+Estas pruebas validan que ambos backends (archivos y SQLite)
+guarden y recuperen los mismos datos, y que la migración desde
+los archivos de 'data/' copie todas las entidades.
+"""
+import os
+import sqlite3
+import pytest
+from gestion_matriculas import repositorio, estudiantes, cursos, carreras, matriculas, bitacora
+
+
+@pytest.fixture
+def rutas_archivos(tmp_path, monkeypatch):
+    """Redirige los archivos CSV/JSON de todas las entidades a un directorio temporal."""
+    monkeypatch.setattr(estudiantes, "FILE_PATH", str(tmp_path / "estudiantes.csv"))
+    monkeypatch.setattr(cursos, "FILE_PATH", str(tmp_path / "cursos.csv"))
+    monkeypatch.setattr(carreras, "FILE_PATH", str(tmp_path / "carreras.csv"))
+    monkeypatch.setattr(cursos, "TABLA_PATH", str(tmp_path / "cursos.dat"))
+    monkeypatch.setattr(carreras, "TABLA_PATH", str(tmp_path / "carreras.dat"))
+    monkeypatch.setattr(matriculas, "FILE_PATH", str(tmp_path / "matriculas.json"))
+    monkeypatch.setattr(matriculas, "JOURNAL_PATH", str(tmp_path / "matriculas.jsonl"))
+    monkeypatch.setattr(matriculas, "PERIODOS_DIR", str(tmp_path / "periodos"))
+    monkeypatch.setattr(repositorio, "SECUENCIAS_PATH", str(tmp_path / "secuencias.json"))
+    monkeypatch.setattr(repositorio, "CACHE_PATH", str(tmp_path / "cache.pickle"))
+    monkeypatch.setattr(repositorio, "BLOQUEO_PATH", str(tmp_path / ".bloqueo"))
+    return tmp_path
+
+
+@pytest.fixture
+def repo_sqlite(tmp_path):
+    """Fixture que provee un repositorio SQLite vacío."""
+    repo = repositorio.RepositorioSQLite(str(tmp_path / "prueba.db"))
+    yield repo
+    repo.cerrar()
+
+
+def test_sqlite_guardar_y_cargar(repo_sqlite, cursos_mock, matriculas_mock):
+    """Prueba que los registros vuelvan tal como se guardaron y en el mismo orden."""
+    repo_sqlite.guardar("cursos", cursos_mock)
+    repo_sqlite.guardar("matriculas", matriculas_mock)
+
+    assert repo_sqlite.cargar("cursos") == cursos_mock
+    assert repo_sqlite.cargar("matriculas") == matriculas_mock
+
+
+def test_sqlite_operaciones_de_una_fila(repo_sqlite, estudiantes_mock):
+    """Prueba insertar, actualizar y eliminar un solo estudiante."""
+    repo_sqlite.guardar("estudiantes", estudiantes_mock)
+
+    repo_sqlite.insertar("estudiantes", {"id_estudiante": "E003", "nombre": "Nuevo", "id_carrera": "CAR002"})
+    repo_sqlite.actualizar("estudiantes", {"id_estudiante": "E001", "nombre": "Santiago R.", "id_carrera": "CAR001"})
+    repo_sqlite.eliminar("estudiantes", "E002")
+
+    cargados = repo_sqlite.cargar("estudiantes")
+    assert [e["id_estudiante"] for e in cargados] == ["E001", "E003"]
+    assert cargados[0]["nombre"] == "Santiago R."
+
+
+def test_sqlite_matriculas_por_estudiante_y_curso(repo_sqlite, matriculas_mock):
+    """Prueba las consultas indexadas de matrículas."""
+    repo_sqlite.guardar("matriculas", matriculas_mock)
+
+    por_estudiante = repo_sqlite.matriculas_por_estudiante("E002")
+    assert [m["id_matricula"] for m in por_estudiante] == ["M0002"]
+    assert por_estudiante[0]["id_cursos"] == ["C002", "C003"]
+
+    por_curso = repo_sqlite.matriculas_por_curso("C002")
+    assert {m["id_matricula"] for m in por_curso} == {"M0001", "M0002"}
+
+
+def test_archivos_insertar_matricula_usa_journal(rutas_archivos, matriculas_mock):
+    """Prueba que el backend de archivos añada las matrículas al journal."""
+    repo = repositorio.RepositorioArchivos()
+    lista_mat = repo.cargar("matriculas")
+    lista_mat.append(matriculas_mock[0])
+    repo.insertar("matriculas", matriculas_mock[0])
+
+    assert (rutas_archivos / "matriculas.jsonl").exists()
+    assert not (rutas_archivos / "matriculas.json").exists()
+    assert repo.cargar("matriculas") == [matriculas_mock[0]]
+
+
+def test_migrar_archivos_a_sqlite(rutas_archivos, estudiantes_mock, cursos_mock, carreras_mock, matriculas_mock):
+    """Prueba que la migración copie las cuatro entidades."""
+    estudiantes.guardar_estudiantes(estudiantes_mock)
+    cursos.guardar_cursos(cursos_mock)
+    carreras.guardar_carreras(carreras_mock)
+    matriculas.guardar_matriculas(matriculas_mock)
+
+    ruta_db = str(rutas_archivos / "migrado.db")
+    totales = repositorio.migrar_archivos_a_sqlite(ruta_db)
+    assert totales == {"estudiantes": 2, "cursos": 3, "carreras": 2, "matriculas": 2}
+
+    repo = repositorio.RepositorioSQLite(ruta_db)
+    assert repo.cargar("cursos") == cursos_mock
+    assert repo.cargar("matriculas") == matriculas_mock
+    repo.cerrar()
+
+
+def test_crear_repositorio_desconocido():
+    """Prueba que un backend desconocido se rechace."""
+    with pytest.raises(ValueError):
+        repositorio.crear_repositorio("excel")
+
+
+def test_sqlite_persiste_marca_de_agua(tmp_path, estudiantes_mock):
+    """Prueba que un ID eliminado no se reutilice tras reabrir la base."""
+    ruta_db = str(tmp_path / "ids.db")
+    repo = repositorio.RepositorioSQLite(ruta_db)
+    repo.guardar("estudiantes", estudiantes.crear_almacen_estudiantes(estudiantes_mock))
+    lista_est = repo.cargar("estudiantes")
+    estudiantes.eliminar_estudiante(lista_est, "E002")
+    repo.eliminar("estudiantes", "E002")
+    repo.cerrar()
+
+    repo = repositorio.RepositorioSQLite(ruta_db)
+    assert estudiantes._generar_nuevo_id_estudiante(repo.cargar("estudiantes")) == "E003"
+    repo.cerrar()
+
+
+def test_archivos_persiste_marca_de_agua(rutas_archivos, cursos_mock):
+    """Prueba que el backend de archivos guarde la marca en secuencias.json."""
+    repo = repositorio.RepositorioArchivos()
+    repo.guardar("cursos", cursos.crear_almacen_cursos(cursos_mock))
+    lista_cur = repo.cargar("cursos")
+    cursos.eliminar_curso(lista_cur, "C003")
+    repo.eliminar("cursos", "C003")
+
+    assert cursos._generar_nuevo_id_curso(repositorio.RepositorioArchivos().cargar("cursos")) == "C004"
+
+
+def test_sqlite_matriculas_por_periodo(repo_sqlite, matriculas_mock):
+    """Prueba la consulta indexada por periodo académico."""
+    repo_sqlite.guardar("matriculas", matriculas_mock)
+
+    assert len(repo_sqlite.matriculas_por_periodo("2025-01")) == 2
+    assert repo_sqlite.matriculas_por_periodo("2024-02") == []
+
+
+def test_archivos_cargar_todo_en_paralelo(rutas_archivos, estudiantes_mock, cursos_mock, carreras_mock, matriculas_mock):
+    """Prueba que la carga en paralelo dé lo mismo que la secuencial y mida cada archivo."""
+    estudiantes.guardar_estudiantes(estudiantes_mock)
+    cursos.guardar_cursos(cursos_mock)
+    carreras.guardar_carreras(carreras_mock)
+    matriculas.guardar_matriculas(matriculas_mock)
+
+    repo = repositorio.RepositorioArchivos()
+    datos, tiempos = repo.cargar_todo(modo="hilos", usar_cache=False)
+    secuencial, _ = repo.cargar_todo(modo="secuencial", usar_cache=False)
+
+    assert datos == secuencial
+    assert datos["matriculas"] == matriculas_mock
+    assert set(tiempos) == set(repositorio.ENTIDADES)
+    assert estudiantes._generar_nuevo_id_estudiante(datos["estudiantes"]) == "E003"
+    with pytest.raises(ValueError):
+        repo.cargar_todo(modo="turbo")
+
+
+def test_archivos_cache_de_arranque(rutas_archivos, estudiantes_mock, cursos_mock, carreras_mock, matriculas_mock):
+    """Prueba que la imagen binaria se use mientras los archivos no cambien."""
+    estudiantes.guardar_estudiantes(estudiantes_mock)
+    cursos.guardar_cursos(cursos_mock)
+    carreras.guardar_carreras(carreras_mock)
+    matriculas.guardar_matriculas(matriculas_mock)
+
+    frio, tiempos = repositorio.RepositorioArchivos().cargar_todo(modo="secuencial")
+    assert "cache" not in tiempos
+    caliente, tiempos = repositorio.RepositorioArchivos().cargar_todo()
+    assert set(tiempos) == {"cache"}
+    assert caliente == frio
+    assert estudiantes.buscar_estudiante_por_id(caliente["estudiantes"], "E002")["nombre"] == "Mayerly"
+
+    # Un archivo modificado invalida la imagen
+    cursos.guardar_cursos(cursos_mock[:1])
+    datos, tiempos = repositorio.RepositorioArchivos().cargar_todo(modo="secuencial")
+    assert "cache" not in tiempos
+    assert len(datos["cursos"]) == 1
+
+    # Una imagen que otros usuarios pueden modificar no se carga
+    ruta_cache = rutas_archivos / "cache.pickle"
+    assert ruta_cache.stat().st_mode & 0o077 == 0
+    if hasattr(os, "getuid"):
+        ruta_cache.chmod(0o666)
+        _, tiempos = repositorio.RepositorioArchivos().cargar_todo()
+        assert "cache" not in tiempos
+
+
+def test_cache_por_defecto_fuera_de_data(monkeypatch, tmp_path):
+    """Prueba que la imagen binaria vaya a la caché del usuario y no a la carpeta de datos."""
+    monkeypatch.setattr(repositorio, "CACHE_PATH", None)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    ruta = repositorio._ruta_cache()
+    assert ruta.startswith(str(tmp_path / "cache"))
+    monkeypatch.setattr(estudiantes, "FILE_PATH", str(tmp_path / "otra" / "estudiantes.csv"))
+    assert repositorio._ruta_cache() != ruta
+
+
+def test_archivos_inserta_sin_reescribir(rutas_archivos, estudiantes_mock, monkeypatch):
+    """Prueba que cada estudiante nuevo se añada como una fila sin reescribir el CSV."""
+    escrituras = []
+    escribir_original = estudiantes.escribir_estudiantes
+    monkeypatch.setitem(repositorio.RepositorioArchivos._ESCRITORES, "estudiantes",
+                        lambda registros: escrituras.append(len(registros)) or escribir_original(registros))
+
+    repo = repositorio.RepositorioArchivos()
+    lista_est = repo.cargar("estudiantes")
+    for nombre in ("Ana", "Luis", "Marta"):
+        lista_est.append(estudiantes.crear_estudiante(lista_est, nombre, "CAR001"))
+        repo.insertar("estudiantes", lista_est[-1])
+
+    assert repo.entidades_pendientes() == []
+    assert repo.sincronizar() == []
+    assert escrituras == []
+    assert [e["nombre"] for e in estudiantes.cargar_estudiantes()] == ["Ana", "Luis", "Marta"]
+
+
+def test_archivos_bitacora_de_cambios(rutas_archivos, cursos_mock):
+    """Prueba que actualizar y eliminar se anoten en la bitácora y se apliquen al cargar."""
+    cursos.guardar_cursos(cursos_mock)
+    tamano_csv = (rutas_archivos / "cursos.csv").stat().st_size
+    repo = repositorio.RepositorioArchivos()
+    lista_cur = repo.cargar("cursos")
+
+    curso = cursos.buscar_curso_por_id(lista_cur, "C001")
+    cursos.actualizar_curso(curso, "Programación I", 5)
+    repo.actualizar("cursos", curso)
+    cursos.eliminar_curso(lista_cur, "C002")
+    repo.eliminar("cursos", "C002")
+
+    assert (rutas_archivos / "cursos.csv").stat().st_size == tamano_csv
+    assert (rutas_archivos / "cursos_cambios.jsonl").stat().st_size > 0
+    recargados = cursos.cargar_cursos()
+    assert recargados == lista_cur
+    assert cursos.buscar_curso_por_id(recargados, "C001")["creditos"] == 5
+    assert not recargados.hay_cambios
+
+    # Al cerrar se reescribe el CSV y la bitácora queda vacía
+    repo.cerrar()
+    assert (rutas_archivos / "cursos_cambios.jsonl").stat().st_size == 0
+    assert cursos.cargar_cursos() == lista_cur
+
+
+def test_archivos_reescribe_al_crecer_la_bitacora(rutas_archivos, cursos_mock, monkeypatch):
+    """Prueba que el CSV se reescriba cuando la bitácora supera BITACORA_MAX_BYTES."""
+    monkeypatch.setattr(bitacora, "BITACORA_MAX_BYTES", 1)
+    cursos.guardar_cursos(cursos_mock)
+    repo = repositorio.RepositorioArchivos()
+    lista_cur = repo.cargar("cursos")
+
+    cursos.eliminar_curso(lista_cur, "C003")
+    repo.eliminar("cursos", "C003")
+
+    assert (rutas_archivos / "cursos_cambios.jsonl").stat().st_size == 0
+    assert [c["id_curso"] for c in cursos.cargar_cursos()] == ["C001", "C002"]
+
+
+def test_archivos_escribe_al_llegar_al_limite(rutas_archivos, matriculas_mock, monkeypatch):
+    """Prueba que los cambios sin bitácora se escriban al acumular GUARDADO_MAX_CAMBIOS."""
+    monkeypatch.setattr(repositorio, "GUARDADO_MAX_CAMBIOS", 2)
+    matriculas.guardar_matriculas(matriculas_mock)
+    repo = repositorio.RepositorioArchivos()
+    lista_mat = repo.cargar("matriculas")
+
+    del lista_mat[0]
+    repo.eliminar("matriculas", "M0001")
+    assert len(matriculas.cargar_matriculas()) == 2
+
+    del lista_mat[0]
+    repo.eliminar("matriculas", "M0002")
+    assert len(matriculas.cargar_matriculas()) == 0
+
+
+def test_archivos_escritura_en_segundo_plano(rutas_archivos, cursos_mock, monkeypatch):
+    """Prueba que el hilo escriba una copia de los datos y guarde los errores para después."""
+    repo = repositorio.RepositorioArchivos(segundo_plano=True)
+    lista_cur = repo.cargar("cursos")
+    lista_cur.extend(cursos.crear_almacen_cursos(cursos_mock))
+    nombre = lista_cur[0]["nombre_curso"]
+    repo.guardar("cursos", lista_cur)
+    lista_cur[0]["nombre_curso"] = "Cambiado después"
+
+    repo._escritor.esperar()
+    assert cursos.cargar_cursos()[0]["nombre_curso"] == nombre
+    assert repo.tomar_errores() == []
+
+    def fallar(registros):
+        raise IOError("disco lleno")
+    monkeypatch.setitem(repositorio.RepositorioArchivos._ESCRITORES, "cursos", fallar)
+    repo.guardar("cursos", lista_cur)
+    repo.cerrar()
+    assert repo.tomar_errores() == ["Error al guardar cursos: disco lleno"]
+    assert repo.tomar_errores() == []
+
+
+def test_archivos_catalogo_de_ancho_fijo(rutas_archivos, cursos_mock):
+    """Prueba que con el catálogo fijo los cambios se escriban en la tabla y el CSV al cerrar."""
+    cursos.guardar_cursos(cursos_mock)
+    repo = repositorio.RepositorioArchivos(catalogo_fijo=True)
+    lista_cur = repo.cargar("cursos")
+    assert lista_cur == cursos_mock
+    tamano = (rutas_archivos / "cursos.dat").stat().st_size
+
+    curso = cursos.buscar_curso_por_id(lista_cur, "C001")
+    cursos.actualizar_curso(curso, None, 6)
+    repo.actualizar("cursos", curso)
+    assert (rutas_archivos / "cursos.dat").stat().st_size == tamano
+    assert repositorio.RepositorioArchivos(catalogo_fijo=True).cargar("cursos") == lista_cur
+
+    # Un nombre que no cabe obliga a reescribir la tabla con un campo más ancho
+    cursos.actualizar_curso(curso, "Programación " * 10, None)
+    repo.actualizar("cursos", curso)
+    repo.cerrar()
+    assert repositorio.RepositorioArchivos(catalogo_fijo=True).cargar("cursos") == lista_cur
+    assert cursos.cargar_cursos() == lista_cur
+
+
+def test_compartido_incorpora_inserciones_y_reasigna_ids(rutas_archivos, estudiantes_mock, matriculas_mock):
+    """Prueba que dos terminales inserten a la vez sin pisarse los IDs."""
+    estudiantes.guardar_estudiantes(estudiantes_mock)
+    matriculas.guardar_matriculas(matriculas_mock)
+    repo_a = repositorio.RepositorioArchivos(compartido=True)
+    repo_b = repositorio.RepositorioArchivos(compartido=True)
+    est_a, mat_a = repo_a.cargar("estudiantes"), repo_a.cargar("matriculas")
+    est_b, mat_b = repo_b.cargar("estudiantes"), repo_b.cargar("matriculas")
+
+    est_a.append(estudiantes.crear_estudiante(est_a, "Ana", "CAR001"))
+    assert repo_a.insertar("estudiantes", est_a[-1]) == "E003"
+    est_b.append(estudiantes.crear_estudiante(est_b, "Luis", "CAR002"))
+    assert repo_b.insertar("estudiantes", est_b[-1]) == "E004"
+
+    assert [e["id_estudiante"] for e in est_b] == ["E001", "E002", "E003", "E004"]
+    assert est_b[-1]["nombre"] == "Luis"
+    assert "E004" in repo_b.tomar_errores()[0]
+    assert [e["nombre"] for e in estudiantes.cargar_estudiantes()] == ["Santiago Espitia", "Mayerly", "Ana", "Luis"]
+
+    mat_a.append(matriculas.matricular_estudiante(mat_a, "E001", ["C003"], "2025-02"))
+    repo_a.insertar("matriculas", mat_a[-1])
+    mat_b.append(matriculas.matricular_estudiante(mat_b, "E002", ["C001"], "2025-02"))
+    repo_b.insertar("matriculas", mat_b[-1])
+
+    ids = [m["id_matricula"] for m in matriculas.cargar_matriculas()]
+    assert sorted(ids) == ["M0001", "M0002", "M0003", "M0004"]
+    assert mat_b.buscar("M0003")["id_estudiante"] == "E001"
+    assert not est_b.hay_cambios
+
+
+def test_compartido_rechaza_conflictos(rutas_archivos, estudiantes_mock):
+    """Prueba que modificar un registro que otra terminal acaba de cambiar se rechace."""
+    estudiantes.guardar_estudiantes(estudiantes_mock)
+    repo_a = repositorio.RepositorioArchivos(compartido=True)
+    repo_b = repositorio.RepositorioArchivos(compartido=True)
+    est_a, est_b = repo_a.cargar("estudiantes"), repo_b.cargar("estudiantes")
+
+    with est_a.editando(est_a[0]):
+        est_a[0]["nombre"] = "Santiago A."
+    repo_a.actualizar("estudiantes", est_a[0])
+    with est_b.editando(est_b[0]):
+        est_b[0]["nombre"] = "Santiago B."
+    repo_b.actualizar("estudiantes", est_b[0])
+
+    assert est_b[0]["nombre"] == "Santiago A."
+    assert repo_b.tomar_errores()[0].startswith("Conflicto")
+    assert estudiantes.cargar_estudiantes()[0]["nombre"] == "Santiago A."
+
+    # Eliminar lo que otra terminal modificó también se rechaza y el registro vuelve
+    with est_a.editando(est_a[1]):
+        est_a[1]["nombre"] = "Mayerly A."
+    repo_a.actualizar("estudiantes", est_a[1])
+    estudiantes.eliminar_estudiante(est_b, "E002")
+    repo_b.eliminar("estudiantes", "E002")
+    assert estudiantes.buscar_estudiante_por_id(est_b, "E002")["nombre"] == "Mayerly A."
+    assert "E002" in repo_b.tomar_errores()[0]
+
+    # Sin conflicto, refrescar trae los cambios de la otra terminal
+    estudiantes.eliminar_estudiante(est_a, "E001")
+    repo_a.eliminar("estudiantes", "E001")
+    repo_b.refrescar()
+    assert [e["id_estudiante"] for e in est_b] == ["E002"]
+    assert repo_b.tomar_errores() == []
+
+
+def test_archivos_refrescar_incorpora_cambios_externos(rutas_archivos, estudiantes_mock, matriculas_mock):
+    """Prueba que refrescar aplique solo lo que otro proceso añadió, sin repetir lo propio."""
+    estudiantes.guardar_estudiantes(estudiantes_mock)
+    matriculas.guardar_matriculas(matriculas_mock)
+    repo = repositorio.RepositorioArchivos(segundo_plano=True)
+    datos, _ = repo.cargar_todo()
+    lista_est, lista_mat = datos["estudiantes"], datos["matriculas"]
+
+    lista_est.append(estudiantes.crear_estudiante(lista_est, "Ana", "CAR001"))
+    repo.insertar("estudiantes", lista_est[-1])
+    repo.refrescar()
+    assert len(lista_est) == 3
+
+    # Otro proceso (ej. un script) escribe directamente en 'data/'
+    externo = {"id_estudiante": "E004", "nombre": "Luis", "id_carrera": "CAR002"}
+    bitacora.anexar_fila(estudiantes.FILE_PATH, estudiantes.FILE_HEADERS, externo)
+    bitacora.anexar_linea(estudiantes.FILE_PATH, bitacora.linea_de_cambio(
+        "actualizar", "id_estudiante", {**lista_est[0], "nombre": "Santiago E."}))
+    matriculas.registrar_matricula({"id_matricula": "M0003", "id_estudiante": "E004",
+                                    "id_cursos": ["C001"], "periodo_academico": "2025-02"})
+    repo.refrescar()
+
+    assert estudiantes.buscar_estudiante_por_id(lista_est, "E004")["nombre"] == "Luis"
+    assert lista_est[0]["nombre"] == "Santiago E."
+    assert [m["id_matricula"] for m in repo.matriculas_por_estudiante("E004")] == ["M0003"]
+    assert not lista_est.hay_cambios and not lista_mat.hay_cambios
+    repo.cerrar()
+    assert [e["id_estudiante"] for e in estudiantes.cargar_estudiantes()] == ["E001", "E002", "E003", "E004"]
+
+
+def test_archivos_refrescar_descarta_totales_de_creditos(rutas_archivos, cursos_mock, matriculas_mock):
+    """Prueba que los créditos cambiados por otro proceso lleguen a los totales guardados."""
+    cursos.guardar_cursos(cursos_mock)
+    matriculas.guardar_matriculas(matriculas_mock)
+    repo = repositorio.RepositorioArchivos()
+    datos, _ = repo.cargar_todo()
+    lista_cur, lista_mat = datos["cursos"], datos["matriculas"]
+    assert matriculas.calcular_total_creditos("E001", lista_mat, lista_cur) == 7
+    assert matriculas.calcular_total_creditos("E002", lista_mat, lista_cur) == 6
+
+    # Otro proceso cambia los créditos de C001 con una línea en la bitácora
+    bitacora.anexar_linea(cursos.FILE_PATH, bitacora.linea_de_cambio(
+        "actualizar", "id_curso", {**cursos_mock[0], "creditos": 10}))
+    repo.refrescar()
+    # Solo cae el total que depende de C001; el de E002 sigue guardado
+    assert len(lista_mat._creditos) == 1
+    assert matriculas.calcular_total_creditos("E001", lista_mat, lista_cur) == 14
+
+    # ... y otro reemplaza el archivo completo: se recarga la entidad
+    cursos.guardar_cursos([{**cursos_mock[0], "creditos": 10}, {**cursos_mock[1], "creditos": 6}, cursos_mock[2]])
+    repo.refrescar()
+    assert matriculas.calcular_total_creditos("E001", lista_mat, lista_cur) == 16
+    repo.cerrar()
+
+
+@pytest.mark.parametrize("opciones", [{}, {"segundo_plano": True}, {"catalogo_fijo": True}])
+def test_archivos_insertar_lote(rutas_archivos, cursos_mock, opciones):
+    """Prueba que un lote se escriba de una vez y quede igual que al insertar uno por uno."""
+    cursos.guardar_cursos(cursos_mock)
+    repo = repositorio.RepositorioArchivos(**opciones)
+    lista_cur = repo.cargar("cursos")
+
+    nuevos = cursos.crear_cursos(lista_cur, [(f"Curso {i}", i % 5) for i in range(50)])
+    lista_cur.extend(nuevos)
+    repo.insertar_lote("cursos", nuevos)
+    assert not lista_cur.hay_cambios
+    repo.refrescar()
+    assert len(lista_cur) == 53
+
+    repo.cerrar()
+    assert cursos.cargar_cursos() == lista_cur
+    assert cursos.cargar_cursos()[-1]["id_curso"] == "C053"
+
+
+def test_sqlite_insertar_lote(tmp_path, estudiantes_mock):
+    """Prueba que el lote quede en la base en una sola transacción."""
+    repo = repositorio.RepositorioSQLite(str(tmp_path / "datos.db"))
+    lista_est = repo.cargar("estudiantes")
+    nuevos = estudiantes.crear_estudiantes(lista_est, [(e["nombre"], e["id_carrera"]) for e in estudiantes_mock])
+    lista_est.extend(nuevos)
+    repo.insertar_lote("estudiantes", nuevos)
+    repo.cerrar()
+
+    repo = repositorio.RepositorioSQLite(str(tmp_path / "datos.db"))
+    assert [e["id_estudiante"] for e in repo.cargar("estudiantes")] == ["E001", "E002"]
+    repo.cerrar()
+
+
+def test_archivos_insertar_lote_de_matriculas(rutas_archivos, matriculas_mock):
+    """Prueba que un lote de matrículas vaya al journal en una escritura y se recupere al cargar."""
+    matriculas.guardar_matriculas(matriculas_mock)
+    repo = repositorio.RepositorioArchivos()
+    lista_mat = repo.cargar("matriculas")
+
+    nuevas = matriculas.matricular_estudiantes(lista_mat, [(f"E{i:03d}", ["C001"], "2025-02") for i in range(1, 101)])
+    lista_mat.extend(nuevas)
+    repo.insertar_lote("matriculas", nuevas)
+    assert len(matriculas.leer_journal()) == 100
+    assert repo.sincronizar() == []
+
+    assert matriculas.cargar_matriculas() == lista_mat
+    assert lista_mat[-1]["id_matricula"] == "M0102"
+
+
+def test_sqlite_prerrequisitos_y_base_anterior(tmp_path, cursos_mock):
+    """Prueba que los prerrequisitos se guarden y que una base sin esa columna se actualice al abrirla."""
+    ruta_db = str(tmp_path / "anterior.db")
+    conexion = sqlite3.connect(ruta_db)
+    conexion.execute("CREATE TABLE cursos (id_curso TEXT PRIMARY KEY, nombre_curso TEXT NOT NULL, "
+                     "creditos INTEGER NOT NULL DEFAULT 0)")
+    conexion.execute("INSERT INTO cursos VALUES ('C001', 'Programacion Basica', 3)")
+    conexion.commit()
+    conexion.close()
+
+    repo = repositorio.RepositorioSQLite(ruta_db)
+    assert repo.cargar("cursos") == [cursos_mock[0]]
+    cursos_mock[2]["prerrequisitos"] = ["C001", "C002"]
+    repo.guardar("cursos", cursos_mock)
+    repo.cerrar()
+    repo = repositorio.RepositorioSQLite(ruta_db)
+    assert repo.cargar("cursos")[2]["prerrequisitos"] == ["C001", "C002"]
+    repo.cerrar()
+
+
+def test_archivos_insertar_sin_cargar_no_compacta(rutas_archivos, monkeypatch, matriculas_mock):
+    """Prueba que una inserción sin las matrículas cargadas no reescriba las particiones con una sola."""
+    matriculas.guardar_matriculas(matriculas_mock[:1])
+    monkeypatch.setattr(matriculas, "JOURNAL_MAX_BYTES", 0)
+    repo = repositorio.RepositorioArchivos()
+    repo.insertar("matriculas", matriculas_mock[1])
+    assert [m["id_matricula"] for m in matriculas.cargar_matriculas()] == ["M0001", "M0002"]
+
+
+def test_archivos_eliminar_sin_cargar_conserva_el_resto(rutas_archivos, matriculas_mock):
+    """Prueba que un cambio sobre matrículas no cargadas no reescriba el archivo con una lista parcial."""
+    matriculas.guardar_matriculas(matriculas_mock)
+    repo = repositorio.RepositorioArchivos()
+    repo.eliminar("matriculas", "M0001")
+    repo.cerrar()
+    assert [m["id_matricula"] for m in matriculas.cargar_matriculas()] == ["M0002"]
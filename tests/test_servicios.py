@@ -10,6 +10,7 @@ Estas pruebas validan la lógica de negocio principal:
 import pytest
 # Importamos el módulo de servicios
 from gestion_matriculas import servicios as srv
+from gestion_matriculas import estudiantes, cursos, carreras, matriculas
 
 
 # --- Pruebas de Servicios de Estudiantes ---
@@ -171,4 +172,264 @@ def test_srv_matricular_cursos_mixtos(estudiantes_mock, cursos_mock, matriculas_
     assert "(IDs ignorados por no existir: C999)" in resultado["mensaje"]
     assert len(matriculas_mock) == 3  # Se creó la matrícula
     assert "C003" in matriculas_mock[-1]["id_cursos"]
-    assert "C999" not in matriculas_mock[-1]["id_cursos"]
\ No newline at end of file
+    assert "C999" not in matriculas_mock[-1]["id_cursos"]
+
+def test_srv_matricular_con_almacenes(estudiantes_mock, cursos_mock, matriculas_mock):
+    """Prueba que los servicios funcionen igual con listas indexadas (Almacen)."""
+    lista_est = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+    lista_cur = cursos.crear_almacen_cursos(cursos_mock)
+
+    resultado = srv.srv_matricular_estudiante("E002", ["C001", "C999"], "2025-02", lista_est, lista_cur,
+                                              matriculas_mock)
+    assert resultado["tipo"] == "exito"
+    assert matriculas_mock[-1]["id_cursos"] == ["C001"]
+
+
+# --- Pruebas del Índice de Nombres Normalizados ---
+
+def test_srv_registrar_carrera_duplicada_con_tildes(carreras_mock):
+    """Prueba que el control de duplicados ignore tildes, mayúsculas y espacios."""
+    for lista_car in (carreras_mock, carreras.crear_almacen_carreras(carreras_mock)):
+        resultado = srv.srv_registrar_carrera(lista_car, "  Ingeniería de  SISTEMAS ")
+        assert resultado["tipo"] == "error"
+        assert "Ya existe una carrera" in resultado["mensaje"]
+
+
+def test_indice_nombres_sigue_actualizaciones(estudiantes_mock, carreras_mock):
+    """Prueba que al renombrar un estudiante el nombre anterior quede libre."""
+    lista_est = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+
+    srv.srv_actualizar_estudiante(lista_est, carreras_mock, "E002", "Mayerly Gómez", None)
+
+    assert srv.srv_registrar_estudiante(lista_est, carreras_mock, "Mayerly", "CAR001")["tipo"] == "exito"
+    resultado = srv.srv_registrar_estudiante(lista_est, carreras_mock, "mayerly gomez", "CAR001")
+    assert resultado["tipo"] == "error"
+
+
+def test_indice_nombres_sigue_eliminaciones(estudiantes_mock, carreras_mock):
+    """Prueba que al eliminar un estudiante su nombre se pueda volver a usar."""
+    lista_est = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+
+    assert srv.srv_eliminar_estudiante(lista_est, [], "E001")["tipo"] == "exito"
+    resultado = srv.srv_registrar_estudiante(lista_est, carreras_mock, "Santiago Espitia", "CAR002")
+    assert resultado["tipo"] == "exito"
+
+
+# --- Pruebas de los Conteos de Referencias ---
+
+def test_conteos_siguen_matriculas_y_cambios_de_carrera(estudiantes_mock, cursos_mock, carreras_mock, matriculas_mock):
+    """Prueba que los conteos se actualicen al matricular y al cambiar de carrera."""
+    lista_est = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+    lista_mat = matriculas.crear_almacen_matriculas(matriculas_mock)
+
+    srv.srv_actualizar_estudiante(lista_est, carreras_mock, "E001", None, "CAR002")
+    srv.srv_matricular_estudiante("E002", ["C001"], "2025-02", lista_est, cursos_mock, lista_mat)
+
+    stats = srv.srv_estadisticas_referencias(lista_est, cursos_mock, carreras_mock, lista_mat)
+    assert stats["estudiantes_por_carrera"] == {"CAR001": 1, "CAR002": 1}
+    assert stats["matriculas_por_curso"] == {"C001": 2, "C002": 2, "C003": 1}
+    assert stats["matriculas_por_estudiante"] == {"E001": 1, "E002": 2}
+    assert stats == srv.srv_estadisticas_referencias(list(lista_est), cursos_mock, carreras_mock, list(lista_mat))
+
+
+def test_srv_eliminar_carrera_tras_reasignar_estudiantes(estudiantes_mock, carreras_mock):
+    """Prueba que una carrera se pueda eliminar cuando ya no tiene estudiantes."""
+    lista_est = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+    lista_car = carreras.crear_almacen_carreras(carreras_mock)
+
+    assert srv.srv_eliminar_carrera(lista_car, lista_est, "CAR001")["tipo"] == "error"
+    for id_est in ("E001", "E002"):
+        srv.srv_actualizar_estudiante(lista_est, lista_car, id_est, None, "CAR002")
+
+    assert srv.srv_eliminar_carrera(lista_car, lista_est, "CAR001")["tipo"] == "exito"
+
+
+def test_srv_eliminar_curso_con_matricula_indexada(cursos_mock, matriculas_mock):
+    """Prueba la validación de integridad de cursos con el almacén de matrículas."""
+    lista_mat = matriculas.crear_almacen_matriculas(matriculas_mock)
+
+    assert srv.srv_eliminar_curso(cursos_mock, lista_mat, "C003")["tipo"] == "error"
+    lista_mat.remove(matriculas_mock[1])
+    assert srv.srv_eliminar_curso(cursos_mock, lista_mat, "C003")["tipo"] == "exito"
+
+
+# --- Pruebas de los Totales de Créditos ---
+
+def test_totales_creditos_siguen_matriculas_y_cambios_de_creditos(estudiantes_mock, cursos_mock, matriculas_mock):
+    """Prueba que el total guardado se actualice al matricular y al cambiar créditos."""
+    lista_est = estudiantes.crear_almacen_estudiantes(estudiantes_mock)
+    lista_cur = cursos.crear_almacen_cursos(cursos_mock)
+    lista_mat = matriculas.crear_almacen_matriculas(matriculas_mock)
+    assert matriculas.calcular_total_creditos("E001", lista_mat, lista_cur) == 7
+
+    srv.srv_matricular_estudiante("E001", ["C003"], "2025-01", lista_est, lista_cur, lista_mat)
+    assert matriculas.calcular_total_creditos("E001", lista_mat, lista_cur) == 2
+
+    srv.srv_actualizar_curso(lista_cur, "C003", None, 5, lista_mat)
+    assert matriculas.calcular_total_creditos("E001", lista_mat, lista_cur) == 5
+    assert matriculas.calcular_total_creditos("E002", lista_mat, lista_cur) == 9
+
+    # Un cambio hecho sin el servicio (ej. al reproducir la bitácora) descarta los totales
+    with lista_cur.editando(lista_cur[1]) as curso:
+        curso["creditos"] = 10
+    assert matriculas.calcular_total_creditos("E002", lista_mat, lista_cur) == 15
+
+    # El servicio solo descarta los totales que incluyen el curso modificado
+    matriculas.calcular_total_creditos("E001", lista_mat, lista_cur)
+    srv.srv_actualizar_curso(lista_cur, "C001", "Programación", None, lista_mat)
+    assert len(lista_mat._creditos) == 1
+
+
+def test_srv_reporte_creditos(estudiantes_mock, cursos_mock, matriculas_mock):
+    """Prueba que el reporte liste solo a quienes superan el mínimo, de mayor a menor."""
+    lista_mat = matriculas.crear_almacen_matriculas(matriculas_mock)
+
+    for matriculas_db in (matriculas_mock, lista_mat):
+        reporte = srv.srv_reporte_creditos(estudiantes_mock, cursos_mock, matriculas_db, "2025-01", 6)
+        assert [(f["id_estudiante"], f["creditos"]) for f in reporte] == [("E001", 7)]
+    assert srv.srv_reporte_creditos(estudiantes_mock, cursos_mock, lista_mat, "2024-02", 0) == []
+
+
+# --- Pruebas de Importación en Lote ---
+
+def test_srv_importar_estudiantes_reporta_filas(tmp_path, estudiantes_mock, carreras_mock):
+    """Prueba que la importación cree las filas válidas con IDs seguidos y reporte las demás."""
+    ruta = tmp_path / "nuevos.csv"
+    ruta.write_text(
+        "nombre,id_carrera\n"
+        "Ana Gómez,CAR001\n"
+        ",CAR002\n"
+        "Luis,CAR999\n"
+        "mayerly,CAR002\n"
+        "Ana Gomez,CAR002\n"
+        "Luis,CAR002\n",
+        encoding="utf-8"
+    )
+    for lista_est in (list(estudiantes_mock), estudiantes.crear_almacen_estudiantes(estudiantes_mock)):
+        resultado = srv.srv_importar_estudiantes(lista_est, carreras_mock, str(ruta))
+
+        assert resultado["tipo"] == "info"
+        assert [e["id_estudiante"] for e in resultado["importados"]] == ["E003", "E004"]
+        assert lista_est[-2:] == resultado["importados"]
+        assert [error.split(":")[0] for error in resultado["errores"]] == ["Fila 3", "Fila 4", "Fila 5", "Fila 6"]
+        assert "fila 2" in resultado["errores"][3]
+
+
+def test_srv_importar_cursos_valida_creditos(tmp_path, cursos_mock):
+    """Prueba que los créditos fuera de rango o no numéricos se rechacen."""
+    ruta = tmp_path / "cursos.csv"
+    ruta.write_text("nombre_curso,creditos\nRedes,3\nFísica,tres\nTesis,99\n", encoding="utf-8")
+
+    resultado = srv.srv_importar_cursos(cursos_mock, str(ruta))
+    assert [c["id_curso"] for c in resultado["importados"]] == ["C004"]
+    assert cursos_mock[-1]["creditos"] == 3
+    assert len(resultado["errores"]) == 2
+
+    (tmp_path / "mal.csv").write_text("nombre\nRedes\n", encoding="utf-8")
+    assert srv.srv_importar_cursos(cursos_mock, str(tmp_path / "mal.csv"))["tipo"] == "error"
+    assert len(cursos_mock) == 4
+
+
+def test_srv_matricular_lote(estudiantes_mock, cursos_mock, matriculas_mock):
+    """Prueba que el lote devuelva un resultado por solicitud y use IDs seguidos."""
+    lista_mat = matriculas.crear_almacen_matriculas(matriculas_mock)
+    solicitudes = [
+        ("E001", ["C001", "C999"], "2025-02"),
+        ("E999", ["C001"], "2025-02"),
+        ("E002", ["C998"], "2025-02"),
+        ("E002", ["C002", "C003"], "2025-02"),
+        ("", ["C001"], "2025-02"),
+    ]
+    resultado = srv.srv_matricular_lote(solicitudes, estudiantes_mock, cursos_mock, lista_mat)
+
+    assert resultado["tipo"] == "info"
+    assert [r["tipo"] for r in resultado["resultados"]] == ["exito", "error", "error", "exito", "error"]
+    assert "C999" in resultado["resultados"][0]["mensaje"]
+    assert [m["id_matricula"] for m in resultado["matriculas"]] == ["M0003", "M0004"]
+    assert lista_mat[-2]["id_cursos"] == ["C001"]
+    assert matriculas.calcular_total_creditos("E002", lista_mat, cursos_mock) == 6
+
+
+def test_srv_reportes_sin_numpy(monkeypatch, cursos_mock, matriculas_mock):
+    """Prueba que sin NumPy los reportes respondan con un error en lugar de fallar."""
+    monkeypatch.setattr(srv.ana, "np", None)
+    resultado = srv.srv_reporte_tendencia(cursos_mock, matriculas_mock)
+    assert resultado["tipo"] == "error"
+    assert "NumPy" in resultado["mensaje"]
+
+
+def test_srv_reporte_sobrecarga(estudiantes_mock, cursos_mock, matriculas_mock):
+    """Prueba que el reporte vectorizado agregue los nombres y respete el máximo."""
+    pytest.importorskip("numpy")
+    resultado = srv.srv_reporte_sobrecarga(estudiantes_mock, cursos_mock, matriculas_mock, "2025-01", 6)
+    assert [(f["nombre"], f["creditos"]) for f in resultado["filas"]] == [("Santiago Espitia", 7)]
+
+
+def test_srv_reporte_cursos_en_comun(cursos_mock, matriculas_mock):
+    """Prueba que el reporte de co-matrícula funcione sin NumPy y valide el curso."""
+    resultado = srv.srv_reporte_cursos_en_comun(cursos_mock, matriculas_mock, "C002", None)
+    assert resultado["tipo"] == "exito"
+    assert [(f["id_curso"], f["estudiantes"]) for f in resultado["filas"]] == [("C001", 1), ("C003", 1)]
+    assert srv.srv_reporte_cursos_en_comun(cursos_mock, matriculas_mock, "C999", None)["tipo"] == "error"
+
+
+def test_srv_generar_horario_examenes(estudiantes_mock, cursos_mock, matriculas_mock):
+    """Prueba que el horario agrupe los cursos por franja y valide los parámetros."""
+    resultado = srv.srv_generar_horario_examenes(estudiantes_mock, cursos_mock, matriculas_mock, "2025-01", 3, 1)
+    assert resultado["tipo"] == "exito"
+    franja_de = {c["id_curso"]: f["franja"] for f in resultado["franjas"] for c in f["cursos"]}
+    assert franja_de["C001"] != franja_de["C002"] != franja_de["C003"]
+    # Las dos franjas caen el mismo día: cada estudiante rinde 2 exámenes ese día
+    assert sorted(f["id_estudiante"] for f in resultado["sobrecargados"]) == ["E001", "E002"]
+
+    assert srv.srv_generar_horario_examenes(estudiantes_mock, cursos_mock, matriculas_mock, "1999-01")["tipo"] == "error"
+    assert srv.srv_generar_horario_examenes(estudiantes_mock, cursos_mock, matriculas_mock, "2025-01", 0)["tipo"] == "error"
+
+
+def test_srv_matricular_rechaza_sin_prerrequisitos(estudiantes_mock, cursos_mock, matriculas_mock):
+    """Prueba que se rechacen los cursos cuyos prerrequisitos no se tomaron antes."""
+    cursos_mock[2]["prerrequisitos"] = ["C001"]
+    # E002 no tomó C001: solo se matricula en C002
+    resultado = srv.srv_matricular_estudiante("E002", ["C002", "C003"], "2025-02", estudiantes_mock, cursos_mock, matriculas_mock)
+    assert resultado["tipo"] == "exito"
+    assert "Rechazados por prerrequisitos: C003 exige C001" in resultado["mensaje"]
+    assert matriculas_mock[-1]["id_cursos"] == ["C002"]
+
+    resultado = srv.srv_matricular_estudiante("E002", ["C003"], "2025-02", estudiantes_mock, cursos_mock, matriculas_mock)
+    assert resultado["tipo"] == "error"
+    # E001 tomó C001 en 2025-01
+    resultado = srv.srv_matricular_estudiante("E001", ["C003"], "2025-02", estudiantes_mock, cursos_mock, matriculas_mock)
+    assert resultado["tipo"] == "exito"
+
+
+def test_srv_prerrequisitos_ciclos_y_eliminacion(cursos_mock, matriculas_mock):
+    """Prueba que no se acepten ciclos ni se elimine un curso que es prerrequisito de otro."""
+    assert srv.srv_actualizar_curso(cursos_mock, "C002", None, None, matriculas_mock, ["C001"])["tipo"] == "exito"
+    resultado = srv.srv_actualizar_curso(cursos_mock, "C001", None, None, matriculas_mock, ["C002"])
+    assert resultado["tipo"] == "error"
+    assert "se formaría un ciclo" in resultado["mensaje"]
+    assert srv.srv_actualizar_curso(cursos_mock, "C003", None, None, matriculas_mock, ["C999"])["tipo"] == "error"
+
+    cursos_mock.append({"id_curso": "C004", "nombre_curso": "Redes", "creditos": 3, "prerrequisitos": []})
+    assert srv.srv_actualizar_curso(cursos_mock, "C003", None, None, matriculas_mock, ["C004"])["tipo"] == "exito"
+    resultado = srv.srv_eliminar_curso(cursos_mock, matriculas_mock, "C004")
+    assert resultado["tipo"] == "error"
+    assert "es prerrequisito de: C003" in resultado["mensaje"]
+
+
+def test_srv_cursos_mantienen_el_cierre_sin_rearmarlo(cursos_mock, matriculas_mock):
+    """Prueba que los cambios hechos con los servicios actualicen el cierre guardado en lugar de descartarlo."""
+    lista_cur = cursos.crear_almacen_cursos(cursos_mock)
+    lista_mat = matriculas.crear_almacen_matriculas(matriculas_mock)
+    cierre = matriculas.obtener_cierre_prerrequisitos(lista_mat, lista_cur)
+
+    assert srv.srv_actualizar_curso(lista_cur, "C003", None, None, lista_mat, ["C002"])["tipo"] == "exito"
+    assert srv.srv_registrar_curso(lista_cur, "Redes", 3, ["C003"], lista_mat)["tipo"] == "exito"
+    assert matriculas.obtener_cierre_prerrequisitos(lista_mat, lista_cur) is cierre
+    assert cierre.ids(cierre.requeridos("C004")) == ["C002", "C003"]
+    assert matriculas.prerrequisitos_faltantes(lista_mat, lista_cur, "E001", ["C004"], "2025-02") == {"C004": ["C003"]}
+
+    assert srv.srv_eliminar_curso(lista_cur, lista_mat, "C004")["tipo"] == "exito"
+    assert cierre.dependientes("C003") == []
+    assert srv.srv_eliminar_curso(lista_cur, lista_mat, "C003")["tipo"] == "error"  # Está en M0002
+    assert matriculas.obtener_cierre_prerrequisitos(lista_mat, lista_cur) is cierre